@@ -10,9 +10,12 @@ from dotenv import load_dotenv
 load_dotenv()
 
 import os
-from google import genai
+import sys
+# Shared helpers live in rules_bot/ (evo_gateway: local gateway if running, else the SDK)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "rules_bot"))
+from evo_gateway import gemini_client
 
-client = genai.Client(api_key=os.getenv("GEMINI_API_KEY"))
+client = gemini_client(os.getenv("GEMINI_API_KEY"))
 
 response = client.models.generate_content(
     model="gemini-3-flash-preview",
@@ -2,13 +2,16 @@
 # Gemini chatbot with memory using the NEW SDK.
 
 import os
-from google import genai
+import sys
+# Shared helpers live in rules_bot/ (evo_gateway: local gateway if running, else the SDK)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "rules_bot"))
+from evo_gateway import gemini_client
 
 api_key = os.getenv("GEMINI_API_KEY")
 if not api_key:
     raise RuntimeError("GEMINI_API_KEY is not set.")
 
-client = genai.Client(api_key=api_key)
+client = gemini_client(api_key)
 MODEL = "gemini-3-flash-preview"
 
 #  start a chat session (keeps history for memory)
@@ -1,8 +1,11 @@
 
 
 import os
+import sys
 from dotenv import load_dotenv
-from google import genai
+# Shared helpers live in rules_bot/ (evo_gateway: local gateway if running, else the SDK)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "rules_bot"))
+from evo_gateway import gemini_client
 
 load_dotenv()
 
@@ -10,7 +13,7 @@ api_key = os.getenv("GEMINI_API_KEY")
 if not api_key:
     raise ValueError("GEMINI_API_KEY not found in .env")
 
-client = genai.Client(api_key=api_key)
+client = gemini_client(api_key)
 
 prompt = "Explain Gemini API in simple terms"
 
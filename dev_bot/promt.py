@@ -23,8 +23,12 @@ Inside the message is the actual text 📝”
 
 # uv add openai 
 
-from openai import OpenAI # Create a client (make sure your OPENAI_API_KEY is set in your environment)
-client = OpenAI()# Replace the prompt below with your own question or instruction
+import os
+import sys
+# Shared helpers live in rules_bot/ (evo_gateway: local gateway if running, else the SDK)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "rules_bot"))
+from evo_gateway import openai_client # Create a client (make sure your OPENAI_API_KEY is set in your environment)
+client = openai_client()# Replace the prompt below with your own question or instruction
 
 response = client.chat.completions.create(
     model="gpt-4o-mini",
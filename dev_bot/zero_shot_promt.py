@@ -4,8 +4,11 @@
 #import openai 
 
 import os
+import sys
 from dotenv import load_dotenv
-from openai import OpenAI
+# Shared helpers live in rules_bot/ (evo_gateway: local gateway if running, else the SDK)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "rules_bot"))
+from evo_gateway import openai_client
 
 # Load environment variables from .env
 load_dotenv()
@@ -18,7 +21,7 @@ if not api_key:
     raise ValueError("OPENAI_API_KEY not found in .env file")
 
 # Create OpenAI client
-client = OpenAI(api_key=api_key)
+client = openai_client(api_key)
 
 
 
@@ -16,6 +16,10 @@ from tkinter import filedialog, messagebox
 import customtkinter as ctk
 from google import genai
 
+from evo_ui import TextMeasure  # Bubble sizes from cached font metrics (no layout flush)
+from evo_export import start_export, progress_text, FILETYPES  # Streaming export in background
+from evo_sessions import SessionPool  # Connection warm-up + spare chat sessions
+
 # -----------------------------
 # Block: API setup and defaults
 # -----------------------------
@@ -24,6 +28,7 @@ if not API_KEY:
     raise RuntimeError("GEMINI_API_KEY is not set. Set it in PowerShell before running.")
 
 CLIENT = genai.Client(api_key=API_KEY)
+SESSIONS = SessionPool(CLIENT)
 
 MODEL_OPTIONS = [
     "models/gemini-flash-latest",
@@ -39,8 +44,10 @@ DEFAULT_ROLE = "You are a helpful assistant. Keep replies short, clear, and frie
 # -----------------------------
 # Block: Chat state
 # -----------------------------
-chat = CLIENT.chats.create(model=DEFAULT_MODEL)
+chat = SESSIONS.take(DEFAULT_MODEL)
+chat_model = DEFAULT_MODEL
 current_role = DEFAULT_ROLE
+SESSIONS.warm(DEFAULT_MODEL, force=True)  # TLS handshake now, not on the first message
 
 # -----------------------------
 # Block: Logging (optional)
@@ -58,6 +65,10 @@ def log_line(line: str):
 def safe_text(s: str) -> str:
     return (s or "").strip()
 
+BUBBLE_FONT = ("Segoe UI", 12)
+BUBBLE_WRAP = 620
+bubble_measure = TextMeasure(BUBBLE_FONT)  # Shared width/height cache for every bubble
+
 class ChatBubble(ctk.CTkFrame):
     # Chat bubble component (left for bot, right for user)
     def __init__(self, master, text: str, sender: str):
@@ -80,18 +91,18 @@ class ChatBubble(ctk.CTkFrame):
             text_color=text_color,
             justify="left",
             anchor="w",
-            wraplength=620,
-            font=("Segoe UI", 12),
+            wraplength=BUBBLE_WRAP,
+            font=BUBBLE_FONT,
         )
         self.label.pack(padx=12, pady=10, fill="both", expand=True)
 
         # Block: alignment wrapper
         self.pack_propagate(False)
-        self.update_idletasks()
 
-        # bubble width control
-        w = min(680, max(200, self.label.winfo_reqwidth() + 24))
-        self.configure(width=w)
+        # bubble size control (from font metrics, so no update_idletasks per bubble)
+        text_w, text_h = bubble_measure.size(text, BUBBLE_WRAP)
+        w = min(680, max(200, text_w + 24))
+        self.configure(width=w, height=max(28, text_h) + 20)  # 28 = CTkLabel min height, 20 = pady
 
         # Position bubble
         if anchor == "e":
@@ -134,7 +145,7 @@ model_label = ctk.CTkLabel(sidebar, text="Model", font=("Segoe UI", 12, "bold"))
 model_label.grid(row=2, column=0, padx=16, pady=(4, 6), sticky="w")
 
 model_var = ctk.StringVar(value=DEFAULT_MODEL)
-model_menu = ctk.CTkOptionMenu(sidebar, values=MODEL_OPTIONS, variable=model_var)
+model_menu = ctk.CTkOptionMenu(sidebar, values=MODEL_OPTIONS, variable=model_var, command=SESSIONS.warm)
 model_menu.grid(row=3, column=0, padx=16, pady=(0, 12), sticky="we")
 
 role_label = ctk.CTkLabel(sidebar, text="Role", font=("Segoe UI", 12, "bold"))
@@ -144,10 +155,16 @@ role_box = ctk.CTkTextbox(sidebar, height=140, font=("Segoe UI", 11))
 role_box.grid(row=5, column=0, padx=16, pady=(0, 12), sticky="we")
 role_box.insert("1.0", DEFAULT_ROLE)
 
+def fresh_chat():
+    # Swaps in a spare session for the selected model (no network wait)
+    global chat, chat_model
+    chat_model = model_var.get()
+    chat = SESSIONS.take(chat_model)
+
 def set_role():
-    global current_role, chat
+    global current_role
     current_role = safe_text(role_box.get("1.0", "end"))
-    chat = CLIENT.chats.create(model=model_var.get())
+    fresh_chat()
     add_system("Role updated. Memory reset.")
     status_var.set("Ready")
     log_line("SYSTEM: role updated")
@@ -156,8 +173,7 @@ apply_role_btn = ctk.CTkButton(sidebar, text="Apply Role (reset)", command=set_r
 apply_role_btn.grid(row=6, column=0, padx=16, pady=(0, 8), sticky="we")
 
 def new_chat():
-    global chat
-    chat = CLIENT.chats.create(model=model_var.get())
+    fresh_chat()
     clear_chat_view()
     add_system("New chat started.")
     status_var.set("Ready")
@@ -167,8 +183,7 @@ new_chat_btn = ctk.CTkButton(sidebar, text="New Chat", command=new_chat)
 new_chat_btn.grid(row=7, column=0, padx=16, pady=(0, 8), sticky="we")
 
 def clear_memory():
-    global chat
-    chat = CLIENT.chats.create(model=model_var.get())
+    fresh_chat()
     add_system("Memory cleared.")
     status_var.set("Ready")
     log_line("SYSTEM: memory cleared")
@@ -177,22 +192,35 @@ clear_btn = ctk.CTkButton(sidebar, text="Clear Memory", command=clear_memory)
 clear_btn.grid(row=8, column=0, padx=16, pady=(0, 8), sticky="we")
 
 def save_chat():
-    content = export_chat_text()
-    if not content.strip():
+    if not chat_lines:
         messagebox.showinfo("Save", "Nothing to save.")
         return
 
     path = filedialog.asksaveasfilename(
         defaultextension=".txt",
-        filetypes=[("Text files", "*.txt")]
+        filetypes=[("Text files", "*.txt")] + FILETYPES
     )
     if not path:
         return
 
-    with open(path, "w", encoding="utf-8") as f:
-        f.write(content)
+    # Block: write in a background thread (format from extension, .gz = gzip)
+    rows = [(sender, text, "") for sender, text in chat_lines]  # snapshot; the thread streams from it
+    save_btn.configure(state="disabled")
+
+    def progress(done, total):
+        app.after(0, lambda: status_var.set(progress_text(done, total)))
+
+    def done(count, error):
+        def finish():
+            save_btn.configure(state="normal")
+            status_var.set("Ready")
+            if error:
+                messagebox.showerror("Save", f"Export failed:\n{error}")
+            else:
+                messagebox.showinfo("Save", f"Saved to:\n{path}")
+        app.after(0, finish)
 
-    messagebox.showinfo("Save", f"Saved to:\n{path}")
+    start_export(rows, path, total=len(rows), progress=progress, done=done)
 
 save_btn = ctk.CTkButton(sidebar, text="Save Chat", command=save_chat)
 save_btn.grid(row=10, column=0, padx=16, pady=(0, 18), sticky="we")
@@ -256,7 +284,6 @@ def add_message(sender: str, text: str):
         return
 
     bubble = ChatBubble(chat_scroll, text=text, sender=("user" if sender == "user" else "bot"))
-    chat_scroll.update_idletasks()
 
 def clear_chat_view():
     global chat_lines
@@ -264,30 +291,16 @@ def clear_chat_view():
     for widget in chat_scroll.winfo_children():
         widget.destroy()
 
-def export_chat_text() -> str:
-    out = []
-    for sender, text in chat_lines:
-        if sender == "user":
-            out.append(f"You: {text}")
-        elif sender == "bot":
-            out.append(f"Bot: {text}")
-        else:
-            out.append(f"System: {text}")
-    return "\n".join(out) + "\n"
-
 # -----------------------------
 # Block: Gemini call in background thread
 # -----------------------------
 def call_gemini(user_text: str):
-    global chat
-
     try:
         status_var.set("Thinking...")
 
         # Block: ensure chat uses selected model
-        selected_model = model_var.get()
-        if getattr(chat, "model", None) != selected_model:
-            chat = CLIENT.chats.create(model=selected_model)
+        if chat_model != model_var.get():
+            fresh_chat()
 
         prompt = f"ROLE:\n{current_role}\n\nUSER:\n{user_text}"
 
@@ -330,6 +343,7 @@ def send_message():
 
 send_btn.configure(command=send_message)
 entry.bind("<Return>", lambda e: send_message())
+entry.bind("<Key>", lambda e: SESSIONS.warm(model_var.get()))  # Re-open the connection while typing
 
 # -----------------------------
 # Block: Welcome message
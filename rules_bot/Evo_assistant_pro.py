@@ -10,19 +10,35 @@ import time               # Time helpers (not used much in this snippet but comm
 import threading          # Run long tasks in background so the UI doesn't freeze
 import datetime           # Timestamps for chat messages
 import re                 # Clean/normalize text using regular expressions
+import sys                # Command-line flags (--profile-startup)
+import importlib          # Import heavy modules later, on first use
 from dataclasses import dataclass  # Quick way to define simple data containers (Msg)
 
 from typing import List, Optional, Tuple  # Type hints (helps readability and editor support)
 
+STARTUP_T0 = time.perf_counter()          # Start of the startup clock (see StartupProfile)
+
 from dotenv import load_dotenv            # Loads .env file into environment variables
 import customtkinter as ctk               # Modern-looking Tkinter UI library
 from tkinter import filedialog, messagebox # File save dialog + popup messages
 
-from google import genai                  # Gemini (Google GenAI) client library
+# Heavy modules are NOT imported here (they'd delay the window by seconds):
+# - google.genai         (Gemini client)        -> imported in the background at startup
+# - pyttsx3, speech_recognition, vosk, numpy (voice) -> only in the audio service process
+# See EvoProApp._init_engines, lazy_import and evo_audio_service.py.
+
+# Local modules (live next to this file)
+from evo_search import LogIndex, ChatIndex, ChatSearch  # Full-text index (disk) + in-chat index
+from evo_feed import VirtualChatFeed      # Chat view that only builds widgets for visible messages
+from evo_ui import UiQueue                # Thread-safe, coalesced UI updates (drained once per frame)
+from evo_history import HistoryStore      # Every message saved to SQLite (paged back in on scroll)
+from evo_export import start_export, progress_text, FILETYPES as EXPORT_FILETYPES  # Streaming export
+from evo_sessions import SessionPool      # Connection warm-up + spare chat sessions
+from evo_audio_service import AudioService  # Mic, STT, TTS, barge-in + wake word in a separate process
+from evo_commands import CommandMatcher, commands_from_help  # "Sounds like" matching of voice commands
+from evo_latency import LatencyTracker    # Per-turn voice timing spans (sidebar p50/p95 + voice_trace.jsonl)
 
-# Voice
-import pyttsx3                            # Text-to-speech (TTS) engine (offline)
-import speech_recognition as sr           # Speech-to-text (STT) using microphone
+IMPORTS_DONE = time.perf_counter()        # Light imports finished (UI + local modules)
 
 
 # =========================
@@ -32,6 +48,9 @@ import speech_recognition as sr           # Speech-to-text (STT) using microphon
 
 APP_TITLE = "Evo v10 Pro"                 # Window/app title shown at the top
 SETTINGS_FILE = "evo_settings.json"       # Where user settings get saved/loaded
+SETTINGS_DEBOUNCE = 0.5                   # Seconds to wait for more setting changes before writing
+STARTUP_TARGET_MS = 800                   # Window should be painted within this (checked by --profile-startup)
+ENGINE_WAIT = 30                          # Seconds a task waits for a background engine before giving up
 DEFAULT_MODEL = "gemini-3-flash-preview"  # Default Gemini model if no settings exist
 
 MODEL_OPTIONS = [                         # Dropdown list options for model selection
@@ -58,9 +77,24 @@ VOICE_COMMANDS_HELP = (
     "- 'new chat'\n"
     "- 'save chat'\n"
     "- 'toggle speak'\n"
+    "- 'stop talking'\n"
     "- 'help commands'\n"
 )
 
+# Command phrases the local spotter listens for (taken from the help text above)
+VOICE_COMMANDS = commands_from_help(VOICE_COMMANDS_HELP)
+
+# Short things Evo says out loud. They're rendered into the TTS audio cache
+# in the background at startup, so they play instantly instead of being synthesized each time.
+SPOKEN = {
+    "clear": "Chat cleared.",
+    "new": "New chat started.",
+    "save": "Saving the chat.",
+    "no_speech": "Sorry, I didn't catch that.",
+    "rate_limit": "Rate limit hit. Wait a bit and try again.",
+    "help": VOICE_COMMANDS_HELP,
+}
+
 
 # =========================
 # Utilities
@@ -75,25 +109,112 @@ def now_ts() -> str:
 def safe_read_json(path: str) -> dict:
     # Reads a JSON file safely:
     # - If file doesn't exist -> return empty dict
-    # - If file is invalid or error occurs -> return empty dict
+    # - If file is invalid or error occurs -> return empty dict (and say so in the console)
     if not os.path.exists(path):
         return {}
     try:
         with open(path, "r", encoding="utf-8") as f:
             return json.load(f)
-    except Exception:
+    except Exception as e:
+        print(f"Could not read {path} ({e}); using defaults.")
         return {}
 
 
 def safe_write_json(path: str, data: dict) -> None:
     # Writes a JSON file safely:
     # - Saves dict with nice indentation
+    # - Writes a temp file first, then swaps it in (os.replace is atomic),
+    #   so a crash mid-write leaves the old file intact instead of a truncated one
     # - If writing fails, do nothing (prevents crashing the app)
+    tmp = f"{path}.tmp"
     try:
-        with open(path, "w", encoding="utf-8") as f:
+        with open(tmp, "w", encoding="utf-8") as f:
             json.dump(data, f, indent=2)
+            f.flush()
+            os.fsync(f.fileno())                # Make sure the bytes are on disk before the swap
+        os.replace(tmp, path)
     except Exception:
-        pass
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+
+
+class SettingsWriter:
+    # Saves settings on a background thread, debounced:
+    # - save(data) just remembers the newest dict and (re)starts a short timer
+    # - when the timer fires, the newest dict is written once
+    # So toggling five things quickly = one disk write, and the UI never waits on disk.
+    def __init__(self, path: str, delay: float = SETTINGS_DEBOUNCE):
+        self.path = path
+        self.delay = delay
+        self._lock = threading.Lock()               # Guards _pending/_timer
+        self._write_lock = threading.Lock()         # One writer at a time (timer vs. close)
+        self._pending: Optional[dict] = None
+        self._timer: Optional[threading.Timer] = None
+
+    def save(self, data: dict):
+        with self._lock:
+            self._pending = dict(data)
+            if self._timer is not None:
+                self._timer.cancel()
+            self._timer = threading.Timer(self.delay, self.flush)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def flush(self):
+        # Writes the pending dict now (also called on app close)
+        with self._lock:
+            data, self._pending = self._pending, None
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+        if data is not None:
+            with self._write_lock:
+                safe_write_json(self.path, data)
+
+
+class StartupProfile:
+    # Records how long each import / init step takes during startup.
+    # Turn on with:  python rules_bot/Evo_assistant_pro.py --profile-startup   (or EVO_PROFILE_STARTUP=1)
+    def __init__(self, enabled: bool):
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self.rows: List[Tuple[str, float, float]] = []  # (step, started at ms, took ms)
+
+    def add(self, step: str, start: float, end: Optional[float] = None):
+        # start/end are time.perf_counter() values
+        end = time.perf_counter() if end is None else end
+        with self._lock:
+            self.rows.append((step, (start - STARTUP_T0) * 1000, (end - start) * 1000))
+
+    def report(self, painted_ms: float):
+        # Prints a table to the console, slowest steps first
+        if not self.enabled:
+            return
+        with self._lock:
+            rows = sorted(self.rows, key=lambda r: -r[2])
+        print("\nStartup profile")
+        print(f"{'step':<36}{'at (ms)':>10}{'took (ms)':>12}")
+        for step, at, took in rows:
+            print(f"{step:<36}{at:>10.1f}{took:>12.1f}")
+        verdict = "OK" if painted_ms <= STARTUP_TARGET_MS else "SLOW"
+        print(f"Window painted at {painted_ms:.0f} ms (target {STARTUP_TARGET_MS} ms): {verdict}\n")
+
+
+PROFILE = StartupProfile("--profile-startup" in sys.argv or os.getenv("EVO_PROFILE_STARTUP") == "1")
+PROFILE.add("import ui + local modules", STARTUP_T0, IMPORTS_DONE)
+
+
+def lazy_import(name: str):
+    # Imports a module the first time it's needed (later calls are a dict lookup).
+    # The time it took shows up in the startup profile.
+    mod = sys.modules.get(name)
+    if mod is None:
+        t0 = time.perf_counter()
+        mod = importlib.import_module(name)
+        PROFILE.add(f"import {name}", t0)
+    return mod
 
 
 def normalize_voice_command(text: str) -> str:
@@ -115,6 +236,7 @@ class Msg:
     sender: str  # Who sent it: "user" | "evo" | "system"
     text: str    # Message content
     ts: str      # Timestamp (HH:MM)
+    id: Optional[int] = None  # Row id in the history database (only for messages loaded from it)
 
 
 # =========================
@@ -147,30 +269,65 @@ class EvoProApp:
         # Load saved settings (or defaults)
         # -------------------------
         s = safe_read_json(SETTINGS_FILE)          # Load settings JSON if it exists
+        self.settings_writer = SettingsWriter(SETTINGS_FILE)  # Debounced, atomic saves
         self.model_id = s.get("model", DEFAULT_MODEL)          # Selected model (or default)
         self.role_text = s.get("role", DEFAULT_ROLE)           # Role text (or default)
         self.theme = s.get("theme", "dark")                     # UI theme ("dark" or "light")
         self.speak_enabled = bool(s.get("speak_enabled", True)) # Whether TTS is enabled
         self.tts_rate = int(s.get("tts_rate", 175))             # TTS speech rate
         self.mic_auto_send = bool(s.get("mic_auto_send", True)) # Auto-send after voice input
+        self.stt_backend = s.get("stt_backend", "auto")         # "auto" | "google" | "vosk" (see evo_stt.py)
+        self.vosk_model = s.get("vosk_model")                   # Vosk model folder (None = evo_stt.VOSK_MODEL_DIR)
+        self.stt_denoise = bool(s.get("stt_denoise", False))    # Noise suppression before cloud STT uploads
+        self.wake_word = bool(s.get("wake_word", False))        # Hands-free: listen for "hey Evo"
+        self.barge_in = bool(s.get("barge_in", True))           # Talking over Evo stops it and starts the mic
 
         # -------------------------
-        # Gemini client + chat memory
-        # -------------------------
-        self.client = genai.Client(api_key=self.api_key)        # Create Gemini API client
-        self.chat = self.client.chats.create(model=self.model_id)  # Create a chat session (keeps memory)
-
+        # Gemini client + voice engines (created in the background, see _init_engines)
         # -------------------------
-        # Voice engines (TTS + STT)
-        # -------------------------
-        self.tts = pyttsx3.init()                   # Initialize text-to-speech engine
-        self.tts.setProperty("rate", self.tts_rate) # Set speech speed
-        self.recognizer = sr.Recognizer()           # Create speech recognizer for microphone input
+        self.client = None                          # Gemini API client
+        self.sessions = None                        # SessionPool (warm connection + spare chats)
+        self.chat = None                            # Chat session (keeps memory)
+        self.audio = AudioService(                  # Voice engines, in their own process (started in _init_engines)
+            {
+                "stt_backend": self.stt_backend,
+                "vosk_model": self.vosk_model,
+                "stt_denoise": self.stt_denoise,
+                "tts_rate": self.tts_rate,
+                "barge_in": self.barge_in,
+                "wake": self.wake_word,
+                "commands": VOICE_COMMANDS,         # Spotted locally when the vosk model is there
+            },
+            self._on_audio_event,
+        )
+        self.tts = self.audio.tts                   # Same calls as evo_tts.TtsWorker
+        self.tts.prewarm(SPOKEN.values())           # Rendered to WAV while idle
+        self.commands = CommandMatcher(VOICE_COMMANDS)  # "Sounds like" matching on transcripts
+        self.voice_busy = threading.Event()         # Set while voice_input is recording/transcribing
+        self.client_ready = threading.Event()       # Set once client + chat exist
+        self.stt_ready = threading.Event()          # Set once STT is usable (or failed); cleared while the service restarts
+        self.engine_errors = {}                     # Engine name -> error text, if init failed
+        self.latency = LatencyTracker(on_update=lambda table: self.ui.post(self.latency_var.set, table, key="latency"))
+        self._voice_trace = None                    # Trace of a voice turn waiting for send_message
+        self._speech_trace = None                   # (tts turn, trace) waiting for Evo to start talking
+        self.tts.on_start = self._on_speech_start
 
         # -------------------------
         # In-memory chat log
         # -------------------------
-        self.messages: List[Msg] = []               # List of Msg objects for chat history
+        self.messages: List[Msg] = []               # Messages currently loaded in the view (oldest first)
+        self.first_key = 0                          # Search-index id of self.messages[0] (goes negative as older pages load)
+        self.history = HistoryStore()               # SQLite copy of every user/evo message (written in background)
+        self._loading_older = False                 # True while an older page is being fetched
+        self._history_exhausted = False             # True once the oldest saved message is loaded
+        self._exporting = False                     # True while "Save Chat" is writing in the background
+        self.log_index: Optional[LogIndex] = None   # Opened on first history search
+        self.chat_index = ChatIndex()               # Word + trigram index, updated per message
+
+        # Search state (for Next/Prev navigation)
+        self.search_state: Optional[ChatSearch] = None  # Last search result
+        self.search_key: Optional[Tuple[str, bool, int]] = None  # (query, regex, index size) it was run for
+        self.search_pos = -1                        # Which hit is selected
 
         # -------------------------
         # UI setup (CustomTkinter)
@@ -184,15 +341,112 @@ class EvoProApp:
         self.app.minsize(1050, 640)                 # Minimum allowed window size
 
         self.status_var = ctk.StringVar(value="Ready")  # Status text shown in sidebar
+        self.latency_var = ctk.StringVar(value=self.latency.table())  # Voice latency table (ms)
+        self.ui = UiQueue(self.app)                 # Worker threads post UI changes here
 
         self._build_layout()                        # Build all UI widgets
         self._bind_hotkeys()                        # Setup keyboard shortcuts
+        self.ui.start()                             # Start draining UI updates on the Tk loop
+
+        # Show only the most recent page of saved history; older pages load when you scroll up
+        restored = [self._msg_from_row(r) for r in self.history.latest()]
+        for m in restored:
+            self._show_msg(m)
+        self.chat_feed.on_top = self.load_older
+        if restored:
+            self.add_system(f"Restored {len(restored)} recent messages. Scroll up for older ones.")
+
+        # Paint the window first, then load the heavy stuff in the background
+        self.app.after_idle(self._on_first_paint)
+        threading.Thread(target=self._init_engines, daemon=True).start()
 
         # Initial system messages in the chat view
         self.add_system(f"Welcome to {APP_TITLE}.")
         self.add_system("Shortcuts: Enter send, Ctrl+N new chat, Ctrl+L clear, Ctrl+S save, Ctrl+F search.")
         self.add_system("Type /help for commands. Use Mic button for voice.")
 
+    # -------------------------
+    # Startup (background engines)
+    # -------------------------
+    # The window shows up right away; Gemini, TTS and STT get ready behind it.
+
+    def _on_first_paint(self):
+        # Runs once the Tk loop is idle for the first time (window is on screen)
+        self.painted_ms = (time.perf_counter() - STARTUP_T0) * 1000
+        if self.client_ready.is_set() and self.tts.ready.is_set() and self.stt_ready.is_set():
+            PROFILE.report(self.painted_ms)
+
+    def _init_engines(self):
+        # Background thread: start the audio service, then import + create the Gemini client.
+        # Each one sets its Event even on failure, so nothing waits forever.
+        t0 = time.perf_counter()
+        self._audio_t0 = t0
+        try:
+            self.audio.start()
+            PROFILE.add("start audio service", t0)
+        except OSError as e:
+            self.engine_errors["stt"] = f"audio service failed to start: {e}"
+            self.tts.error = self.engine_errors["stt"]
+            self.tts.ready.set()
+            self.stt_ready.set()
+
+        try:
+            genai = lazy_import("google.genai")
+            t0 = time.perf_counter()
+            self.client = genai.Client(api_key=self.api_key)
+            self.sessions = SessionPool(self.client)
+            PROFILE.add("init gemini client", t0)
+            t0 = time.perf_counter()
+            self.chat = self.sessions.take(self.model_id)
+            PROFILE.add("init chat session", t0)
+            self.sessions.warm(self.model_id, force=True)  # Handshake now, not on the first message
+        except Exception as e:
+            self.engine_errors["gemini"] = str(e)
+            self.ui.post(self.add_system, f"Gemini init failed: {e}")
+        finally:
+            self.client_ready.set()
+
+        self.tts.ready.wait(ENGINE_WAIT)
+        self.stt_ready.wait(ENGINE_WAIT)
+        painted = getattr(self, "painted_ms", None)
+        if painted is not None:
+            PROFILE.report(painted)
+
+    def _on_audio_event(self, name: str, ev: dict):
+        # Reader thread of the audio service (see the protocol in evo_audio_service.py)
+        if name == "stt_ready":
+            if ev.get("error"):
+                self.engine_errors["stt"] = ev["error"]
+            else:
+                self.engine_errors.pop("stt", None)
+                PROFILE.add(f"audio service ready (stt: {ev.get('backend')}, "
+                            f"commands: {ev.get('commands') or 'from transcript'})", self._audio_t0)
+            if ev.get("note"):
+                self.ui.post(self.add_system, ev["note"])
+            self.stt_ready.set()
+        elif name == "barge":
+            self._on_barge_in()
+        elif name == "wake":
+            self._on_wake()
+        elif name == "wake_off":
+            self.ui.post(self._wake_failed, ev.get("error") or "unknown error")
+        elif name == "crashed":
+            self.stt_ready.clear()
+            if ev.get("restarting"):
+                self.ui.post(self.add_system, "Voice engine stopped unexpectedly. Restarting it...")
+            else:
+                self.engine_errors["stt"] = "voice engine keeps crashing"
+                self.stt_ready.set()
+                self.ui.post(self.add_system, "Voice engine keeps crashing. Voice is off until Evo restarts.")
+        elif name == "restarted":
+            self._audio_t0 = time.perf_counter()
+
+    def _wait_engine(self, event: threading.Event, name: str) -> bool:
+        # Worker threads call this before using an engine. False = not available.
+        if not event.wait(ENGINE_WAIT):
+            return False
+        return name not in self.engine_errors
+
     # -------------------------
     # UI
     # -------------------------
@@ -207,7 +461,7 @@ class EvoProApp:
         # Sidebar container (left panel)
         self.sidebar = ctk.CTkFrame(self.app, width=320, corner_radius=0)
         self.sidebar.grid(row=0, column=0, sticky="nsw")
-        self.sidebar.grid_rowconfigure(20, weight=1)  # Allows spacing stretch at bottom
+        self.sidebar.grid_rowconfigure(21, weight=1)  # Allows spacing stretch at bottom
 
         # Main container (right panel)
         self.main = ctk.CTkFrame(self.app, corner_radius=0)
@@ -230,7 +484,10 @@ class EvoProApp:
             row=2, column=0, padx=16, pady=(6, 6), sticky="w"
         )
         self.model_var = ctk.StringVar(value=self.model_id)  # Selected model value
-        self.model_menu = ctk.CTkOptionMenu(self.sidebar, values=MODEL_OPTIONS, variable=self.model_var)
+        self.model_menu = ctk.CTkOptionMenu(
+            self.sidebar, values=MODEL_OPTIONS, variable=self.model_var,
+            command=lambda _m: self._warm_connection(),  # Get a spare session for the new model ready
+        )
         self.model_menu.grid(row=3, column=0, padx=16, pady=(0, 10), sticky="we")
 
         # Role textbox (system prompt / instructions)
@@ -253,8 +510,8 @@ class EvoProApp:
         self.clear_btn = ctk.CTkButton(self.sidebar, text="Clear Chat View", command=self.clear_chat_view)
         self.clear_btn.grid(row=8, column=0, padx=16, pady=(0, 8), sticky="we")
 
-        # Save chat to a .txt file
-        self.save_btn = ctk.CTkButton(self.sidebar, text="Save Chat (txt)", command=self.save_chat)
+        # Export saved history (md / jsonl / html / txt, optional .gz)
+        self.save_btn = ctk.CTkButton(self.sidebar, text="Export Chat", command=self.save_chat)
         self.save_btn.grid(row=9, column=0, padx=16, pady=(0, 8), sticky="we")
 
         # -------------------------
@@ -282,29 +539,69 @@ class EvoProApp:
         )
         self.mic_send_chk.grid(row=12, column=0, padx=16, pady=(0, 8), sticky="w")
 
+        # Checkbox: hands-free mode, say "hey Evo" instead of pressing Mic
+        self.wake_var = ctk.BooleanVar(value=self.wake_word)
+        self.wake_chk = ctk.CTkCheckBox(
+            self.sidebar,
+            text='Hands-free ("hey Evo")',
+            variable=self.wake_var,
+            command=self._on_wake_toggle,
+        )
+        self.wake_chk.grid(row=13, column=0, padx=16, pady=(0, 8), sticky="w")
+
+        # Voice latency per stage over the last turns (ms), see evo_latency.py
+        ctk.CTkLabel(
+            self.sidebar, textvariable=self.latency_var, font=("Consolas", 10), justify="left"
+        ).grid(row=14, column=0, padx=16, pady=(0, 8), sticky="w")
+
         # Toggle light/dark mode
         self.theme_btn = ctk.CTkButton(self.sidebar, text="Toggle Theme", command=self.toggle_theme)
-        self.theme_btn.grid(row=13, column=0, padx=16, pady=(0, 8), sticky="we")
+        self.theme_btn.grid(row=15, column=0, padx=16, pady=(0, 8), sticky="we")
 
         # -------------------------
         # Search widgets
         # -------------------------
         ctk.CTkLabel(self.sidebar, text="Search", font=("Segoe UI", 12, "bold")).grid(
-            row=14, column=0, padx=16, pady=(12, 6), sticky="w"
+            row=16, column=0, padx=16, pady=(12, 6), sticky="w"
         )
         self.search_entry = ctk.CTkEntry(self.sidebar, placeholder_text="Find in chat...")
-        self.search_entry.grid(row=15, column=0, padx=16, pady=(0, 8), sticky="we")
+        self.search_entry.grid(row=17, column=0, padx=16, pady=(0, 8), sticky="we")
+        self.search_entry.bind("<Return>", lambda e: self.search_chat())
+
+        # Search / Prev / Next buttons in one row
+        search_row = ctk.CTkFrame(self.sidebar, fg_color="transparent")
+        search_row.grid(row=18, column=0, padx=16, pady=(0, 8), sticky="we")
+        search_row.grid_columnconfigure(0, weight=1)
+        self.search_btn = ctk.CTkButton(search_row, text="Search", command=self.search_chat)
+        self.search_btn.grid(row=0, column=0, sticky="we")
+        self.search_prev_btn = ctk.CTkButton(search_row, text="<", width=36, command=lambda: self.search_step(-1))
+        self.search_prev_btn.grid(row=0, column=1, padx=(6, 0))
+        self.search_next_btn = ctk.CTkButton(search_row, text=">", width=36, command=lambda: self.search_step(1))
+        self.search_next_btn.grid(row=0, column=2, padx=(6, 0))
+
+        self.search_result = ctk.CTkLabel(
+            self.sidebar, text="", font=("Segoe UI", 11), wraplength=280, justify="left"
+        )
+        self.search_result.grid(row=19, column=0, padx=16, pady=(0, 8), sticky="w")
 
-        self.search_btn = ctk.CTkButton(self.sidebar, text="Search", command=self.search_chat)
-        self.search_btn.grid(row=16, column=0, padx=16, pady=(0, 8), sticky="we")
+        # Checkbox: search old chats on disk (logs/ + sessions/) instead of this session
+        self.search_history_var = ctk.BooleanVar(value=False)
+        self.search_history_chk = ctk.CTkCheckBox(
+            self.sidebar,
+            text="Search old chats (logs)",
+            variable=self.search_history_var,
+        )
+        self.search_history_chk.grid(row=20, column=0, padx=16, pady=(0, 8), sticky="w")
 
-        self.search_result = ctk.CTkLabel(self.sidebar, text="", font=("Segoe UI", 11))
-        self.search_result.grid(row=17, column=0, padx=16, pady=(0, 8), sticky="w")
+        # Checkbox: treat the query as a regular expression
+        self.search_regex_var = ctk.BooleanVar(value=False)
+        self.search_regex_chk = ctk.CTkCheckBox(self.sidebar, text="Regex", variable=self.search_regex_var)
+        self.search_regex_chk.grid(row=21, column=0, padx=16, pady=(0, 8), sticky="w")
 
         # -------------------------
         # Main area: chat feed + input bar
         # -------------------------
-        self.chat_feed = ctk.CTkScrollableFrame(self.main, corner_radius=0)  # Scrollable chat history
+        self.chat_feed = VirtualChatFeed(self.main, corner_radius=0)        # Scrollable chat history (virtualized)
         self.chat_feed.grid(row=0, column=0, sticky="nsew")
 
         self.input_bar = ctk.CTkFrame(self.main, corner_radius=0)           # Bottom input bar
@@ -325,6 +622,7 @@ class EvoProApp:
 
         # Pressing Enter triggers send_message
         self.entry.bind("<Return>", lambda e: self.send_message())
+        self.entry.bind("<Key>", self._warm_connection)  # Re-open the connection while the user types
 
     def _bind_hotkeys(self):
         # Hotkeys to quickly perform common actions
@@ -332,6 +630,9 @@ class EvoProApp:
         self.app.bind("<Control-l>", lambda e: self.clear_chat_view())
         self.app.bind("<Control-s>", lambda e: self.save_chat())
         self.app.bind("<Control-f>", lambda e: self._focus_search())
+        self.app.bind("<F3>", lambda e: self.search_step(1))
+        self.app.bind("<Shift-F3>", lambda e: self.search_step(-1))
+        self.app.bind("<Escape>", lambda e: self.stop_speaking())
 
     def _focus_search(self):
         # Places cursor into the search bar
@@ -343,16 +644,20 @@ class EvoProApp:
     # Saving user settings (model, role, theme, etc.) to a JSON file.
 
     def persist(self):
-        # Save current state to SETTINGS_FILE
-        safe_write_json(
-            SETTINGS_FILE,
+        # Save current state to SETTINGS_FILE (debounced + written in the background)
+        self.settings_writer.save(
             {
                 "model": self.model_var.get(),              # currently selected model in UI
                 "role": self.role_text,                     # role/system instructions
                 "theme": self.theme,                        # dark/light
                 "speak_enabled": self.speak_enabled,        # TTS enabled
-                "tts_rate": int(self.tts.getProperty("rate")), # TTS speed
+                "tts_rate": self.tts_rate,                  # TTS speed
                 "mic_auto_send": self.mic_auto_send,        # auto-send voice transcription
+                "stt_backend": self.stt_backend,            # speech-to-text engine
+                "vosk_model": self.vosk_model,              # local STT model folder
+                "stt_denoise": self.stt_denoise,            # noise suppression before cloud STT
+                "wake_word": self.wake_word,                # hands-free "hey Evo" mode
+                "barge_in": self.barge_in,                  # interrupt Evo by talking
             },
         )
 
@@ -361,6 +666,23 @@ class EvoProApp:
         self.mic_auto_send = bool(self.mic_send_var.get())
         self.persist()
 
+    def _on_wake_toggle(self):
+        # Called when user toggles hands-free mode
+        self.wake_word = bool(self.wake_var.get())
+        self.audio.set_wake(self.wake_word)         # Starts once the mic is ready, if it isn't yet
+        if self.wake_word:
+            self.add_system('Hands-free mode on. Say "hey Evo", pause, then talk.')
+        else:
+            self.add_system("Hands-free mode off.")
+        self.persist()
+
+    def _wake_failed(self, error: str):
+        # The service couldn't start the detector (needs NumPy + recorded samples, see evo_wake.py)
+        self.wake_var.set(False)
+        self.wake_word = False
+        self.add_system(f"Hands-free mode unavailable: {error}")
+        self.persist()
+
     # -------------------------
     # Chat UI helpers
     # -------------------------
@@ -370,6 +692,20 @@ class EvoProApp:
         # Updates sidebar status label (Ready / Listening / Thinking etc.)
         self.status_var.set(text)
 
+    def post_status(self, text: str):
+        # Thread-safe set_status. Several in one frame -> only the last one is drawn.
+        self.ui.post(self.set_status, text, key="status")
+
+    def set_busy(self, busy: bool):
+        # Disables Send + Mic while a reply is on its way
+        state = "disabled" if busy else "normal"
+        self.send_btn.configure(state=state)
+        self.mic_btn.configure(state=state)
+
+    def post_busy(self, busy: bool):
+        # Thread-safe set_busy (coalesced like post_status)
+        self.ui.post(self.set_busy, busy, key="busy")
+
     def add_system(self, text: str):
         # Adds a system message to the chat feed and memory log
         self._add_msg("system", text)
@@ -384,98 +720,224 @@ class EvoProApp:
 
     def _add_msg(self, sender: str, text: str):
         # Core message renderer:
-        # 1) Store in self.messages
-        # 2) Create a visual bubble/label in the UI
+        # 1) Store in self.messages (+ history database for user/evo messages)
+        # 2) Hand it to the chat feed (it builds a bubble only if it's on screen)
         text = (text or "").strip()
         if not text:
             return
         msg = Msg(sender=sender, text=text, ts=now_ts())
+        self._show_msg(msg)
+        if sender != "system":
+            self.history.append(sender, text, msg.ts)  # Queued; written in the background
+
+    def _show_msg(self, msg: Msg):
+        # Adds a message to the end of the view without saving it
+        self.chat_index.add(msg.text, self.first_key + len(self.messages))  # Keep search index in sync
         self.messages.append(msg)
+        self.chat_feed.append(msg)                  # System = italic line, user = right bubble, evo = left bubble
 
-        # System messages appear as italic text (not a bubble)
-        if sender == "system":
-            lbl = ctk.CTkLabel(
-                self.chat_feed,
-                text=f"[{msg.ts}] {text}",
-                font=("Segoe UI", 11, "italic"),
-                text_color="#9ca3af",
-                wraplength=780,
-                justify="left",
-            )
-            lbl.pack(anchor="w", padx=14, pady=(10, 6))
-            return
+    def _msg_from_row(self, row) -> Msg:
+        # History database row -> Msg
+        msg_id, _session, sender, text, ts, _created = row
+        return Msg(sender=sender, text=text, ts=ts, id=msg_id)
 
-        # Different colors and alignment for user vs evo messages
-        bubble_color = "#2563eb" if sender == "user" else "#111827"
-        text_color = "#ffffff" if sender == "user" else "#e5e7eb"
-        anchor = "e" if sender == "user" else "w"  # user right, evo left
-
-        # Bubble = a frame with timestamp and text inside
-        bubble = ctk.CTkFrame(self.chat_feed, corner_radius=14, fg_color=bubble_color)
-        t = ctk.CTkLabel(bubble, text=msg.ts, font=("Segoe UI", 10), text_color=text_color)
-        b = ctk.CTkLabel(
-            bubble,
-            text=text,
-            font=("Segoe UI", 12),
-            text_color=text_color,
-            wraplength=760,
-            justify="left",
-        )
-        t.pack(anchor="w", padx=12, pady=(8, 0))
-        b.pack(anchor="w", padx=12, pady=(2, 10))
-        bubble.pack(anchor=anchor, padx=14, pady=6)
-        self.chat_feed.update_idletasks()  # Refresh UI layout
+    def load_older(self):
+        # Called by the chat feed when scrolled to the very top: fetch the previous page in background
+        if self._loading_older or self._history_exhausted or not self.messages or self.messages[0].id is None:
+            return  # Already loading, nothing older, or the view doesn't start at saved history (e.g. after clear)
+        self._loading_older = True
+        oldest = self.messages[0].id
+
+        def worker():
+            try:
+                rows = self.history.before(oldest)
+            except Exception as e:
+                rows = []
+                self.ui.post(self.set_status, f"History error: {e}")
+            self.ui.post(self._prepend_rows, rows, oldest)
+
+        threading.Thread(target=worker, daemon=True).start()
+
+    def _prepend_rows(self, rows, oldest: int):
+        # Puts an older page above what's loaded (keeps the scroll position)
+        self._loading_older = False
+        if not self.messages or self.messages[0].id != oldest:
+            return  # The view changed while loading
+        if not rows:
+            self._history_exhausted = True
+            return
+        msgs = [self._msg_from_row(r) for r in rows]
+        for i, m in enumerate(msgs):
+            self.chat_index.add(m.text, self.first_key - len(msgs) + i)
+        self.first_key -= len(msgs)
+        self.messages[:0] = msgs
+        self.chat_feed.prepend(msgs)
 
     def clear_chat_view(self):
         # Clears the visible chat and the local message list
         # NOTE: It does NOT reset Gemini memory (that's reset_memory)
         self.messages.clear()
-        for w in self.chat_feed.winfo_children():
-            w.destroy()
+        self.chat_index.clear()
+        self.first_key = 0
+        self.search_state = None
+        self.search_key = None
+        self.search_pos = -1
+        self.chat_feed.clear()                      # Recycles the few visible rows, no per-message destroy
         self.add_system("Chat view cleared (memory not reset).")
 
-    def export_chat_text(self) -> str:
-        # Converts all messages into a plain text format for saving
-        lines = []
-        for m in self.messages:
-            who = "You" if m.sender == "user" else ("Evo" if m.sender == "evo" else "System")
-            lines.append(f"[{m.ts}] {who}: {m.text}")
-        return "\n".join(lines) + "\n"
-
     def save_chat(self):
-        # Saves chat to a text file chosen via save dialog
-        if not self.messages:
+        # Exports the whole saved history (not just what's on screen) in the background.
+        # Format comes from the file name: .md / .jsonl / .html / .txt, optionally + .gz
+        # Each chat session gets its own header, so old chats don't run into each other.
+        if not self.messages and self.history.count() == 0:  # On-screen messages may still be queued
             messagebox.showinfo("Save", "Nothing to save.")
             return
-        path = filedialog.asksaveasfilename(defaultextension=".txt", filetypes=[("Text file", "*.txt")])
+        if self._exporting:
+            messagebox.showinfo("Save", "An export is already running.")
+            return
+        path = filedialog.asksaveasfilename(defaultextension=".md", filetypes=EXPORT_FILETYPES)
         if not path:
             return
-        with open(path, "w", encoding="utf-8") as f:
-            f.write(self.export_chat_text())
-        messagebox.showinfo("Saved", f"Saved chat to:\n{path}")
+
+        self._exporting = True
+        self.save_btn.configure(state="disabled")
+        self.set_status("Exporting...")
+
+        total = [None]                              # Counted in the export thread, after the flush
+
+        def rows():
+            self.history.flush()                    # Make sure the latest messages are on disk
+            total[0] = self.history.count()
+            for _id, session, sender, text, ts, _created in self.history.iter_all():
+                yield sender, text, ts, session
+
+        def progress(done, _total):
+            self.post_status(progress_text(done, total[0]))
+
+        def done(count, error):
+            def finish():
+                self._exporting = False
+                self.save_btn.configure(state="normal")
+                self.set_status("Ready")
+                if error:
+                    messagebox.showerror("Save", f"Export failed:\n{error}")
+                else:
+                    messagebox.showinfo("Saved", f"Saved {count:,} messages to:\n{path}")
+            self.ui.post(finish)
+
+        start_export(rows(), path, progress=progress, done=done)
 
     def search_chat(self):
-        # Searches the in-memory message list for a substring
-        q = (self.search_entry.get() or "").strip().lower()
+        # Searches this chat using the incremental index and jumps to the first hit
+        q = (self.search_entry.get() or "").strip()
         if not q:
             self.search_result.configure(text="Type something to search.")
             return
 
-        hits = 0
-        last_hit: Optional[Msg] = None
-        for m in self.messages:
-            if q in m.text.lower():
-                hits += 1
-                last_hit = m
+        # Old chats on disk go through the full-text index instead
+        if self.search_history_var.get():
+            self.search_history(q)
+            return
 
-        if hits == 0:
+        if self._run_search(q):
+            self.search_pos = -1
+            self.search_step(1)
+
+    def _run_search(self, q: str) -> bool:
+        # Runs (or re-uses) the search for q. Returns False if there is nothing to show.
+        regex = bool(self.search_regex_var.get())
+        key = (q, regex, len(self.chat_index))
+        if key == self.search_key and self.search_state is not None:
+            return bool(self.search_state.ids)
+
+        try:
+            self.search_state = self.chat_index.search(q, regex=regex)
+        except re.error as e:
+            self.search_state = None
+            self.search_key = None
+            self.search_result.configure(text=f"Bad regex: {e}")
+            return False
+
+        self.search_key = key
+        if not self.search_state.ids:
+            self.chat_feed.mark(None)
             self.search_result.configure(text="No matches.")
+            return False
+        return True
+
+    def search_step(self, step: int):
+        # Moves to the next (+1) or previous (-1) hit, wrapping around
+        q = (self.search_entry.get() or "").strip()
+        if not q or self.search_history_var.get():
+            return
+        if self.search_key is None or self.search_key[:2] != (q, bool(self.search_regex_var.get())):
+            self.search_pos = -1                    # Query changed: start over
+        if not self._run_search(q):
             return
 
-        if last_hit:
-            self.search_result.configure(text=f"Matches: {hits}. Last at {last_hit.ts} ({last_hit.sender}).")
-        else:
-            self.search_result.configure(text=f"Matches: {hits}.")
+        ids = self.search_state.ids
+        self.search_pos = (self.search_pos + step) % len(ids)
+        pos = ids[self.search_pos] - self.first_key  # Index id -> position in self.messages
+        m = self.messages[pos]
+
+        # Show "n/total" + a short excerpt with the match marked like «this»
+        spans = self.search_state.spans(m.text)
+        label = "Similar" if self.search_state.fuzzy else "Match"
+        self.search_result.configure(
+            text=f"{label} {self.search_pos + 1}/{len(ids)} at {m.ts} ({m.sender}):\n{self._excerpt(m.text, spans)}"
+        )
+
+        self.chat_feed.mark(pos)                    # Orange outline on the hit
+        self.chat_feed.scroll_to(pos)
+
+    def _excerpt(self, text: str, spans, width: int = 70) -> str:
+        # Short piece of text around the first match, with matches wrapped in « »
+        if not spans:
+            return text[:width] + ("..." if len(text) > width else "")
+        start = max(0, spans[0][0] - width // 3)
+        end = min(len(text), start + width)
+        out, pos = [], start
+        for a, b in spans:
+            if b <= start or a >= end:
+                continue
+            a, b = max(a, start), min(b, end)
+            out.append(text[pos:a] + "«" + text[a:b] + "»")
+            pos = b
+        out.append(text[pos:end])
+        piece = "".join(out).replace("\n", " ")
+        return ("..." if start > 0 else "") + piece + ("..." if end < len(text) else "")
+
+    def search_history(self, q: str):
+        # Searches logs/ + sessions/ using the on-disk index (runs in background).
+        # Supports: plain words (all must match), "exact phrase", prefix*
+        self.search_result.configure(text="Searching old chats...")
+
+        def worker():
+            try:
+                if self.log_index is None:
+                    self.log_index = LogIndex()
+                t0 = time.perf_counter()
+                self.log_index.refresh()              # Only re-reads files that changed
+                hits = self.log_index.search(q, limit=5)
+                ms = (time.perf_counter() - t0) * 1000
+            except Exception as e:
+                err = f"Search error: {e}"
+                self.ui.post(lambda: self.search_result.configure(text=err))
+                return
+
+            def show():
+                if not hits:
+                    self.search_result.configure(text=f"No matches in old chats ({ms:.0f} ms).")
+                    return
+                self.search_result.configure(text=f"Old chats: {len(hits)} file(s) ({ms:.0f} ms).")
+                lines = [f"History search: {q}"]
+                for h in hits:
+                    lines.append(f"- {os.path.basename(h.path)}: {h.snippet}")
+                self.add_system("\n".join(lines))
+
+            self.ui.post(show)
+
+        threading.Thread(target=worker, daemon=True).start()
 
     # -------------------------
     # Model + Role
@@ -485,7 +947,14 @@ class EvoProApp:
     def reset_memory(self):
         # Creates a fresh Gemini chat session (clears model conversation memory)
         self.model_id = self.model_var.get()
-        self.chat = self.client.chats.create(model=self.model_id)
+        if self.sessions is None:
+            return  # Still starting up: _init_engines creates the chat for self.model_id
+        self.chat = self.sessions.take(self.model_id)  # Spare session: no wait
+
+    def _warm_connection(self, event=None):
+        # Cheap to call on every key: SessionPool skips it if the connection is still fresh
+        if self.sessions is not None:
+            self.sessions.warm(self.model_var.get())
 
     def apply_role(self):
         # Reads role text from textbox, resets memory, and saves settings
@@ -496,7 +965,9 @@ class EvoProApp:
 
     def new_chat(self):
         # Starts a fresh chat: resets model memory + clears UI messages + saves settings
+        self.stop_speaking()
         self.reset_memory()
+        self.history.new_session()                  # Later messages are tagged as a new session
         self.clear_chat_view()
         self.add_system("New chat started.")
         self.persist()
@@ -517,93 +988,168 @@ class EvoProApp:
     def toggle_speak(self):
         # Turn speech on/off and persist the setting
         self.speak_enabled = not self.speak_enabled
+        if not self.speak_enabled:
+            self.stop_speaking()
         self.speak_btn.configure(text=("Speak: ON" if self.speak_enabled else "Speak: OFF"))
         self.persist()
 
     def speak(self, text: str):
-        # Speaks text in a background thread so UI stays responsive
+        # Queues text on the TTS thread (returns immediately, speaks sentence by sentence)
         if not self.speak_enabled:
             return
         text = (text or "").strip()
-        if not text:
-            return
-
-        def worker():
-            try:
-                self.tts.say(text)
-                self.tts.runAndWait()
-            except Exception:
-                pass
+        if text:
+            self.tts.say(text)
+
+    def stop_speaking(self):
+        # Cuts off the current sentence and drops the rest (Esc / "stop talking")
+        self.tts.stop()
+        self._finish_speech_trace("interrupted")
+
+    def _on_speech_start(self, turn: int):
+        # TTS thread: a sentence started playing. Closes the voice turn whose reply this is.
+        pending = self._speech_trace
+        if pending is not None and pending[0] == turn:
+            trace = pending[1]
+            trace.stop("speech")
+            trace.stop("total")
+            self._finish_speech_trace("spoken")
+
+    def _finish_speech_trace(self, outcome: str):
+        pending, self._speech_trace = self._speech_trace, None
+        if pending is not None:
+            pending[1].finish(outcome)
+
+    def voice_input(self, after_wake: bool = False, source: str = "mic"):
+        # Records + transcribes in the audio service (see evo_audio_service), handles voice commands,
+        # and optionally auto-sends the message.
+        # after_wake: started by "hey Evo" -> no pre-roll, so the wake word itself isn't transcribed
+        # source: what started the turn ("mic" / "wake" / "barge"), for the latency trace
+        if self.voice_busy.is_set():
+            return  # Already listening
+        self.voice_busy.set()
+        trace = self.latency.new_turn("wake" if after_wake else source)
+
+        def on_progress(name: str, ev: dict):
+            # Events from the audio service while it records + transcribes
+            if name == "calibrated":
+                trace.stop("calibration")
+                trace.start("listen")
+                self.post_status("Listening...")
+            elif name == "partial":
+                # Local backends: show the words in the entry box while the user talks
+                self.ui.post(self._show_partial, ev.get("text", ""), key="partial")
+            elif name == "listened":
+                trace.stop("listen")
+                trace.start("total")                # End of the user's speech -> Evo talking
+                trace.start("transcribe")
+                self.post_status("Transcribing...")
 
-        threading.Thread(target=worker, daemon=True).start()
-
-    def voice_input(self):
-        # Records from microphone, transcribes using Google speech recognition,
-        # handles voice commands, and optionally auto-sends the message.
         def worker():
             try:
-                self.set_status("Listening...")
-                with sr.Microphone() as source:
-                    self.recognizer.adjust_for_ambient_noise(source, duration=0.5)
-                    audio = self.recognizer.listen(source, timeout=6, phrase_time_limit=10)
+                with trace.span("mic"):
+                    if not self._wait_engine(self.stt_ready, "stt"):
+                        raise RuntimeError(self.engine_errors.get("stt", "speech recognition is still loading"))
+                trace.start("calibration")
+                # The service records, spots commands and transcribes (segments while the user talks)
+                text, cmd = self.audio.listen(after_wake, on_progress)
+                trace.stop("transcribe")
+
+                # Known command spotted locally: run it (no transcription was needed)
+                if cmd and self._handle_voice_command(cmd):
+                    trace.finish("command")
+                    self.ui.post(self._show_partial, "", key="partial")
+                    self.post_status("Ready")
+                    return
 
-                self.set_status("Transcribing...")
-                text = self.recognizer.recognize_google(audio)
-                text = (text or "").strip()
+                text = text.strip()
 
-                self.app.after(0, lambda: self.set_status("Ready"))
+                self.post_status("Ready")
 
                 if not text:
-                    self.app.after(0, lambda: self.add_system("Voice: no speech detected."))
+                    trace.finish("no_speech")
+                    self.ui.post(self.add_system, "Voice: no speech detected.")
+                    self.speak(SPOKEN["no_speech"])
                     return
 
-                # Convert speech to a consistent format so commands match
-                cmd = normalize_voice_command(text)
+                # Commands that came back from transcription ("knew chat" still counts)
+                cmd = self.commands.match(text) or normalize_voice_command(text)
                 if self._handle_voice_command(cmd):
+                    trace.finish("command")
+                    self.ui.post(self._show_partial, "", key="partial")
                     return  # If it was a command, don't treat it as a chat message
 
-                # Insert transcribed text into input box
-                def fill():
-                    self.entry.delete(0, "end")
-                    self.entry.insert(0, text)
+                # Insert transcribed text into input box (replaces any partial text)
+                self.ui.post(self._show_partial, text, key="partial")
 
-                self.app.after(0, fill)
-
-                # Auto-send if enabled
+                # Auto-send if enabled (the trace continues in send_message)
                 if self.mic_auto_send:
-                    self.app.after(0, self.send_message)
+                    self._voice_trace = trace
+                    self.ui.post(self.send_message)
+                else:
+                    trace.finish("transcribed")
 
             except Exception as e:
                 # If anything fails (mic not found, timeout, etc.), show in system chat
-                self.app.after(0, lambda: self.set_status("Ready"))
-                self.app.after(0, lambda: self.add_system(f"Voice error: {e}"))
+                trace.finish("error")
+                self.post_status("Ready")
+                self.ui.post(self.add_system, f"Voice error: {e}")
+            finally:
+                self.voice_busy.clear()
 
         threading.Thread(target=worker, daemon=True).start()
 
+    def _on_barge_in(self):
+        # Audio service: the user started talking while Evo was speaking (it already went quiet)
+        self.stop_speaking()
+        if not self.voice_busy.is_set():
+            self.post_status("Listening...")
+            self.ui.post(self.voice_input, False, "barge")  # Pre-roll keeps the words that triggered this
+
+    def _on_wake(self):
+        # Audio service: wake word heard
+        if self.voice_busy.is_set() or self.tts.speaking.is_set():
+            return  # Already listening, or it heard Evo's own voice
+        self.post_status("Wake word heard")
+        self.ui.post(self.voice_input, True)
+
+    def _show_partial(self, text: str):
+        # Puts (partial) transcribed text into the input box
+        self.entry.delete(0, "end")
+        self.entry.insert(0, text)
+
     def _handle_voice_command(self, cmd: str) -> bool:
         # Matches normalized spoken text to known commands and runs the action.
         if cmd in {"clear chat", "clear"}:
-            self.app.after(0, self.clear_chat_view)
-            self.app.after(0, lambda: self.add_system("Voice command: cleared chat view."))
+            self.ui.post(self.clear_chat_view)
+            self.ui.post(self.add_system, "Voice command: cleared chat view.")
+            self.speak(SPOKEN["clear"])
             return True
 
         if cmd in {"new chat", "new"}:
-            self.app.after(0, self.new_chat)
-            self.app.after(0, lambda: self.add_system("Voice command: new chat."))
+            self.ui.post(self.new_chat)
+            self.ui.post(self.add_system, "Voice command: new chat.")
+            self.ui.post(self.speak, SPOKEN["new"])  # After new_chat (it stops any speech)
             return True
 
         if cmd in {"save chat", "save"}:
-            self.app.after(0, self.save_chat)
-            self.app.after(0, lambda: self.add_system("Voice command: save chat."))
+            self.ui.post(self.save_chat)
+            self.ui.post(self.add_system, "Voice command: save chat.")
+            self.speak(SPOKEN["save"])
             return True
 
         if cmd in {"toggle speak", "toggle speech", "toggle voice"}:
-            self.app.after(0, self.toggle_speak)
-            self.app.after(0, lambda: self.add_system("Voice command: toggled speak."))
+            self.ui.post(self.toggle_speak)
+            self.ui.post(self.add_system, "Voice command: toggled speak.")
+            return True
+
+        if cmd in {"stop talking", "stop speaking", "stop", "be quiet"}:
+            self.stop_speaking()
             return True
 
         if cmd in {"help commands", "help"}:
-            self.app.after(0, lambda: self.add_system(VOICE_COMMANDS_HELP))
+            self.ui.post(self.add_system, VOICE_COMMANDS_HELP)
+            self.speak(SPOKEN["help"])
             return True
 
         return False  # Not a known command
@@ -659,6 +1205,7 @@ class EvoProApp:
         # -------------------------
         self.entry.delete(0, "end")   # Clear input box
         self.add_user(user_text)      # Show user bubble in UI
+        trace, self._voice_trace = self._voice_trace, None  # Set if this came from auto-sent voice
 
         # If user changed model in the dropdown, reset chat memory for the new model
         selected_model = self.model_var.get()
@@ -669,37 +1216,65 @@ class EvoProApp:
             self.persist()
 
         # Update UI to "busy" state while model responds
+        self.stop_speaking()          # A new question interrupts the old answer
         self.set_status("Thinking...")
-        self.send_btn.configure(state="disabled")
-        self.mic_btn.configure(state="disabled")
+        self.set_busy(True)
 
         def worker():
             try:
+                if not self._wait_engine(self.client_ready, "gemini"):
+                    raise RuntimeError(self.engine_errors.get("gemini", "Gemini client is still loading"))
+
                 # Construct prompt: role + user message
                 prompt = f"ROLE:\n{self.role_text}\n\nUSER:\n{user_text}"
 
-                # Send message to Gemini chat session (keeps conversation memory)
-                resp = self.chat.send_message(prompt)
-                reply = (resp.text or "").strip() or "(no response)"
-
-                # Push UI updates back onto main UI thread using app.after
-                self.app.after(0, lambda: self.add_evo(reply))
-                self.app.after(0, lambda: self.set_status("Ready"))
-                self.app.after(0, lambda: self.send_btn.configure(state="normal"))
-                self.app.after(0, lambda: self.mic_btn.configure(state="normal"))
-
-                # Optional: speak reply aloud
-                self.speak(reply)
+                # Stream the reply from the Gemini chat session (keeps conversation memory).
+                # Each finished sentence goes to the TTS thread right away, so speech
+                # starts after the first sentence instead of after the whole reply.
+                speak = self.speak_enabled
+                turn = self.tts.begin()             # stop() (Esc, barge-in) drops the rest of this reply
+                if trace is not None:
+                    trace.start("model")
+                    trace.start("reply")
+                    if speak:
+                        self._speech_trace = (turn, trace)  # Finished by _on_speech_start
+                parts = []
+                for chunk in self.chat.send_message_stream(prompt):
+                    piece = chunk.text or ""
+                    if not parts:
+                        self.post_status("Replying...")
+                        if trace is not None:
+                            trace.stop("model")
+                            trace.start("speech")
+                    parts.append(piece)
+                    if speak:
+                        self.tts.feed(piece, turn)
+                if speak:
+                    self.tts.end(turn)
+                reply = "".join(parts).strip() or "(no response)"
+                if trace is not None:
+                    trace.stop("reply")
+                    if not speak:
+                        trace.stop("total")     # Nothing to say out loud: the reply is the answer
+                        trace.finish("replied")
+
+                # Push UI updates back onto the UI thread (drained once per frame)
+                self.ui.post(self.add_evo, reply)
+                self.post_status("Ready")
+                self.post_busy(False)
 
             except Exception as e:
                 # Convert exception into user-friendly message
                 msg = str(e)
+                if trace is not None:
+                    self._speech_trace = None
+                    trace.finish("error")
                 if "RESOURCE_EXHAUSTED" in msg or "429" in msg:
-                    msg = "Rate limit hit. Wait a bit and try again."
-                self.app.after(0, lambda: self.add_system(f"Error: {msg}"))
-                self.app.after(0, lambda: self.set_status("Ready"))
-                self.app.after(0, lambda: self.send_btn.configure(state="normal"))
-                self.app.after(0, lambda: self.mic_btn.configure(state="normal"))
+                    msg = SPOKEN["rate_limit"]
+                    self.speak(msg)
+                self.ui.post(self.add_system, f"Error: {msg}")
+                self.post_status("Ready")
+                self.post_busy(False)
 
         # Run the model call in background so UI stays responsive
         threading.Thread(target=worker, daemon=True).start()
@@ -710,8 +1285,18 @@ class EvoProApp:
     # Starts the Tkinter event loop (keeps the window open and responsive).
 
     def run(self):
+        self.app.protocol("WM_DELETE_WINDOW", self.on_close)
         self.app.mainloop()
 
+    def on_close(self):
+        # Finish writing history before the window goes away
+        self.ui.stop()
+        self.settings_writer.flush()
+        self.history.close()
+        self.latency.close()
+        self.audio.close()                          # Stops TTS, mic, wake word (the whole process)
+        self.app.destroy()
+
 
 # =========================
 # Script entry point
@@ -5,6 +5,8 @@ from google import genai
 import customtkinter as ctk
 from tkinter import filedialog, messagebox
 
+from evo_export import start_export, progress_text, FILETYPES
+
 load_dotenv()
 
 api_key = os.getenv("GEMINI_API_KEY")
@@ -82,16 +84,27 @@ def save_chat():
 
     path = filedialog.asksaveasfilename(
         defaultextension=".txt",
-        filetypes=[("Text files", "*.txt")]
+        filetypes=[("Text files", "*.txt")] + FILETYPES
     )
     if not path:
         return
 
-    with open(path, "w", encoding="utf-8") as f:
-        for s, t in chat_lines:
-            f.write(f"{s}: {t}\n")
+    # Write in the background; format comes from the extension (.gz = gzip)
+    rows = [(s, t, "") for s, t in chat_lines]
+
+    def progress(done, total):
+        app.after(0, lambda: status_var.set(progress_text(done, total)))
+
+    def done(count, error):
+        def finish():
+            status_var.set("Ready")
+            if error:
+                messagebox.showerror("Save", f"Export failed:\n{error}")
+            else:
+                messagebox.showinfo("Save", f"Saved to:\n{path}")
+        app.after(0, finish)
 
-    messagebox.showinfo("Save", f"Saved to:\n{path}")
+    start_export(rows, path, total=len(rows), progress=progress, done=done)
 
 def apply_role():
     global EVO_ROLE
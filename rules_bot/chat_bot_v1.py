@@ -5,8 +5,9 @@
 # Block: read environment variables
 import os
 
-# Block: import the NEW SDK client
-from google import genai
+# Block: import the client helper (uses the warm local gateway if it's running,
+# otherwise the NEW SDK client; see evo_gateway.py)
+from evo_gateway import gemini_client
 
 # Block: check API key exists
 api_key = os.getenv("GEMINI_API_KEY")
@@ -14,7 +15,7 @@ if not api_key:
     raise RuntimeError("GEMINI_API_KEY is not set. Set it in PowerShell first.")
 
 # Block: create a client for the Gemini Developer API (API key auth)
-client = genai.Client(api_key=api_key)
+client = gemini_client(api_key)
 
 # Block: choose a model that exists on your account (from your ListModels output)
 MODEL = "models/gemini-flash-latest"
@@ -0,0 +1,459 @@
+# =========================
+# Evo Audio (persistent mic)
+# =========================
+# Keeps the microphone open in the background so "Mic" can start capturing at once.
+#
+# - One capture thread reads the mic in small chunks, all the time.
+# - The noise floor is measured once at start (CALIBRATE_SECONDS), then follows
+#   the room slowly: every quiet chunk nudges it (ADAPT).
+# - The last RING_SECONDS of audio are kept in a ring buffer. listen() starts
+#   with a short pre-roll from it, so the first syllable isn't cut off even if
+#   speech started right as the button was pressed.
+# - If the device fails (unplugged, driver hiccup), it's reopened after REOPEN_WAIT.
+#
+# Voice activity detection (Vad, needs NumPy; plain energy threshold without it):
+# - Each chunk is cut into 20 ms frames. A frame is speech when it's above the
+#   noise threshold AND its zero-crossing rate looks like a voice (hiss, fans and
+#   keyboard clicks cross zero far more often). Very loud frames always count.
+# - A chunk is speech when enough of its frames are.
+# - listen() cuts the phrase into segments at short pauses and hands each one to
+#   on_segment as soon as it closes, so transcription of the start runs while the
+#   user is still talking. The phrase ends after PAUSE_SECONDS without speech.
+#
+# listen() returns speech_recognition.AudioData and raises sr.WaitTimeoutError,
+# same as Recognizer.listen, so the callers' recognize/except code stays the same.
+
+import math
+import time
+import queue
+import threading
+from array import array
+from collections import deque
+from typing import Callable, List, Optional, Tuple
+
+try:
+    import audioop  # Fast RMS (removed from the stdlib in 3.13; the audioop-lts package brings it back)
+except ImportError:
+    audioop = None
+
+try:
+    import numpy as np  # Vectorized VAD features
+except ImportError:
+    np = None
+
+
+RING_SECONDS = 10.0       # Recent audio kept in memory
+PRE_ROLL = 0.4            # Seconds of audio before the speech start that listen() keeps
+CALIBRATE_SECONDS = 0.5   # One-time noise measurement at startup
+PAUSE_SECONDS = 0.7       # Silence that ends a phrase
+SEGMENT_PAUSE = 0.25      # Shorter pause that closes a segment (the phrase goes on)
+MIN_SEGMENT = 1.0         # Don't close segments shorter than this (too little context for STT)
+TRAIL_KEEP = 0.2          # Silence kept at the end of a phrase (the rest isn't uploaded)
+THRESHOLD_RATIO = 2.0     # Speech = energy above noise floor * this
+MIN_THRESHOLD = 60.0      # Never go below this (digital silence would make any click "speech")
+ADAPT = 0.05              # How fast the noise floor follows quiet chunks (0..1, per chunk)
+REOPEN_WAIT = 2.0         # Seconds before retrying a failed device
+
+VAD_FRAME_MS = 20         # Frame length for the zero-crossing check
+ZCR_MAX = 0.25            # Zero crossings per sample above this = noise, not voice
+LOUD_RATIO = 10.0         # Frames this far above the threshold are speech whatever their ZCR
+SPEECH_FRACTION = 0.3     # Share of speech frames that makes a chunk speech
+
+Chunk = Tuple[bytes, float, bool]  # (raw PCM, RMS energy, is speech)
+
+
+def rms(data: bytes, width: int = 2) -> float:
+    # Root-mean-square energy of 16-bit PCM, same scale as recognizer.energy_threshold
+    if audioop is not None:
+        return float(audioop.rms(data, width))
+    samples = array("h", data[: len(data) // 2 * 2])
+    if not samples:
+        return 0.0
+    return math.sqrt(sum(s * s for s in samples) / len(samples))
+
+
+class Vad:
+    # Energy + zero-crossing voice activity detector for 16-bit mono PCM
+    def __init__(self, rate: int):
+        self.frame = max(1, int(rate * VAD_FRAME_MS / 1000))
+
+    def features(self, data: bytes):
+        # Per-frame (rms, zcr) arrays
+        x = np.frombuffer(data[: len(data) // 2 * 2], dtype="<i2").astype(np.float32)
+        n = len(x) // self.frame
+        if n == 0:
+            return np.zeros(0, np.float32), np.zeros(0, np.float32)
+        frames = x[: n * self.frame].reshape(n, self.frame)
+        energy = np.sqrt(np.mean(frames * frames, axis=1))
+        signs = np.signbit(frames)
+        zcr = np.count_nonzero(signs[:, 1:] != signs[:, :-1], axis=1) / float(self.frame)
+        return energy, zcr
+
+    def is_speech(self, data: bytes, threshold: float) -> bool:
+        energy, zcr = self.features(data)
+        if not len(energy):
+            return False
+        voiced = (energy > threshold) & ((zcr < ZCR_MAX) | (energy > threshold * LOUD_RATIO))
+        return float(np.mean(voiced)) >= SPEECH_FRACTION
+
+
+class MicStream:
+    def __init__(self, sr, device_index: Optional[int] = None):
+        # sr: the speech_recognition module (passed in so importing this file stays cheap)
+        self.sr = sr
+        self.device_index = device_index
+        self.rate = 16000
+        self.width = 2
+        self.chunk = 1024
+        self.noise: Optional[float] = None    # Noise floor (RMS)
+        self.threshold = 300.0                # Speech threshold, follows the noise floor
+        self.error: Optional[Exception] = None
+        self.calibrated = threading.Event()   # Set after the first CALIBRATE_SECONDS of audio
+        self._ring: deque = deque()
+        self._ring_max = 0
+        self.vad: Optional[Vad] = None         # Set once the sample rate is known (None without NumPy)
+        self._calib: List[float] = []
+        self._subs: List[queue.Queue] = []
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    # -------------------------
+    # Lifecycle
+    # -------------------------
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+
+    def close(self):
+        self._stop.set()
+
+    def seconds(self, n_chunks: int) -> float:
+        return n_chunks * self.chunk / float(self.rate)
+
+    def chunks_for(self, seconds: float) -> int:
+        return max(1, int(seconds * self.rate / self.chunk))
+
+    def _run(self):
+        while not self._stop.is_set():
+            mic = None
+            try:
+                mic = self.sr.Microphone(device_index=self.device_index)
+                mic.__enter__()
+                self.rate, self.width, self.chunk = mic.SAMPLE_RATE, mic.SAMPLE_WIDTH, mic.CHUNK
+                self._ring_max = self.chunks_for(RING_SECONDS)
+                self.vad = Vad(self.rate) if np is not None and self.width == 2 else None
+                self.error = None
+                while not self._stop.is_set():
+                    data = mic.stream.read(self.chunk)
+                    self._feed(data, rms(data, self.width))
+            except Exception as e:
+                self.error = e
+                self._stop.wait(REOPEN_WAIT)
+            finally:
+                if mic is not None and mic.stream is not None:
+                    try:
+                        mic.__exit__(None, None, None)
+                    except Exception:
+                        pass
+
+    def _feed(self, data: bytes, energy: float):
+        if self.vad is not None and self.calibrated.is_set():
+            speech = self.vad.is_speech(data, self.threshold)
+        else:
+            speech = self.calibrated.is_set() and energy > self.threshold
+        chunk = (data, energy, speech)
+        with self._lock:
+            self._ring.append(chunk)
+            while len(self._ring) > self._ring_max:
+                self._ring.popleft()
+            subs = list(self._subs)
+
+        if not self.calibrated.is_set():
+            self._calib.append(energy)
+            if len(self._calib) >= self.chunks_for(CALIBRATE_SECONDS):
+                self.noise = sum(self._calib) / len(self._calib)
+                self.threshold = max(MIN_THRESHOLD, self.noise * THRESHOLD_RATIO)
+                self.calibrated.set()
+        elif not speech and energy < self.threshold * LOUD_RATIO:
+            # Not speech: let the noise floor drift towards it (fan turned on, window opened...)
+            self.noise += (energy - self.noise) * ADAPT
+            self.threshold = max(MIN_THRESHOLD, self.noise * THRESHOLD_RATIO)
+
+        for q in subs:
+            q.put(chunk)
+
+    # -------------------------
+    # Reading
+    # -------------------------
+
+    def subscribe(self, pre_roll: float = 0.0) -> Tuple["queue.Queue[Chunk]", List[Chunk]]:
+        # Live chunks from now on + the last pre_roll seconds from the ring buffer
+        q: "queue.Queue[Chunk]" = queue.Queue()
+        with self._lock:
+            n = self.chunks_for(pre_roll) if pre_roll > 0 else 0
+            recent = list(self._ring)[-n:] if n else []
+            self._subs.append(q)
+        return q, recent
+
+    def unsubscribe(self, q: queue.Queue):
+        with self._lock:
+            if q in self._subs:
+                self._subs.remove(q)
+
+    def recent(self, seconds: float) -> bytes:
+        # Raw PCM of the last `seconds` of audio
+        n = self.chunks_for(seconds)
+        with self._lock:
+            return b"".join(c[0] for c in list(self._ring)[-n:])
+
+    def wait_calibrated(self) -> bool:
+        # Blocks until the noise floor is measured (first use only); False = mic not working
+        return self.calibrated.wait(REOPEN_WAIT + CALIBRATE_SECONDS + 1)
+
+    def listen(
+        self,
+        timeout: Optional[float] = None,
+        phrase_time_limit: Optional[float] = None,
+        on_audio: Optional[Callable[[bytes], None]] = None,
+        on_segment: Optional[Callable[[object], None]] = None,
+        pre_roll: float = PRE_ROLL,
+    ):
+        # Waits for speech, records until a pause, returns sr.AudioData.
+        # on_audio(pcm) gets every piece of the phrase as it's recorded (for streaming STT).
+        # on_segment(AudioData) gets each segment as soon as it closes; together the
+        # segments cover the whole returned phrase, in order.
+        if not self.wait_calibrated():
+            raise self.error or RuntimeError("Microphone is not available")
+
+        q, recent = self.subscribe(pre_roll)
+        pre = deque(recent, maxlen=self.chunks_for(pre_roll) if pre_roll > 0 else 1)
+        frames: List[bytes] = []
+        seg_start = 0            # Index in frames where the open segment starts
+        last_speech = 0          # Index in frames just after the last speech chunk
+        started = False
+        waited = spoken = silent = 0.0
+        step = self.seconds(1)
+
+        def begin():
+            frames.extend(c[0] for c in pre)
+            if on_audio:
+                on_audio(b"".join(frames))
+
+        def close_segment(end: int):
+            nonlocal seg_start
+            if on_segment and end > seg_start:
+                on_segment(self.sr.AudioData(b"".join(frames[seg_start:end]), self.rate, self.width))
+            seg_start = end
+
+        try:
+            # Speech already in the pre-roll = user was talking when Mic was pressed
+            if any(c[2] for c in pre):
+                started = True
+                begin()
+                last_speech = len(frames)
+            while True:
+                try:
+                    data, _energy, speech = q.get(timeout=max(step * 4, 0.5))
+                except queue.Empty:
+                    raise self.error or RuntimeError("Microphone stopped delivering audio")
+
+                if not started:
+                    pre.append((data, _energy, speech))
+                    waited += step
+                    if speech:
+                        started = True
+                        begin()
+                        last_speech = len(frames)
+                    elif timeout is not None and waited > timeout:
+                        raise self.sr.WaitTimeoutError("listening timed out while waiting for phrase to start")
+                    continue
+
+                frames.append(data)
+                if on_audio:
+                    on_audio(data)
+                spoken += step
+                if speech:
+                    silent = 0.0
+                    last_speech = len(frames)
+                else:
+                    silent += step
+                    # Short pause after enough speech: hand that segment over now
+                    if (silent >= SEGMENT_PAUSE and last_speech > seg_start
+                            and self.seconds(last_speech - seg_start) >= MIN_SEGMENT):
+                        close_segment(len(frames))
+                if silent >= PAUSE_SECONDS:
+                    break
+                if phrase_time_limit is not None and spoken >= phrase_time_limit:
+                    break
+        finally:
+            self.unsubscribe(q)
+
+        # Drop the trailing silence (keeps a little so the last word isn't clipped)
+        end = min(len(frames), last_speech + self.chunks_for(TRAIL_KEEP))
+        del frames[max(end, seg_start):]
+        if last_speech > seg_start:
+            close_segment(len(frames))
+        return self.sr.AudioData(b"".join(frames), self.rate, self.width)
+
+
+# =========================
+# Preprocessing (before cloud STT)
+# =========================
+# Smaller uploads, same words:
+# - trim leading/trailing silence
+# - downmix to mono (raw input only; sr.AudioData is mono already)
+# - resample to 16 kHz (speech recognizers don't use anything above ~8 kHz)
+# - optional spectral-subtraction noise suppression
+# The caller then sends it as FLAC (recognize_google does that itself).
+
+STT_RATE = 16000          # Target sample rate
+TRIM_MARGIN = 0.1         # Seconds kept before the first / after the last loud frame
+RESAMPLE_TAPS = 63        # Low-pass filter length used before downsampling
+DENOISE_FFT = 512         # STFT size for noise suppression
+DENOISE_STRENGTH = 1.5    # How much of the noise estimate is subtracted
+DENOISE_FLOOR = 0.05      # Keep at least this share of every bin (avoids "musical noise")
+
+
+def to_mono(x: "np.ndarray", channels: int) -> "np.ndarray":
+    # Interleaved int16 frames -> mono float32
+    if channels <= 1:
+        return x.astype(np.float32)
+    return x[: len(x) // channels * channels].reshape(-1, channels).astype(np.float32).mean(axis=1)
+
+
+def trim_silence(x: "np.ndarray", rate: int) -> "np.ndarray":
+    # Cuts the quiet start and end (threshold = 3x the quietest 10% of frames)
+    frame = max(1, int(rate * VAD_FRAME_MS / 1000))
+    n = len(x) // frame
+    if n < 3:
+        return x
+    energy = np.sqrt(np.mean(x[: n * frame].reshape(n, frame) ** 2, axis=1))
+    threshold = max(MIN_THRESHOLD, 3 * float(np.percentile(energy, 10)))
+    loud = np.nonzero(energy > threshold)[0]
+    if not len(loud):
+        return x
+    margin = int(TRIM_MARGIN * rate)
+    return x[max(0, loud[0] * frame - margin): min(len(x), (loud[-1] + 1) * frame + margin)]
+
+
+def resample(x: "np.ndarray", rate: int, target: int = STT_RATE) -> "np.ndarray":
+    # Windowed-sinc low-pass, then linear interpolation onto the new time grid
+    if rate == target or not len(x):
+        return x
+    if target < rate:
+        cutoff = 0.45 * target / rate  # Just under the new Nyquist, as a share of the old rate
+        k = np.arange(RESAMPLE_TAPS) - (RESAMPLE_TAPS - 1) / 2
+        taps = 2 * cutoff * np.sinc(2 * cutoff * k) * np.hamming(RESAMPLE_TAPS)
+        x = np.convolve(x, taps / taps.sum(), mode="same")
+    n_out = int(round(len(x) * target / rate))
+    return np.interp(np.arange(n_out) * (rate / target), np.arange(len(x)), x).astype(np.float32)
+
+
+def denoise(x: "np.ndarray") -> "np.ndarray":
+    # Spectral subtraction: the noise spectrum is taken from the quietest 10% of frames
+    n, hop = DENOISE_FFT, DENOISE_FFT // 2
+    if len(x) < n * 4:
+        return x
+    window = np.hanning(n).astype(np.float32)
+    count = 1 + (len(x) - n) // hop
+    idx = np.arange(n)[None, :] + hop * np.arange(count)[:, None]
+    spec = np.fft.rfft(x[idx] * window, axis=1)
+    mag = np.abs(spec)
+    power = (mag ** 2).sum(axis=1)
+    quiet = mag[power <= np.percentile(power, 10)]
+    noise = quiet.mean(axis=0)
+    clean = np.maximum(mag - DENOISE_STRENGTH * noise, DENOISE_FLOOR * mag)
+    frames = np.fft.irfft(clean * np.exp(1j * np.angle(spec)), n, axis=1) * window
+    out = np.zeros(len(x), np.float32)
+    norm = np.zeros(len(x), np.float32)
+    for i in range(count):  # Overlap-add (a few dozen frames per second of audio)
+        out[i * hop: i * hop + n] += frames[i]
+        norm[i * hop: i * hop + n] += window ** 2
+    done = count * hop + hop
+    out[done:], norm[done:] = x[done:], 1.0  # Samples after the last full frame stay as they were
+    return out / np.maximum(norm, 1e-3)
+
+
+def prepare_pcm(pcm: bytes, rate: int, channels: int = 1, noise_suppression: bool = False) -> Tuple[bytes, int]:
+    # 16-bit PCM at any rate/channel count -> trimmed 16 kHz mono 16-bit PCM
+    x = to_mono(np.frombuffer(pcm[: len(pcm) // 2 * 2], dtype="<i2"), channels)
+    x = trim_silence(x, rate)
+    x = resample(x, rate)
+    if noise_suppression:
+        x = denoise(x)
+    return np.clip(x, -32768, 32767).astype("<i2").tobytes(), STT_RATE
+
+
+def prepare_audio(audio, noise_suppression: bool = False):
+    # sr.AudioData -> smaller sr.AudioData for upload (unchanged without NumPy)
+    if np is None:
+        return audio
+    pcm, rate = prepare_pcm(audio.get_raw_data(convert_width=2), audio.sample_rate, 1, noise_suppression)
+    if len(pcm) < STT_RATE // 10:
+        return audio  # Trimmed to almost nothing: let the recognizer decide on the original
+    return type(audio)(pcm, rate, 2)
+
+
+# =========================
+# Barge-in
+# =========================
+# While Evo is talking, the mic hears Evo too (speakers -> mic echo). So talking
+# over it has to be clearly louder than that echo, for a moment, to count:
+# - The echo level is learned from the first ECHO_LEARN seconds of each reply.
+# - User speech = VAD speech AND energy above BARGE_RATIO x the noise threshold
+#   AND above ECHO_RATIO x the echo level, for BARGE_SECONDS in a row.
+
+ECHO_LEARN = 0.3          # Seconds of playback used to measure the echo
+ECHO_RATIO = 2.0          # Speech must be this much louder than the echo
+BARGE_RATIO = 2.0         # ...and this much louder than the normal speech threshold
+BARGE_SECONDS = 0.25      # ...for this long
+
+
+class BargeIn:
+    def __init__(self, mic: MicStream, speaking: threading.Event, on_barge: Callable[[], None]):
+        # speaking: set while audio is playing (TtsWorker.speaking)
+        self.mic = mic
+        self.speaking = speaking
+        self.on_barge = on_barge
+        self.enabled = threading.Event()
+        self.enabled.set()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        q, _ = self.mic.subscribe()
+        echo: List[float] = []
+        run = 0.0
+        fired = False
+        try:
+            while not self._stop.is_set():
+                try:
+                    _data, energy, speech = q.get(timeout=0.5)
+                except queue.Empty:
+                    continue
+                if not self.speaking.is_set() or not self.enabled.is_set():
+                    echo, run, fired = [], 0.0, False  # Re-arm for the next reply
+                    continue
+                step = self.mic.seconds(1)
+                if fired:
+                    continue
+                if len(echo) < self.mic.chunks_for(ECHO_LEARN):
+                    echo.append(energy)
+                    continue
+                level = sorted(echo)[len(echo) // 2]  # Median: one loud syllable doesn't skew it
+                loud = energy > max(self.mic.threshold * BARGE_RATIO, level * ECHO_RATIO)
+                run = run + step if (speech and loud) else 0.0
+                if run >= BARGE_SECONDS:
+                    fired = True
+                    self.on_barge()
+        finally:
+            self.mic.unsubscribe(q)
@@ -0,0 +1,544 @@
+# =========================
+# Evo audio service (separate process)
+# =========================
+# Mic capture, VAD, speech-to-text, command spotting, TTS, barge-in and the
+# wake word all run in a child process. The GUI process only sends small
+# requests and gets small events back, so:
+# - pyttsx3's runAndWait and the mic/VAD threads never hold the GUI's GIL
+#   (the window keeps drawing at full speed while Evo talks or listens)
+# - if an audio library crashes, only the child dies; AudioService starts a
+#   new one and the app keeps running
+#
+# Protocol: one JSON object per line. The first line the app sends is the config.
+#
+#   app -> service (stdin), {"op": ...}
+#     config    stt_backend, vosk_model, stt_denoise, tts_rate, barge_in, wake,
+#               commands, prewarm
+#     say       text                  speak a whole text
+#     begin     turn                  start a streamed reply (turn = app-side number)
+#     feed      turn, text            next piece of the reply
+#     end       turn                  reply finished
+#     stop                            stop talking, drop queued speech
+#     rate      rate                  TTS speed
+#     prewarm   phrases               render phrases into the TTS cache while idle
+#     listen    id, after_wake        record one utterance and transcribe it
+#     wake      on                    hands-free detector on/off
+#     barge     on                    talking over Evo on/off
+#     close
+#
+#   service -> app (stdout), {"ev": ...}
+#     tts_ready   error               TTS engine loaded (error = text or null)
+#     stt_ready   backend, error, note, commands
+#                                     commands = local command spotter ("vosk" / "sphinx")
+#                                     or null (commands are then recognized in the transcript)
+#     speaking    on, turn            a sentence started / ended (turn = app turn or null)
+#     calibrated  id                  mic is calibrated, listening starts
+#     partial     id, text            words so far (local STT only)
+#     listened    id                  user stopped talking, transcribing
+#     heard       id, text, command   result (command = spotted voice command or null)
+#     failed      id, error
+#     barge                           user talked over Evo (speech already stopped)
+#     wake                            wake word heard
+#     wake_off    error               hands-free mode could not start
+#
+# The service reads its stdin until EOF, so it exits by itself if the app dies.
+# Anything a library prints goes to stderr; stdout is reserved for the protocol.
+
+import os
+import sys
+import json
+import time
+import queue
+import threading
+import subprocess
+from typing import Callable, Dict, List, Optional, Tuple
+
+
+LISTEN_WAIT = 30          # Seconds without any event before a listen request gives up
+RESTART_DELAY = 1.0       # Seconds before starting a new service after a crash
+MAX_RESTARTS = 5          # Crashes allowed within RESTART_WINDOW before giving up
+RESTART_WINDOW = 60       # Seconds
+BACKLOG_MAX = 200         # Requests kept while the service hasn't started yet
+
+
+# =========================
+# App side
+# =========================
+
+class RemoteTts:
+    # Same calls as evo_tts.TtsWorker, forwarded to the service.
+    # Turns are numbered here, so begin() answers without waiting for the service.
+    def __init__(self, service: "AudioService"):
+        self.service = service
+        self.ready = threading.Event()       # Set once the service's engine exists (or failed, see .error)
+        self.speaking = threading.Event()    # Mirrors the service's TtsWorker.speaking
+        self.error: Optional[str] = None
+        self.on_start: Optional[Callable[[int], None]] = None  # on_start(turn) as a sentence starts playing
+        self._gen = 0
+        self._lock = threading.Lock()
+
+    def say(self, text: str):
+        self.service.send("say", text=text)
+
+    def begin(self) -> int:
+        with self._lock:
+            self.service.send("begin", turn=self._gen)
+            return self._gen
+
+    def feed(self, chunk: str, turn: Optional[int] = None):
+        if turn is not None and turn != self._gen:
+            return  # Stopped already; don't even send it
+        self.service.send("feed", turn=turn, text=chunk)
+
+    def end(self, turn: Optional[int] = None):
+        if turn is not None and turn != self._gen:
+            return
+        self.service.send("end", turn=turn)
+
+    def prewarm(self, phrases):
+        phrases = list(phrases)
+        self.service.config["prewarm"] = self.service.config.get("prewarm", []) + phrases
+        self.service.send("prewarm", phrases=phrases)
+
+    def set_rate(self, rate: int):
+        self.service.config["tts_rate"] = rate
+        self.service.send("rate", rate=rate)
+
+    def stop(self):
+        with self._lock:
+            self._gen += 1
+            self.service.send("stop")
+
+    def close(self):
+        pass  # AudioService.close() shuts the engine down with the process
+
+    def _on_event(self, ev: dict):
+        # Reader thread
+        if ev["ev"] == "tts_ready":
+            self.error = ev.get("error")
+            self.ready.set()
+        elif ev["ev"] == "speaking":
+            if ev.get("on"):
+                self.speaking.set()
+                turn = ev.get("turn")
+                if self.on_start is not None and turn is not None:
+                    self.on_start(turn)
+            else:
+                self.speaking.clear()
+
+
+class AudioService:
+    def __init__(self, config: dict, on_event: Callable[[str, dict], None]):
+        # config: first message for the service (see the protocol above); kept up to
+        #   date by set_wake/set_barge/RemoteTts so a restarted service gets the same state
+        # on_event(name, event): stt_ready / barge / wake / wake_off / crashed / restarted
+        #   (called from the reader thread)
+        self.config = dict(config)
+        self.on_event = on_event
+        self.tts = RemoteTts(self)
+        self.proc: Optional[subprocess.Popen] = None
+        self._write_lock = threading.Lock()
+        self._backlog: List[str] = []        # Requests sent while no service is running (before start, during a restart)
+        self._listens: Dict[int, "queue.Queue[dict]"] = {}
+        self._next_id = 0
+        self._crashes: List[float] = []
+        self._closing = False
+
+    def start(self):
+        # Starts the child process (call from a background thread; it's quick, but not free)
+        cmd = [sys.executable, os.path.abspath(__file__)]
+        stderr = None if sys.stderr is not None else subprocess.DEVNULL  # pythonw has no stderr
+        # Under the write lock: no send() may reach the new process before its config line
+        with self._write_lock:
+            proc = self.proc = subprocess.Popen(
+                cmd, stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=stderr,
+                encoding="utf-8", bufsize=1,
+            )
+            lines, self._backlog = self._backlog, []
+            self._write(json.dumps(dict(self.config, op="config")))
+            for line in lines:
+                self._write(line)
+        threading.Thread(target=self._read, args=(proc,), daemon=True).start()
+
+    def send(self, op: str, **fields):
+        line = json.dumps(dict(fields, op=op))
+        with self._write_lock:
+            if self.proc is None:
+                if len(self._backlog) < BACKLOG_MAX:
+                    self._backlog.append(line)
+            else:
+                self._write(line)
+
+    def _write(self, line: str):
+        try:
+            self.proc.stdin.write(line + "\n")
+            self.proc.stdin.flush()
+        except (OSError, ValueError):
+            pass  # Service is gone; the reader thread restarts it
+
+    def set_wake(self, on: bool):
+        self.config["wake"] = on
+        self.send("wake", on=on)
+
+    def set_barge(self, on: bool):
+        self.config["barge_in"] = on
+        self.send("barge", on=on)
+
+    def listen(self, after_wake: bool = False,
+               on_progress: Optional[Callable[[str, dict], None]] = None) -> Tuple[str, Optional[str]]:
+        # Blocks (worker thread) until the service heard something: returns (text, command).
+        # on_progress(name, event) gets calibrated / partial / listened as they happen.
+        with self._write_lock:
+            self._next_id += 1
+            rid = self._next_id
+        q: "queue.Queue[dict]" = queue.Queue()
+        self._listens[rid] = q
+        try:
+            self.send("listen", id=rid, after_wake=after_wake)
+            while True:
+                try:
+                    ev = q.get(timeout=LISTEN_WAIT)
+                except queue.Empty:
+                    raise RuntimeError("Audio service did not answer")
+                if ev["ev"] == "heard":
+                    return ev.get("text") or "", ev.get("command")
+                if ev["ev"] == "failed":
+                    raise RuntimeError(ev.get("error") or "listening failed")
+                if on_progress is not None:
+                    on_progress(ev["ev"], ev)
+        finally:
+            self._listens.pop(rid, None)
+
+    def close(self):
+        self._closing = True
+        proc = self.proc
+        if proc is None:
+            return
+        self.send("close")
+        try:
+            proc.wait(timeout=2)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+
+    def _read(self, proc: subprocess.Popen):
+        # Reader thread: dispatches events until the process ends
+        for line in proc.stdout:
+            try:
+                ev = json.loads(line)
+            except ValueError:
+                continue  # Not ours (shouldn't happen, stdout is protocol-only)
+            name = ev.get("ev")
+            if "id" in ev:
+                q = self._listens.get(ev["id"])
+                if q is not None:
+                    q.put(ev)
+            elif name in ("tts_ready", "speaking"):
+                self.tts._on_event(ev)
+            else:
+                self.on_event(name, ev)
+        proc.wait()
+        if not self._closing:
+            self._crashed(proc.returncode)
+
+    def _crashed(self, code):
+        # Fail whatever was waiting, then start a fresh service (unless it keeps dying)
+        with self._write_lock:
+            self.proc = None  # Requests from now on wait in the backlog for the new process
+        self.tts.speaking.clear()
+        for q in list(self._listens.values()):
+            q.put({"ev": "failed", "error": "audio service stopped"})
+        now = time.monotonic()
+        self._crashes = [t for t in self._crashes if now - t < RESTART_WINDOW] + [now]
+        give_up = len(self._crashes) > MAX_RESTARTS
+        self.on_event("crashed", {"code": code, "restarting": not give_up})
+        if give_up:
+            return
+        time.sleep(RESTART_DELAY)
+        if self._closing:
+            return
+        try:
+            self.start()
+        except OSError as e:
+            self.on_event("crashed", {"code": None, "restarting": False, "error": str(e)})
+            return
+        self.on_event("restarted", {})
+
+
+# =========================
+# Service side (child process)
+# =========================
+
+class _Service:
+    def __init__(self, config: dict, emit: Callable[..., None]):
+        from evo_tts import TtsWorker, TtsCache
+
+        self.config = config
+        self.emit = emit
+        self.mic = None
+        self.stt = None
+        self.spotter = None
+        self.wake = None
+        self.barge = None
+        self.stt_ready = threading.Event()
+        self.listening = threading.Event()
+        self.turns: Dict[int, int] = {}      # App turn -> TtsWorker turn (only the latest is kept)
+
+        self.tts = TtsWorker(self._make_tts_engine, rate=config.get("tts_rate"), cache=TtsCache())
+        self.tts.on_start = lambda gen: self.emit("speaking", on=True, turn=self._app_turn(gen))
+        self.tts.on_end = lambda gen: self.emit("speaking", on=False, turn=self._app_turn(gen))
+        self.tts.prewarm(config.get("prewarm", []))
+        threading.Thread(target=self._init_engines, daemon=True).start()
+
+    @staticmethod
+    def _make_tts_engine():
+        import pyttsx3
+        return pyttsx3.init()
+
+    def _app_turn(self, gen: int) -> Optional[int]:
+        for app_turn, ours in list(self.turns.items()):
+            if ours == gen:
+                return app_turn
+        return None
+
+    def _init_engines(self):
+        self.tts.ready.wait()
+        self.emit("tts_ready", error=str(self.tts.error) if self.tts.error else None)
+
+        from evo_audio import MicStream, BargeIn
+        from evo_stt import make_backend, VoskStt, VOSK_MODEL_DIR
+
+        note = None
+        try:
+            import speech_recognition as sr
+            recognizer = sr.Recognizer()
+            self.mic = MicStream(sr)
+            self.mic.start()                        # Calibrates in the background, once
+            self.barge = BargeIn(self.mic, self.tts.speaking, self._on_barge)
+            if not self.config.get("barge_in", True):
+                self.barge.enabled.clear()
+            self.barge.start()
+            denoise = bool(self.config.get("stt_denoise"))
+            try:
+                self.stt = make_backend(self.config.get("stt_backend", "auto"), recognizer,
+                                        self.config.get("vosk_model") or VOSK_MODEL_DIR, denoise)
+            except Exception as e:
+                # Asked for vosk explicitly but it can't load: say why, use google
+                self.stt = make_backend("google", recognizer, noise_suppression=denoise)
+                note = f"Local speech-to-text unavailable ({e}). Using Google."
+            self.spotter = self._make_spotter(sr, recognizer, VoskStt, VOSK_MODEL_DIR)
+        except Exception as e:
+            self.emit("stt_ready", backend=None, error=str(e), note=None, commands=None)
+            return
+        finally:
+            self.stt_ready.set()
+        self.emit("stt_ready", backend=self.stt.name, error=None, note=note,
+                  commands=self.spotter.kind if self.spotter else None)
+        if self.config.get("wake"):
+            self._set_wake(True)
+
+    def _make_spotter(self, sr, recognizer, VoskStt, model_dir):
+        # Local command spotting whatever the STT backend is, so "clear chat" etc.
+        # never need the cloud: Vosk (shares the STT model if that's Vosk too),
+        # else Sphinx keyword spotting, else None (matched in the transcript instead)
+        from evo_commands import CommandSpotter, SphinxSpotter
+
+        commands = self.config.get("commands", [])
+        vosk = self.stt if isinstance(self.stt, VoskStt) else None
+        if vosk is None:
+            try:
+                vosk = VoskStt(self.config.get("vosk_model") or model_dir)
+            except Exception:
+                pass  # No vosk package or model folder
+        if vosk is not None:
+            return CommandSpotter(vosk, commands)
+        try:
+            return SphinxSpotter(sr, recognizer, commands)
+        except Exception:
+            return None  # No pocketsphinx either
+
+    # -------------------------
+    # Requests (stdin thread)
+    # -------------------------
+
+    def handle(self, msg: dict):
+        op = msg.get("op")
+        if op == "say":
+            self.tts.say(msg.get("text", ""))
+        elif op == "begin":
+            self.turns = {msg.get("turn"): self.tts.begin()}
+        elif op == "feed":
+            self.tts.feed(msg.get("text", ""), self._tts_turn(msg.get("turn")))
+        elif op == "end":
+            self.tts.end(self._tts_turn(msg.get("turn")))
+        elif op == "stop":
+            self.tts.stop()
+        elif op == "rate":
+            self.tts.set_rate(msg.get("rate"))
+        elif op == "prewarm":
+            self.tts.prewarm(msg.get("phrases", []))
+        elif op == "listen":
+            threading.Thread(target=self._listen, args=(msg,), daemon=True).start()
+        elif op == "wake":
+            self.config["wake"] = bool(msg.get("on"))
+            if self.stt_ready.is_set():
+                self._set_wake(self.config["wake"])
+        elif op == "barge":
+            self.config["barge_in"] = bool(msg.get("on"))
+            if self.barge is not None:
+                (self.barge.enabled.set if self.config["barge_in"] else self.barge.enabled.clear)()
+
+    def _tts_turn(self, app_turn: Optional[int]) -> Optional[int]:
+        # -1 never matches: a reply that was stopped here (barge-in) stays stopped
+        if app_turn is None:
+            return None
+        return self.turns.get(app_turn, -1)
+
+    def _listen(self, msg: dict):
+        rid = msg.get("id")
+        if self.listening.is_set():
+            self.emit("failed", id=rid, error="Already listening")
+            return
+        self.listening.set()
+        wake = self.wake
+        if wake is not None:
+            wake.paused.set()                       # The question isn't a wake word
+        try:
+            from evo_audio import PRE_ROLL
+            from evo_commands import KWS_MAX_SECONDS
+
+            self.stt_ready.wait()
+            if self.stt is None:
+                raise RuntimeError("Speech recognition is not available")
+            self.mic.wait_calibrated()              # listen() reports a dead mic
+            self.emit("calibrated", id=rid)
+            stream = self.stt.stream(self.mic.rate, self.mic.width)
+            spot = self.spotter.stream(self.mic.rate, self.mic.width) if self.spotter else None
+            last = [None]
+
+            # Cloud STT + local spotter: segments of a short utterance are held back
+            # until it's clearly not a command, so commands never leave the machine
+            held = [] if spot is not None and not self.stt.streaming else None
+            kws_bytes = int(KWS_MAX_SECONDS * self.mic.rate * self.mic.width)
+            recorded = [0]
+
+            def release():
+                nonlocal held
+                for seg in held or []:
+                    stream.segment(seg)
+                held = None
+
+            def on_audio(pcm: bytes):
+                recorded[0] += len(pcm)
+                if held is not None and recorded[0] > kws_bytes:
+                    release()                       # Too long for a command: upload as usual
+                if spot is not None:
+                    spot.feed(pcm)                  # Command-only recognizer, runs alongside
+                partial = stream.feed(pcm)
+                if partial and partial != last[0]:
+                    last[0] = partial
+                    self.emit("partial", id=rid, text=partial)
+
+            def on_segment(seg):
+                # Same thread as on_audio (the mic's listen loop)
+                if held is not None:
+                    held.append(seg)
+                else:
+                    stream.segment(seg)             # Transcribed while the user keeps talking
+
+            audio = self.mic.listen(
+                timeout=6, phrase_time_limit=10, on_audio=on_audio,
+                pre_roll=0.0 if msg.get("after_wake") else PRE_ROLL,
+                on_segment=on_segment,
+            )
+            self.emit("listened", id=rid)
+
+            # Known command spotted locally: skip full transcription (no network call)
+            cmd = spot.finish() if spot is not None else None
+            if cmd:
+                self.emit("heard", id=rid, text="", command=cmd)
+                return
+            release()
+            text = (stream.finish(audio) or "").strip()
+            self.emit("heard", id=rid, text=text, command=None)
+        except Exception as e:
+            self.emit("failed", id=rid, error=str(e))
+        finally:
+            self.listening.clear()
+            if wake is not None:
+                wake.paused.clear()
+
+    def _set_wake(self, on: bool):
+        if not on:
+            if self.wake is not None:
+                self.wake.stop()
+                self.wake = None
+            return
+        if self.wake is not None or self.mic is None:
+            return
+        try:
+            import evo_wake
+            self.wake = evo_wake.WakeDetector(self.mic, self._on_wake)
+            self.wake.start()
+        except Exception as e:
+            self.wake = None
+            self.config["wake"] = False
+            self.emit("wake_off", error=str(e))
+
+    def _on_barge(self):
+        # Mic thread: stop right here (no round trip), then tell the app
+        self.tts.stop()
+        self.emit("barge")
+
+    def _on_wake(self):
+        if self.listening.is_set() or self.tts.speaking.is_set():
+            return  # Already listening, or it heard Evo's own voice
+        self.emit("wake")
+
+    def close(self):
+        self.tts.close()
+        if self.wake is not None:
+            self.wake.stop()
+        if self.barge is not None:
+            self.barge.stop()
+        if self.mic is not None:
+            self.mic.close()
+
+
+def serve():
+    # Child process entry point: stdout becomes the event channel, everything
+    # else that gets printed is sent to stderr instead.
+    out = os.fdopen(os.dup(sys.stdout.fileno()), "w", encoding="utf-8")
+    os.dup2(sys.stderr.fileno(), sys.stdout.fileno())
+    sys.stdout = sys.stderr
+    lock = threading.Lock()
+
+    def emit(ev: str, **fields):
+        line = json.dumps(dict(fields, ev=ev))
+        with lock:
+            try:
+                out.write(line + "\n")
+                out.flush()
+            except (OSError, ValueError):
+                pass  # App is gone; stdin EOF ends the loop below
+
+    stdin = sys.stdin
+    first = stdin.readline()
+    if not first:
+        return
+    service = _Service(json.loads(first), emit)
+    try:
+        for line in stdin:
+            try:
+                msg = json.loads(line)
+            except ValueError:
+                continue
+            if msg.get("op") == "close":
+                break
+            service.handle(msg)
+    finally:
+        service.close()
+
+
+if __name__ == "__main__":
+    sys.stdin.reconfigure(encoding="utf-8")
+    serve()
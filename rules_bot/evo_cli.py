@@ -0,0 +1,239 @@
+# =========================
+# evo: one CLI for the single-shot tools, made for pipelines
+# =========================
+# The summarizer, code explainer, quiz generator and helpdesk bot each read one
+# input() line and print free text. Here they are subcommands that read many
+# inputs and write one JSON object per line:
+#
+#   python rules_bot/evo_cli.py summarize < articles.jsonl > summaries.jsonl
+#   python rules_bot/evo_cli.py explain script1.py script2.py
+#   find . -name "*.py" | python rules_bot/evo_cli.py explain --files -j 8
+#   echo '"What is a closure?"' | python rules_bot/evo_cli.py ask
+#
+# Input (stdin, one per line):
+#   {"text": "...", "any": "other fields"}   -> text from --field (default "text")
+#   "just a string"                           -> the string
+#   With --files: a path per line (or paths as arguments); each file is one input.
+#
+# Output (stdout, same order as the input):
+#   the input record + {"output": "...", "error": null, "ms": 812}
+#   File inputs become {"file": path, ...}. A failed record has "error" set and
+#   the run continues.
+#
+# Up to --jobs requests run at the same time (finished ones wait for earlier
+# ones so the order is kept). Throughput goes to stderr.
+# Uses the local gateway if it's running (see evo_gateway.py).
+
+import os
+import sys
+import json
+import time
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import Iterator, Optional, Tuple
+
+from evo_gateway import gemini_client
+
+
+MODEL = "models/gemini-flash-latest"
+JOBS = 4                  # Requests in flight at once (--jobs)
+REORDER_MAX = 64          # Finished results waiting for an earlier one, before input reading pauses
+RETRIES = 3               # Retries for rate-limit errors (429 / RESOURCE_EXHAUSTED)
+RETRY_WAIT = 5            # Seconds before the first retry (doubles each time)
+PROGRESS_EVERY = 1.0      # Seconds between throughput lines on stderr
+
+# Same prompts as summarizing_bot.py, gemini_v4.py, multiple_quest.py and help_desk_bot.py
+TOOLS = {
+    "summarize": (
+        "Summarize text into beginner-friendly bullet points",
+        "Summarize the text for a beginner.\n"
+        "Rules:\n"
+        "- Max 6 bullet points\n"
+        "- Simple wording\n"
+        "- Add 1 short example if helpful\n\n"
+        "TEXT:\n{input}",
+    ),
+    "explain": (
+        "Explain Python code line by line",
+        "Explain this Python code line by line for a beginner.\n"
+        "Also include:\n"
+        "- What the program is trying to do\n"
+        "- 2 common beginner mistakes with similar code\n\n"
+        "CODE:\n{input}",
+    ),
+    "quiz": (
+        "Make a 5-question multiple-choice quiz about a topic",
+        "Create a beginner quiz about: {input}\n\n"
+        "Rules:\n"
+        "- 5 multiple-choice questions\n"
+        "- Each question has A, B, C, D\n"
+        "- Show answers at the end\n"
+        "- Keep questions simple\n",
+    ),
+    "helpdesk": (
+        "Troubleshoot an IT issue step by step",
+        "You are an IT helpdesk assistant.\n\n"
+        "Output format:\n"
+        "1) Ask exactly ONE clarifying question if needed.\n"
+        "2) Then give step-by-step troubleshooting.\n"
+        '3) End with: "If that fails, paste the full error text."\n\n'
+        "Issue:\n{input}",
+    ),
+    "ask": (
+        "Send the input as the prompt, unchanged",
+        "{input}",
+    ),
+}
+
+
+def read_records(args) -> Iterator[Tuple[dict, Optional[str], Optional[str]]]:
+    # Yields (record, text, error) lazily, so huge inputs stream through
+    if args.paths or args.files:
+        paths = args.paths or (line.strip() for line in sys.stdin)
+        for path in paths:
+            if not path:
+                continue
+            try:
+                with open(path, "r", encoding="utf-8", errors="replace") as f:
+                    yield {"file": path}, f.read(), None
+            except OSError as e:
+                yield {"file": path}, None, str(e)
+        return
+
+    for line in sys.stdin:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            value = json.loads(line)
+        except ValueError as e:
+            yield {"line": line}, None, f"invalid JSON: {e}"
+            continue
+        if isinstance(value, dict):
+            text = value.get(args.field)
+            if not isinstance(text, str):
+                yield value, None, f"missing text field '{args.field}'"
+                continue
+            yield value, text, None
+        elif isinstance(value, str):
+            yield {args.field: value}, value, None
+        else:
+            yield {"value": value}, None, "expected a JSON object or string"
+
+
+class Runner:
+    def __init__(self, tool: str, model: str):
+        self.template = TOOLS[tool][1]
+        self.model = model
+        self._local = threading.local()   # One client per worker thread (gateway connections aren't shared)
+
+    def client(self):
+        client = getattr(self._local, "client", None)
+        if client is None:
+            client = self._local.client = gemini_client(os.getenv("GEMINI_API_KEY"))
+        return client
+
+    def run(self, text: str) -> str:
+        prompt = self.template.format(input=text.strip())
+        wait_s = RETRY_WAIT
+        for attempt in range(RETRIES + 1):
+            try:
+                return self.client().models.generate_content(model=self.model, contents=prompt).text or ""
+            except Exception as e:
+                msg = str(e)
+                if attempt == RETRIES or not ("RESOURCE_EXHAUSTED" in msg or "429" in msg):
+                    raise
+                time.sleep(wait_s)
+                wait_s *= 2
+
+
+def process(args) -> int:
+    runner = Runner(args.tool, args.model)
+    out = sys.stdout
+    jobs = max(1, args.jobs)
+    t0 = time.perf_counter()
+    stats = {"done": 0, "errors": 0}
+    last_progress = [t0]
+
+    def task(record: dict, text: Optional[str], error: Optional[str]) -> dict:
+        started = time.perf_counter()
+        output = None
+        if error is None:
+            try:
+                output = runner.run(text)
+            except Exception as e:
+                error = f"{type(e).__name__}: {e}"
+        return dict(record, output=output, error=error, ms=round((time.perf_counter() - started) * 1000))
+
+    def write(result: dict):
+        out.write(json.dumps(result, ensure_ascii=False) + "\n")
+        stats["done"] += 1
+        stats["errors"] += result["error"] is not None
+        now = time.perf_counter()
+        if args.progress and now - last_progress[0] >= PROGRESS_EVERY:
+            last_progress[0] = now
+            rate = stats["done"] / (now - t0)
+            print(f"\r{stats['done']} done, {stats['errors']} errors, {rate:.1f}/s", end="", file=sys.stderr)
+
+    inflight = {}             # future -> index
+    finished = {}             # index -> result, waiting for earlier ones
+    next_out = 0
+
+    def collect(block: bool):
+        nonlocal next_out
+        if inflight:
+            done, _ = wait(list(inflight), timeout=None if block else 0, return_when=FIRST_COMPLETED)
+            for f in done:
+                finished[inflight.pop(f)] = f.result()
+        while next_out in finished:
+            write(finished.pop(next_out))
+            next_out += 1
+        out.flush()
+
+    with ThreadPoolExecutor(max_workers=jobs, thread_name_prefix="evo") as pool:
+        for i, (record, text, error) in enumerate(read_records(args)):
+            while len(inflight) >= jobs or len(finished) >= REORDER_MAX:
+                collect(block=True)
+            inflight[pool.submit(task, record, text, error)] = i
+            collect(block=False)
+        while inflight:
+            collect(block=True)
+        collect(block=False)
+
+    seconds = time.perf_counter() - t0
+    if args.progress:
+        print(file=sys.stderr)
+    rate = stats["done"] / seconds if seconds > 0 else 0.0
+    print(f"{stats['done']} records in {seconds:.1f} s ({rate:.2f}/s, {jobs} in flight), {stats['errors']} errors",
+          file=sys.stderr)
+    return 1 if stats["errors"] else 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="evo", description="Evo single-shot tools over JSONL (stdin -> stdout).")
+    sub = parser.add_subparsers(dest="tool", required=True)
+    for name, (help_text, _template) in TOOLS.items():
+        p = sub.add_parser(name, help=help_text)
+        p.add_argument("paths", nargs="*", help="Files to process (each file is one input)")
+        p.add_argument("--files", action="store_true", help="Read file paths from stdin, one per line")
+        p.add_argument("--field", default="text", help="JSON field holding the input text (default: text)")
+        p.add_argument("-j", "--jobs", type=int, default=JOBS, help=f"Requests in flight at once (default: {JOBS})")
+        p.add_argument("--model", default=MODEL, help=f"Gemini model (default: {MODEL})")
+        p.add_argument("--progress", action="store_true", default=sys.stderr.isatty(),
+                       help="Show throughput while running (default: on in a terminal)")
+    args = parser.parse_args(argv)
+
+    try:
+        from dotenv import load_dotenv
+        load_dotenv()
+    except ImportError:
+        pass
+    if not os.getenv("GEMINI_API_KEY"):
+        print("GEMINI_API_KEY is not set.", file=sys.stderr)
+        return 2
+    return process(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
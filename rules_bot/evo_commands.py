@@ -0,0 +1,168 @@
+# =========================
+# Evo voice commands (local keyword spotting)
+# =========================
+# Recognizes the short voice commands ("clear chat", "new chat", ...) without
+# sending audio anywhere.
+#
+# - The command list is read from the help text, so adding a line to
+#   VOICE_COMMANDS_HELP is all it takes to teach the spotter a new phrase.
+# - CommandSpotter (needs the local Vosk model): runs a second recognizer next to
+#   normal transcription whose grammar ONLY contains the command phrases. That is
+#   fast and very accurate for them. Anything else comes out as "[unk]" or with
+#   low word confidence and is rejected.
+# - SphinxSpotter (no Vosk model, needs pocketsphinx): keyword spotting on the
+#   recorded audio with CMU Sphinx's phonetic dictionary, so commands are still
+#   recognized locally when transcription goes to Google.
+# - CommandMatcher: "sounds like" match on text, so "knew chat" or
+#   "safe chat" still count. Used on the spotter output and on cloud transcripts.
+#   It runs on EVERY transcript, so it is strict: each word has to sound exactly
+#   like the command's word, and the utterance has to be about as long as the
+#   command ("so cute" / "save it" / "clear that" are NOT commands).
+#
+# Long utterances (over KWS_MAX_SECONDS) are never treated as commands: those
+# are normal messages that may happen to contain a command's words.
+
+import re
+import json
+from typing import Dict, List, Optional
+
+
+KWS_MAX_SECONDS = 2.5         # Commands are short; longer audio goes to full transcription
+KWS_MIN_CONF = 0.75           # Every word of a spotted command needs at least this confidence
+KWS_SPHINX_THRESHOLD = 1e-20  # Sphinx keyword threshold (smaller = accepts less certain hits)
+LENGTH_SLACK = 2              # Letters an utterance may differ from the command before fuzzy matching is skipped
+
+# Sound groups (Soundex-style): letters in one group sound alike
+_GROUPS = {}
+for _code, _letters in (("1", "bfpv"), ("2", "cgjkqsxz"), ("3", "dt"), ("4", "l"), ("5", "mn"), ("6", "r")):
+    for _ch in _letters:
+        _GROUPS[_ch] = _code
+_SILENT = [("kn", "n"), ("wr", "r"), ("ph", "f"), ("wh", "w"), ("gn", "n")]
+
+
+def commands_from_help(help_text: str) -> List[str]:
+    # "- 'clear chat'" lines -> ["clear chat", ...]
+    return [c.strip().lower() for c in re.findall(r"'([^']+)'", help_text)]
+
+
+def phonetic(word: str) -> str:
+    # Sound key of one word: letters mapped to groups, vowels dropped, repeats collapsed
+    w = re.sub(r"[^a-z]", "", word.lower())
+    for a, b in _SILENT:
+        if w.startswith(a):
+            w = b + w[len(a):]
+    out, last = [], ""
+    for ch in w:
+        code = _GROUPS.get(ch, "")
+        if code and code != last:
+            out.append(code)
+        last = code
+    return "".join(out) or w[:1]
+
+
+def phrase_key(text: str) -> str:
+    return " ".join(phonetic(w) for w in text.split())
+
+
+class CommandMatcher:
+    def __init__(self, commands: List[str]):
+        self.commands = list(commands)
+        self.keys: Dict[str, str] = {phrase_key(c): c for c in self.commands}
+
+    def match(self, text: str) -> Optional[str]:
+        # The command text sounds like, or None
+        t = " ".join((text or "").lower().split())
+        t = re.sub(r"[^a-z ]", "", t)
+        if not t:
+            return None
+        if t in self.commands:
+            return t
+        # Same sound key = same number of words and every word (the first one
+        # included) sounds like the command's word. No "close enough" keys: with
+        # short keys that turns everyday phrases into commands.
+        cmd = self.keys.get(phrase_key(t))
+        if cmd is None or abs(len(t) - len(cmd)) > LENGTH_SLACK:
+            return None
+        return cmd
+
+
+class _SpotStream:
+    def __init__(self, spotter: "CommandSpotter", rate: int, width: int):
+        self.spotter = spotter
+        self.rec = spotter.vosk.KaldiRecognizer(spotter.model, rate, spotter.grammar)
+        self.rec.SetWords(True)
+        self.max_bytes = int(KWS_MAX_SECONDS * rate * width)
+        self.bytes = 0
+        self.words: List[dict] = []
+
+    def feed(self, pcm: bytes):
+        self.bytes += len(pcm)
+        if self.bytes > self.max_bytes:
+            return  # Too long to be a command; stop spending CPU on it
+        if self.rec.AcceptWaveform(pcm):
+            self.words += json.loads(self.rec.Result()).get("result", [])
+
+    def finish(self) -> Optional[str]:
+        # Spotted command, or None (= send the audio to full transcription)
+        if self.bytes > self.max_bytes:
+            return None
+        self.words += json.loads(self.rec.FinalResult()).get("result", [])
+        if not self.words:
+            return None
+        if any(w.get("word") == "[unk]" or w.get("conf", 0) < KWS_MIN_CONF for w in self.words):
+            return None
+        return self.spotter.matcher.match(" ".join(w["word"] for w in self.words))
+
+
+class CommandSpotter:
+    kind = "vosk"
+
+    def __init__(self, vosk_backend, commands: List[str]):
+        # vosk_backend: a loaded evo_stt.VoskStt (shares its model, no second load)
+        self.vosk = vosk_backend.vosk
+        self.model = vosk_backend.model
+        self.matcher = CommandMatcher(commands)
+        self.grammar = json.dumps(self.matcher.commands + ["[unk]"])
+
+    def stream(self, rate: int, width: int = 2) -> _SpotStream:
+        return _SpotStream(self, rate, width)
+
+
+class _SphinxStream:
+    def __init__(self, spotter: "SphinxSpotter", rate: int, width: int):
+        self.spotter = spotter
+        self.rate = rate
+        self.width = width
+        self.max_bytes = int(KWS_MAX_SECONDS * rate * width)
+        self.chunks: List[bytes] = []
+        self.bytes = 0
+
+    def feed(self, pcm: bytes):
+        self.bytes += len(pcm)
+        if self.bytes <= self.max_bytes:
+            self.chunks.append(pcm)  # Decoded in finish(); only short utterances are kept
+
+    def finish(self) -> Optional[str]:
+        if self.bytes > self.max_bytes or not self.chunks:
+            return None
+        audio = self.spotter.sr.AudioData(b"".join(self.chunks), self.rate, self.width)
+        try:
+            heard = self.spotter.recognizer.recognize_sphinx(audio, keyword_entries=self.spotter.keywords)
+        except Exception:
+            return None  # Nothing spotted (UnknownValueError) or Sphinx failed: transcribe normally
+        return self.spotter.matcher.match(heard)
+
+
+class SphinxSpotter:
+    # Same calls as CommandSpotter, for when no Vosk model is available
+    kind = "sphinx"
+
+    def __init__(self, sr_module, recognizer, commands: List[str]):
+        import pocketsphinx  # noqa: F401  Optional dependency; ImportError = not available
+        self.sr = sr_module
+        self.recognizer = recognizer
+        self.matcher = CommandMatcher(commands)
+        self.keywords = [(c, KWS_SPHINX_THRESHOLD) for c in self.matcher.commands]
+
+    def stream(self, rate: int, width: int = 2) -> _SphinxStream:
+        return _SphinxStream(self, rate, width)
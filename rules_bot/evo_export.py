@@ -0,0 +1,181 @@
+# =========================
+# Evo Export
+# =========================
+# Writes a chat to disk one message at a time, on a background thread.
+#
+# - Formats: Markdown (.md), JSON Lines (.jsonl), HTML (.html), plain text (.txt)
+# - Add ".gz" to any of them (e.g. chat.jsonl.gz) for gzip output
+# - Memory use stays flat: messages are streamed from the source, never joined into one string
+# - Writes to "<file>.part" first and renames at the end, so a failed export
+#   never leaves a half-written file behind
+#
+# Input rows are (sender, text, ts) tuples. Sender is "user" | "evo" | "bot" | "system"
+# (anything else is printed as-is). Rows may carry a 4th item, the chat session id
+# (start time in ms, see evo_history): a header is written whenever it changes
+# (JSON Lines gets a "session" field on every line instead).
+
+import os
+import gzip
+import html
+import json
+import time
+import threading
+from typing import Callable, Iterable, Optional, Tuple
+
+
+# =========================
+# Configuration
+# =========================
+
+PROGRESS_EVERY = 0.1      # Seconds between progress callbacks
+FORMATS = {".md": "md", ".markdown": "md", ".jsonl": "jsonl", ".html": "html", ".htm": "html", ".txt": "txt"}
+
+# File dialog choices (shared by the GUIs)
+FILETYPES = [
+    ("Markdown", "*.md"),
+    ("JSON Lines", "*.jsonl"),
+    ("HTML", "*.html"),
+    ("Text file", "*.txt"),
+    ("Gzipped (any of the above + .gz)", "*.gz"),
+]
+
+WHO = {"user": "You", "evo": "Evo", "bot": "Bot", "system": "System"}
+
+HTML_HEAD = """<!doctype html>
+<html><head><meta charset="utf-8"><title>Evo chat</title>
+<style>
+body { font-family: "Segoe UI", sans-serif; background: #0b1220; color: #e5e7eb; max-width: 860px; margin: 24px auto; }
+.msg { margin: 8px 0; padding: 10px 14px; border-radius: 14px; white-space: pre-wrap; }
+.user { background: #2563eb; color: #fff; margin-left: 15%; }
+.evo, .bot { background: #111827; margin-right: 15%; }
+.system { color: #9ca3af; font-style: italic; }
+.ts { font-size: 0.8em; opacity: 0.7; display: block; }
+.session { font-size: 1em; color: #9ca3af; border-bottom: 1px solid #374151; margin-top: 28px; }
+</style></head><body>
+"""
+HTML_TAIL = "</body></html>\n"
+
+Row = Tuple  # (sender, text, ts) or (sender, text, ts, session)
+
+
+def detect_format(path: str) -> Tuple[str, bool]:
+    # "chat.jsonl.gz" -> ("jsonl", True). Unknown extensions fall back to plain text.
+    base, ext = os.path.splitext(path.lower())
+    gz = ext == ".gz"
+    if gz:
+        ext = os.path.splitext(base)[1]
+    return FORMATS.get(ext, "txt"), gz
+
+
+def _session_header(fmt: str, session: int) -> str:
+    # "Chat started 2026-10-19 14:03" before the first message of each session
+    title = "Chat started " + time.strftime("%Y-%m-%d %H:%M", time.localtime(session / 1000))
+    if fmt == "md":
+        return f"## {title}\n\n"
+    if fmt == "html":
+        return f'<h2 class="session">{html.escape(title)}</h2>\n'
+    return f"===== {title} =====\n\n"
+
+
+def _line(fmt: str, sender: str, text: str, ts: str, session: Optional[int] = None) -> str:
+    # One message in the chosen format
+    who = WHO.get(sender, sender)
+    if fmt == "jsonl":
+        item = {"sender": sender, "text": text, "ts": ts}
+        if session is not None:
+            item["session"] = session
+        return json.dumps(item, ensure_ascii=False) + "\n"
+    if fmt == "md":
+        stamp = f" _({ts})_" if ts else ""
+        if sender == "system":
+            return f"> {text}{stamp}\n\n"
+        return f"**{who}**{stamp}\n\n{text}\n\n"
+    if fmt == "html":
+        stamp = f'<span class="ts">{html.escape(ts)}</span>' if ts else ""
+        cls = html.escape(sender)
+        return f'<div class="msg {cls}">{stamp}<b>{html.escape(who)}:</b> {html.escape(text)}</div>\n'
+    stamp = f"[{ts}] " if ts else ""
+    return f"{stamp}{who}: {text}\n"
+
+
+def export_rows(
+    rows: Iterable[Row],
+    path: str,
+    total: Optional[int] = None,
+    progress: Optional[Callable[[int, Optional[int]], None]] = None,
+    cancel: Optional[threading.Event] = None,
+) -> int:
+    # Streams rows into path. Returns how many messages were written.
+    # progress(done, total) is called every PROGRESS_EVERY seconds (total may be None).
+    fmt, gz = detect_format(path)
+    tmp = path + ".part"
+    opener = gzip.open if gz else open
+    count = 0
+    last = time.monotonic()
+    try:
+        with opener(tmp, "wt", encoding="utf-8", newline="\n") as f:
+            if fmt == "html":
+                f.write(HTML_HEAD)
+            current = None
+            for row in rows:
+                if cancel is not None and cancel.is_set():
+                    raise InterruptedError("Export cancelled")
+                sender, text, ts = row[:3]
+                session = row[3] if len(row) > 3 else None
+                if session is not None and session != current and fmt != "jsonl":
+                    if current is not None and fmt == "txt":
+                        f.write("\n")              # Blank line between chats
+                    f.write(_session_header(fmt, session))
+                current = session
+                f.write(_line(fmt, sender, text, ts or "", session))
+                count += 1
+                now = time.monotonic()
+                if progress and now - last >= PROGRESS_EVERY:
+                    last = now
+                    progress(count, total)
+            if fmt == "html":
+                f.write(HTML_TAIL)
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+        raise
+    if progress:
+        progress(count, total)
+    return count
+
+
+def start_export(
+    rows: Iterable[Row],
+    path: str,
+    total: Optional[int] = None,
+    progress: Optional[Callable[[int, Optional[int]], None]] = None,
+    done: Optional[Callable[[int, Optional[Exception]], None]] = None,
+) -> threading.Event:
+    # Runs export_rows on a background thread.
+    # done(count, error) is called at the end (error is None on success).
+    # Returns an Event: set() it to cancel.
+    cancel = threading.Event()
+
+    def worker():
+        try:
+            n = export_rows(rows, path, total=total, progress=progress, cancel=cancel)
+        except Exception as e:
+            if done:
+                done(0, e)
+            return
+        if done:
+            done(n, None)
+
+    threading.Thread(target=worker, daemon=True).start()
+    return cancel
+
+
+def progress_text(done: int, total: Optional[int]) -> str:
+    # "Exporting... 42% (4,200/10,000)" or "Exporting... 4,200" when the total is unknown
+    if total:
+        done = min(done, total)  # Messages saved after counting can't push it past 100%
+        return f"Exporting... {done * 100 // total}% ({done:,}/{total:,})"
+    return f"Exporting... {done:,}"
@@ -0,0 +1,419 @@
+# =========================
+# Evo Chat Feed (virtualized)
+# =========================
+# A chat view that only builds widgets for the messages you can actually see.
+#
+# Why: one CTkFrame + two CTkLabels per message adds up fast. After a few
+# thousand messages scrolling, resizing and clearing all get slow.
+#
+# How it works (short version):
+# - The feed keeps a plain list of messages (no widgets).
+# - A Canvas fakes the full scroll height using each message's height.
+# - Only rows inside the visible area get a widget. Widgets that scroll
+#   out of view go back into a pool and get reused for the next message.
+# - Heights start as an estimate, then get replaced by the real height the
+#   first time a row is shown. Real heights are cached by (sender, text).
+# - Heights live in a Fenwick tree, so "which message is at pixel y?" and
+#   "where does message i start?" stay fast no matter how long the chat is.
+
+from typing import Callable, Dict, List, Optional, Tuple
+
+import customtkinter as ctk
+
+from evo_ui import TextMeasure
+
+
+# =========================
+# Look + sizing
+# =========================
+
+BUBBLE_WRAP = 760         # Text wraplength inside user/evo bubbles
+SYSTEM_WRAP = 780         # Text wraplength for system lines
+OVERSCAN = 3              # Extra rows built above/below the view (smoother scrolling)
+
+BODY_FONT = ("Segoe UI", 12)
+TS_FONT = ("Segoe UI", 10)
+SYSTEM_FONT = ("Segoe UI", 11, "italic")
+
+USER_COLORS = ("#2563eb", "#ffffff")   # (bubble, text)
+EVO_COLORS = ("#111827", "#e5e7eb")
+SYSTEM_TEXT = "#9ca3af"
+MARK_COLOR = "#f59e0b"                 # Outline for the current search hit
+MARK_SYSTEM_BG = "#78350f"             # Background for a system line search hit
+
+
+# =========================
+# Height index (Fenwick tree)
+# =========================
+# Stores one height per message. Supports:
+# - update one height          O(log n)
+# - top of message i           O(log n)
+# - message at pixel offset y  O(log n)
+
+class HeightTree:
+    def __init__(self):
+        self.values: List[int] = []
+        self.tree: List[int] = [0]  # 1-based
+
+    def __len__(self):
+        return len(self.values)
+
+    def reset(self, values: List[int]):
+        # Rebuilds from scratch in O(n) (used after clear / prepend)
+        self.values = list(values)
+        self.tree = [0] + self.values
+        for i in range(1, len(self.tree)):
+            j = i + (i & -i)
+            if j < len(self.tree):
+                self.tree[j] += self.tree[i]
+
+    def append(self, value: int):
+        n = len(self.values) + 1
+        low = n & -n
+        # Node n covers (n - low, n]: our value + the sum of the earlier part of that range
+        self.tree.append(value + self.prefix(n - 1) - self.prefix(n - low))
+        self.values.append(value)
+
+    def set(self, i: int, value: int):
+        delta = value - self.values[i]
+        if not delta:
+            return
+        self.values[i] = value
+        i += 1
+        while i < len(self.tree):
+            self.tree[i] += delta
+            i += i & -i
+
+    def prefix(self, n: int) -> int:
+        # Sum of the first n heights (= top pixel of message n)
+        total = 0
+        while n > 0:
+            total += self.tree[n]
+            n -= n & -n
+        return total
+
+    def total(self) -> int:
+        return self.prefix(len(self.values))
+
+    def find(self, y: int) -> int:
+        # Index of the message covering pixel y (clamped to the valid range)
+        pos, step = 0, 1 << max(0, len(self.tree).bit_length())
+        while step:
+            nxt = pos + step
+            if nxt < len(self.tree) and self.tree[nxt] <= y:
+                pos = nxt
+                y -= self.tree[nxt]
+            step >>= 1
+        return min(pos, max(0, len(self.values) - 1))
+
+
+# =========================
+# Row widget (pooled)
+# =========================
+# One reusable row: an outer strip the width of the feed, holding a bubble
+# with a timestamp label and a text label. System lines reuse the same row
+# with the bubble made transparent.
+
+class _Row:
+    def __init__(self, feed: "VirtualChatFeed"):
+        canvas = feed.canvas
+        self.index = -1
+        self.outer = ctk.CTkFrame(canvas, corner_radius=0, fg_color=feed.cget("fg_color"))
+        self.bubble = ctk.CTkFrame(self.outer, corner_radius=14)
+        self.ts = ctk.CTkLabel(self.bubble, text="", font=TS_FONT)
+        self.body = ctk.CTkLabel(self.bubble, text="", justify="left")
+        self.window = canvas.create_window(0, 0, anchor="nw", window=self.outer, state="hidden")
+        self.outer.bind("<Configure>", lambda e: feed._schedule_measure())
+
+    def bind(self, msg, marked: bool):
+        # Points this row at a message and restyles it
+        if msg.sender == "system":
+            self.ts.pack_forget()
+            self.bubble.configure(fg_color="transparent", border_width=0, corner_radius=0)
+            self.body.configure(
+                text=f"[{msg.ts}] {msg.text}",
+                font=SYSTEM_FONT,
+                text_color=SYSTEM_TEXT,
+                wraplength=SYSTEM_WRAP,
+                fg_color=(MARK_SYSTEM_BG if marked else "transparent"),
+            )
+            self.body.pack_forget()
+            self.body.pack(anchor="w", padx=0, pady=0)
+            self.bubble.pack_forget()
+            self.bubble.pack(anchor="w", padx=14, pady=(10, 6))
+            return
+
+        bubble_color, text_color = USER_COLORS if msg.sender == "user" else EVO_COLORS
+        self.bubble.configure(
+            fg_color=bubble_color,
+            corner_radius=14,
+            border_width=(2 if marked else 0),
+            border_color=MARK_COLOR,
+        )
+        self.ts.configure(text=msg.ts, text_color=text_color)
+        self.body.configure(
+            text=msg.text,
+            font=BODY_FONT,
+            text_color=text_color,
+            wraplength=BUBBLE_WRAP,
+            fg_color="transparent",
+        )
+        # Re-pack in a fixed order so a row that was a system line looks right again
+        self.ts.pack_forget()
+        self.body.pack_forget()
+        self.ts.pack(anchor="w", padx=12, pady=(8, 0))
+        self.body.pack(anchor="w", padx=12, pady=(2, 10))
+        self.bubble.pack_forget()
+        self.bubble.pack(anchor=("e" if msg.sender == "user" else "w"), padx=14, pady=6)
+
+
+# =========================
+# Feed widget
+# =========================
+
+class VirtualChatFeed(ctk.CTkFrame):
+    def __init__(self, master, **kwargs):
+        super().__init__(master, **kwargs)
+        self.grid_rowconfigure(0, weight=1)
+        self.grid_columnconfigure(0, weight=1)
+
+        self.canvas = ctk.CTkCanvas(self, highlightthickness=0, bd=0)
+        self.canvas.configure(bg=self._apply_appearance_mode(self.cget("fg_color")))
+        self.canvas.grid(row=0, column=0, sticky="nsew")
+        self.scrollbar = ctk.CTkScrollbar(self, command=self._on_scrollbar)
+        self.scrollbar.grid(row=0, column=1, sticky="ns")
+        self.canvas.configure(yscrollcommand=self.scrollbar.set)
+
+        self.items: list = []                     # Message objects (need .sender, .text, .ts)
+        self.heights = HeightTree()               # Pixel height per message
+        self.measured: Dict[Tuple[str, str], int] = {}  # (sender, text) -> real height
+        self.body_measure = TextMeasure(BODY_FONT)      # Font-metric estimates before a row is shown
+        self.system_measure = TextMeasure(SYSTEM_FONT)
+        self.ts_measure = TextMeasure(TS_FONT)
+        self.live: Dict[int, _Row] = {}           # Message index -> row currently showing it
+        self.pool: List[_Row] = []                # Hidden rows ready for reuse
+        self.marked: Optional[int] = None         # Index of the highlighted search hit
+        self.on_top: Optional[Callable[[], None]] = None  # Called when the user scrolls to the very top
+
+        self._render_pending = False
+        self._measure_pending = False
+        self._stick_to_bottom = True              # Follow new messages unless the user scrolled up
+
+        self.canvas.bind("<Configure>", lambda e: self._schedule_render())
+        # Mouse wheel: bind globally, only react when the pointer is over this feed
+        # (CTk widgets refuse bind_all, the plain canvas doesn't)
+        self.canvas.bind_all("<MouseWheel>", self._on_wheel, add="+")
+        self.canvas.bind_all("<Button-4>", self._on_wheel, add="+")
+        self.canvas.bind_all("<Button-5>", self._on_wheel, add="+")
+
+    def _set_appearance_mode(self, mode_string):
+        # Keep the canvas background in sync when the theme flips (rows follow fg_color themselves)
+        super()._set_appearance_mode(mode_string)
+        self.canvas.configure(bg=self._apply_appearance_mode(self.cget("fg_color")))
+
+    # -------------------------
+    # Public API
+    # -------------------------
+
+    def __len__(self):
+        return len(self.items)
+
+    def append(self, msg):
+        # Adds one message at the bottom (no widget is built unless it's visible)
+        self._stick_to_bottom = self._at_bottom()
+        self.items.append(msg)
+        self.heights.append(self._height_for(msg))
+        self._schedule_render()
+
+    def prepend(self, msgs: list):
+        # Adds older messages at the top, keeping the current view in place
+        if not msgs:
+            return
+        y0 = self.canvas.canvasy(0)
+        added = [self._height_for(m) for m in msgs]
+        self.items[:0] = msgs
+        self.heights.reset(added + self.heights.values)
+        shift = len(msgs)
+        self.live = {i + shift: row for i, row in self.live.items()}
+        for i, row in self.live.items():
+            row.index = i
+        if self.marked is not None:
+            self.marked += shift
+        self._update_scrollregion()
+        self._yview_to(y0 + sum(added))
+        self._schedule_render()
+
+    def refresh(self, index: int):
+        # Call after a message's text changed (e.g. streaming): re-measure + redraw it
+        msg = self.items[index]
+        self.heights.set(index, self._height_for(msg))
+        row = self.live.get(index)
+        if row is not None:
+            row.bind(msg, index == self.marked)
+        self._stick_to_bottom = self._stick_to_bottom or self._at_bottom()
+        self._schedule_render()
+
+    def clear(self):
+        # Drops all messages. Only the few live rows are touched, not one widget per message.
+        for row in self.live.values():
+            self._release(row)
+        self.live.clear()
+        self.items.clear()
+        self.heights.reset([])
+        self.marked = None
+        self._stick_to_bottom = True
+        self._schedule_render()
+
+    def mark(self, index: Optional[int]):
+        # Highlights one message (search hit). None removes the highlight.
+        old, self.marked = self.marked, index
+        for i in (old, index):
+            if i is not None and i in self.live:
+                self.live[i].bind(self.items[i], i == self.marked)
+
+    def scroll_to(self, index: int):
+        # Scrolls so message index sits near the top of the view
+        self._stick_to_bottom = False
+        self._yview_to(max(0, self.heights.prefix(index) - 20))
+        self._schedule_render()
+
+    def scroll_to_end(self):
+        self._stick_to_bottom = True
+        self._schedule_render()
+
+    # -------------------------
+    # Sizes
+    # -------------------------
+
+    def _estimate(self, msg) -> int:
+        # Height from cached font metrics until the row has been shown once.
+        # Padding numbers mirror the pack() calls in _Row.bind.
+        if msg.sender == "system":
+            _, h = self.system_measure.size(f"[{msg.ts}] {msg.text}", SYSTEM_WRAP)
+            return h + 10 + 6
+        _, h = self.body_measure.size(msg.text, BUBBLE_WRAP)
+        _, ts_h = self.ts_measure.size(msg.ts, BUBBLE_WRAP)
+        return ts_h + h + 8 + 2 + 10 + 6 + 6
+
+    def _height_for(self, msg) -> int:
+        return self.measured.get((msg.sender, msg.text)) or self._estimate(msg)
+
+    def _schedule_measure(self):
+        if not self._measure_pending:
+            self._measure_pending = True
+            self.after(10, self._measure_live)
+
+    def _measure_live(self):
+        # Reads the real height of each visible row (no forced layout pass),
+        # caches it, and fixes the layout where the estimate was off
+        self._measure_pending = False
+        y0 = self.canvas.canvasy(0)
+        shift = 0
+        changed = False
+        for i, row in self.live.items():
+            height = row.outer.winfo_height()
+            if height <= 1 or i >= len(self.items):
+                continue  # Not laid out yet
+            msg = self.items[i]
+            self.measured[(msg.sender, msg.text)] = height
+            delta = height - self.heights.values[i]
+            if not delta:
+                continue
+            if self.heights.prefix(i) < y0:
+                shift += delta  # Row above the view grew/shrank
+            self.heights.set(i, height)
+            changed = True
+
+        if not changed:
+            return
+        self._update_scrollregion()
+        if shift and not self._stick_to_bottom:
+            self._yview_to(y0 + shift)  # Keep what the user is looking at still
+        self._schedule_render()
+
+    # -------------------------
+    # Rendering
+    # -------------------------
+
+    def _schedule_render(self):
+        # Many changes in one tick -> one render
+        if not self._render_pending:
+            self._render_pending = True
+            self.after_idle(self._render)
+
+    def _update_scrollregion(self):
+        width = max(1, self.canvas.winfo_width())
+        self.canvas.configure(scrollregion=(0, 0, width, max(self.heights.total(), self.canvas.winfo_height())))
+
+    def _render(self):
+        self._render_pending = False
+        self._update_scrollregion()
+        if self._stick_to_bottom:
+            self.canvas.yview_moveto(1.0)
+
+        width = max(1, self.canvas.winfo_width())
+        view_h = max(1, self.canvas.winfo_height())
+        y0 = self.canvas.canvasy(0)
+
+        if self.items:
+            first = max(0, self.heights.find(int(y0)) - OVERSCAN)
+            last = min(len(self.items) - 1, self.heights.find(int(y0 + view_h)) + OVERSCAN)
+            wanted = range(first, last + 1)
+        else:
+            wanted = range(0)
+
+        # Return rows that scrolled out of view to the pool
+        for i in [i for i in self.live if i not in wanted]:
+            self._release(self.live.pop(i))
+
+        # Place (and if needed, build) rows for the visible messages
+        for i in wanted:
+            row = self.live.get(i)
+            if row is None:
+                row = self.pool.pop() if self.pool else _Row(self)
+                row.index = i
+                row.bind(self.items[i], i == self.marked)
+                self.live[i] = row
+                self._schedule_measure()
+            self.canvas.coords(row.window, 0, self.heights.prefix(i))
+            self.canvas.itemconfigure(row.window, width=width, state="normal")
+
+    def _release(self, row: _Row):
+        row.index = -1
+        self.canvas.itemconfigure(row.window, state="hidden")
+        self.pool.append(row)
+
+    # -------------------------
+    # Scrolling
+    # -------------------------
+
+    def _at_bottom(self) -> bool:
+        return self.canvas.yview()[1] >= 0.999
+
+    def _yview_to(self, y: float):
+        total = max(1, self.heights.total())
+        self.canvas.yview_moveto(max(0.0, y) / total)
+
+    def _after_scroll(self):
+        self._stick_to_bottom = self._at_bottom()
+        if self.canvas.yview()[0] <= 0.0 and self.on_top is not None:
+            self.on_top()
+        self._schedule_render()
+
+    def _on_scrollbar(self, *args):
+        self.canvas.yview(*args)
+        self._after_scroll()
+
+    def _on_wheel(self, event):
+        # Only scroll when the pointer is over this feed
+        path, mine = str(event.widget), str(self.canvas)
+        if path != mine and not path.startswith(mine + "."):
+            return
+        if getattr(event, "num", None) == 4:
+            steps = -1
+        elif getattr(event, "num", None) == 5:
+            steps = 1
+        else:
+            steps = -1 if event.delta > 0 else 1
+        self.canvas.yview_scroll(steps * 3, "units")
+        self._after_scroll()
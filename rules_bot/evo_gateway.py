@@ -0,0 +1,495 @@
+# =========================
+# Evo gateway (optional local daemon for the CLI scripts)
+# =========================
+# One-shot scripts (summarizing_bot.py, gemini_v4.py, the dev_bot ones, ...)
+# spend most of their run importing the SDK, creating a client and doing the
+# TLS handshake. The gateway does that once and keeps it:
+#
+#   python rules_bot/evo_gateway.py serve      # leave running (Ctrl+C to stop)
+#   python rules_bot/evo_gateway.py status     # is it up? cache / rate-limit numbers
+#   python rules_bot/evo_gateway.py stop
+#
+# Scripts call gemini_client(api_key) / openai_client(api_key) instead of
+# creating the SDK client. If the gateway is running they get a thin client
+# that only imports socket + json; if not, they get the normal SDK client.
+# Both have the same calls the scripts use:
+#
+#   client.models.generate_content(model=..., contents=..., config=...).text
+#   client.chats.create(model=...).send_message(text).text
+#   client.chat.completions.create(model=..., messages=[...], ...).choices[0].message.content
+#   client.responses.create(model=..., input=...).output_text
+#
+# What the daemon keeps between scripts:
+# - one SDK client per provider + API key (connections kept warm, see evo_sessions)
+# - a response cache for identical one-shot requests (CACHE_TTL)
+# - a requests-per-minute limiter per provider (waits instead of hitting 429s)
+#
+# The API key always comes from the script; the daemon never uses a key a
+# client didn't send (requests without one are refused, so the SDK can't fall
+# back to the daemon's own environment), and cache entries are per key.
+#
+# Transport: a Unix socket (only the current user can open it). Windows Python
+# has no Unix sockets, so there it listens on 127.0.0.1:GATEWAY_PORT instead.
+# Protocol: one JSON object per line each way, like evo_audio_service.
+
+import os
+import sys
+import json
+import time
+import socket
+import hashlib
+import tempfile
+import argparse
+import threading
+from types import SimpleNamespace
+from collections import OrderedDict, deque
+from typing import Dict, Optional, Tuple
+
+
+GATEWAY_PORT = int(os.getenv("EVO_GATEWAY_PORT", "47831"))   # TCP port (Windows)
+CONNECT_TIMEOUT = 0.2     # Seconds to wait for the daemon before using the SDK directly
+REQUEST_TIMEOUT = 300     # Seconds a request may take (long generations)
+CACHE_TTL = 600           # Seconds an identical one-shot request is answered from the cache
+CACHE_MAX = 256           # Cached responses kept (oldest dropped first)
+RPM = {                   # Requests per minute per provider (EVO_GATEWAY_RPM_GEMINI=... to change)
+    "gemini": int(os.getenv("EVO_GATEWAY_RPM_GEMINI", "15")),
+    "openai": int(os.getenv("EVO_GATEWAY_RPM_OPENAI", "60")),
+}
+WARM_MODEL = {            # Model used to warm a new key's connection until it has been used
+    "gemini": "gemini-flash-latest",
+}
+
+
+def socket_path() -> Optional[str]:
+    # Unix socket file, or None where Unix sockets don't exist (Windows)
+    if not hasattr(socket, "AF_UNIX"):
+        return None
+    default = os.path.join(tempfile.gettempdir(), f"evo-gateway-{os.getuid()}.sock")
+    return os.getenv("EVO_GATEWAY_SOCKET", default)
+
+
+def key_id(key: Optional[str]) -> str:
+    # Short stable id for an API key (the key itself is never logged or used as a dict key)
+    return hashlib.sha256((key or "").encode("utf-8")).hexdigest()[:16]
+
+
+class GatewayError(RuntimeError):
+    pass
+
+
+# =========================
+# Client side (what the scripts import)
+# =========================
+
+class _Connection:
+    def __init__(self, sock: socket.socket):
+        self.sock = sock
+        self.file = sock.makefile("rw", encoding="utf-8", newline="\n")
+        self.lock = threading.Lock()
+
+    def call(self, op: str, **fields) -> dict:
+        with self.lock:
+            self.file.write(json.dumps(dict(fields, op=op)) + "\n")
+            self.file.flush()
+            line = self.file.readline()
+        if not line:
+            raise GatewayError("Gateway closed the connection")
+        reply = json.loads(line)
+        if not reply.get("ok"):
+            raise GatewayError(reply.get("error") or "gateway error")
+        return reply
+
+    def close(self):
+        try:
+            self.file.close()
+        finally:
+            self.sock.close()
+
+
+def connect() -> Optional[_Connection]:
+    # Connection to a running gateway, or None (quickly) if there isn't one
+    path = socket_path()
+    try:
+        if path is not None:
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            sock.settimeout(CONNECT_TIMEOUT)
+            sock.connect(path)
+        else:
+            sock = socket.create_connection(("127.0.0.1", GATEWAY_PORT), timeout=CONNECT_TIMEOUT)
+    except OSError:
+        return None
+    sock.settimeout(REQUEST_TIMEOUT)
+    return _Connection(sock)
+
+
+class _GatewayChat:
+    def __init__(self, conn: _Connection, chat_id: int):
+        self.conn = conn
+        self.chat_id = chat_id
+
+    def send_message(self, message: str):
+        reply = self.conn.call("chat_send", chat=self.chat_id, message=message)
+        return SimpleNamespace(text=reply["text"])
+
+
+class _GatewayGemini:
+    # Looks like google.genai.Client for the calls the scripts make
+    def __init__(self, conn: _Connection, api_key: str):
+        self.conn = conn
+        self.api_key = api_key
+        self.models = SimpleNamespace(generate_content=self._generate_content)
+        self.chats = SimpleNamespace(create=self._create_chat)
+
+    def _generate_content(self, model: str, contents, config=None):
+        reply = self.conn.call("generate", provider="gemini", key=self.api_key,
+                               model=model, contents=contents, config=config)
+        return SimpleNamespace(text=reply["text"])
+
+    def _create_chat(self, model: str):
+        reply = self.conn.call("chat_create", provider="gemini", key=self.api_key, model=model)
+        return _GatewayChat(self.conn, reply["chat"])
+
+
+class _GatewayOpenAI:
+    # Looks like openai.OpenAI for the calls the scripts make
+    def __init__(self, conn: _Connection, api_key: Optional[str]):
+        self.conn = conn
+        self.api_key = api_key
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._chat_completion))
+        self.responses = SimpleNamespace(create=self._response)
+
+    def _chat_completion(self, model: str, messages, **params):
+        reply = self.conn.call("openai_chat", provider="openai", key=self.api_key,
+                               model=model, messages=messages, params=params)
+        message = SimpleNamespace(content=reply["text"], role="assistant")
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+    def _response(self, model: str, input, **params):
+        reply = self.conn.call("openai_response", provider="openai", key=self.api_key,
+                               model=model, input=input, params=params)
+        return SimpleNamespace(output_text=reply["text"])
+
+
+def gemini_client(api_key: Optional[str] = None):
+    # Gateway client if the daemon is up, else google.genai.Client (imported only then)
+    api_key = api_key or os.getenv("GEMINI_API_KEY")
+    conn = connect() if api_key else None  # The gateway only serves requests that bring a key
+    if conn is not None:
+        try:
+            conn.call("hello", provider="gemini", key=api_key)  # Daemon starts warming this key
+            return _GatewayGemini(conn, api_key)
+        except (OSError, ValueError, GatewayError):
+            conn.close()
+    from google import genai
+    return genai.Client(api_key=api_key)
+
+
+def openai_client(api_key: Optional[str] = None):
+    # Gateway client if the daemon is up, else openai.OpenAI (imported only then)
+    api_key = api_key or os.getenv("OPENAI_API_KEY")
+    conn = connect() if api_key else None
+    if conn is not None:
+        try:
+            conn.call("hello", provider="openai", key=api_key)
+            return _GatewayOpenAI(conn, api_key)
+        except (OSError, ValueError, GatewayError):
+            conn.close()
+    from openai import OpenAI
+    return OpenAI(api_key=api_key)
+
+
+# =========================
+# Daemon side
+# =========================
+
+class RateLimiter:
+    # At most `rpm` requests in any 60 seconds; acquire() waits for a free slot
+    def __init__(self, rpm: int):
+        self.rpm = max(1, rpm)
+        self._times = deque()
+        self._lock = threading.Lock()
+        self.waited = 0.0                  # Total seconds callers spent waiting
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                while self._times and now - self._times[0] >= 60:
+                    self._times.popleft()
+                if len(self._times) < self.rpm:
+                    self._times.append(now)
+                    return
+                wait = 60 - (now - self._times[0])
+                self.waited += wait
+            time.sleep(wait)
+
+
+class ResponseCache:
+    def __init__(self, max_items: int = CACHE_MAX, ttl: float = CACHE_TTL):
+        self.max_items = max_items
+        self.ttl = ttl
+        self._items: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(request: dict) -> str:
+        parts = {k: request.get(k) for k in ("op", "provider", "model", "contents", "config", "messages", "input", "params")}
+        parts["key"] = key_id(request.get("key"))
+        return hashlib.sha256(json.dumps(parts, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            item = self._items.get(key)
+            if item is None or time.monotonic() - item[0] > self.ttl:
+                self._items.pop(key, None)
+                self.misses += 1
+                return None
+            self._items.move_to_end(key)
+            self.hits += 1
+            return item[1]
+
+    def put(self, key: str, text: str):
+        with self._lock:
+            self._items[key] = (time.monotonic(), text)
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_items:
+                self._items.popitem(last=False)
+
+
+class Gateway:
+    def __init__(self):
+        self.cache = ResponseCache()
+        self.limits = {name: RateLimiter(rpm) for name, rpm in RPM.items()}
+        self._clients: Dict[Tuple[str, str], object] = {}   # (provider, key id) -> SDK client
+        self._pools: Dict[str, object] = {}                 # gemini key id -> SessionPool
+        self._last_model: Dict[str, str] = {}               # gemini key id -> model used last
+        self._chats: Dict[int, object] = {}
+        self._next_chat = 0
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.started = time.time()
+
+    def preload(self):
+        # Import the SDKs now, so the first script doesn't pay for it
+        for name in ("google.genai", "openai"):
+            try:
+                __import__(name)
+            except ImportError:
+                pass
+
+    def client(self, provider: str, key: Optional[str]):
+        # Every SDK client is made with the key the script sent. Without one the SDK
+        # would read the daemon's own GEMINI_API_KEY / OPENAI_API_KEY, so refuse.
+        if not key:
+            raise GatewayError("No API key in the request")
+        kid = key_id(key)
+        with self._lock:
+            client = self._clients.get((provider, kid))
+            if client is None:
+                if provider == "gemini":
+                    from google import genai
+                    from evo_sessions import SessionPool
+                    client = genai.Client(api_key=key)
+                    self._pools[kid] = SessionPool(client)
+                elif provider == "openai":
+                    from openai import OpenAI
+                    client = OpenAI(api_key=key)
+                else:
+                    raise GatewayError(f"Unknown provider: {provider}")
+                self._clients[(provider, kid)] = client
+        return client
+
+    def warm(self, provider: str, key: Optional[str], model: Optional[str] = None):
+        # Gemini: handshake in the background (evo_sessions.SessionPool) while the script reads input
+        self.client(provider, key)
+        if provider != "gemini":
+            return  # The OpenAI client keeps its own pool; nothing cheap to pre-open
+        kid = key_id(key)
+        model = model or self._last_model.get(kid) or WARM_MODEL["gemini"]
+        self._pools[kid].warm(model)
+
+    def handle(self, req: dict, conn_chats: set) -> dict:
+        op = req.get("op")
+        if op == "ping":
+            return {"pid": os.getpid()}
+        if op == "stats":
+            return self.stats()
+        if op == "hello":
+            self.warm(req.get("provider"), req.get("key"))
+            return {}
+        if op == "chat_create":
+            chat = self._chat_pool(req).take(req["model"]) if req.get("provider") == "gemini" else None
+            if chat is None:
+                raise GatewayError("Chats are only available for gemini")
+            with self._lock:
+                self._next_chat += 1
+                self._chats[self._next_chat] = chat
+                conn_chats.add(self._next_chat)
+            return {"chat": self._next_chat}
+        if op == "chat_send":
+            chat = self._chats.get(req.get("chat"))
+            if chat is None or req.get("chat") not in conn_chats:
+                raise GatewayError("Unknown chat")
+            self.limits["gemini"].acquire()
+            return {"text": chat.send_message(req.get("message", "")).text}
+        if op in ("generate", "openai_chat", "openai_response"):
+            return {"text": self._one_shot(req)}
+        raise GatewayError(f"Unknown op: {op}")
+
+    def _chat_pool(self, req: dict):
+        self.client("gemini", req.get("key"))
+        self._last_model[key_id(req.get("key"))] = req["model"]
+        return self._pools[key_id(req.get("key"))]
+
+    def _one_shot(self, req: dict) -> str:
+        provider = req.get("provider")
+        client = self.client(provider, req.get("key"))  # Also refuses requests without a key
+        cache_key = ResponseCache.key(req)
+        text = self.cache.get(cache_key)
+        if text is not None:
+            return text
+        limiter = self.limits.get(provider)
+        if limiter is not None:
+            limiter.acquire()
+        if req["op"] == "generate":
+            self._last_model[key_id(req.get("key"))] = req["model"]
+            resp = client.models.generate_content(model=req["model"], contents=req.get("contents"),
+                                                  config=req.get("config"))
+            text = resp.text or ""
+        elif req["op"] == "openai_chat":
+            resp = client.chat.completions.create(model=req["model"], messages=req.get("messages"),
+                                                  **(req.get("params") or {}))
+            text = resp.choices[0].message.content or ""
+        else:
+            resp = client.responses.create(model=req["model"], input=req.get("input"), **(req.get("params") or {}))
+            text = resp.output_text or ""
+        self.cache.put(cache_key, text)
+        return text
+
+    def drop_chats(self, chat_ids: set):
+        with self._lock:
+            for cid in chat_ids:
+                self._chats.pop(cid, None)
+
+    def stats(self) -> dict:
+        return {
+            "pid": os.getpid(),
+            "uptime_s": round(time.time() - self.started),
+            "requests": self.requests,
+            "clients": len(self._clients),
+            "open_chats": len(self._chats),
+            "cache_hits": self.cache.hits,
+            "cache_misses": self.cache.misses,
+            "rate_wait_s": {name: round(limit.waited, 1) for name, limit in self.limits.items()},
+        }
+
+
+def _serve_connection(gateway: Gateway, sock: socket.socket, stop: threading.Event):
+    chats = set()
+    f = sock.makefile("rw", encoding="utf-8", newline="\n")
+    try:
+        for line in f:
+            try:
+                req = json.loads(line)
+                gateway.requests += 1
+                if req.get("op") == "shutdown":
+                    reply = {"ok": True}
+                    stop.set()
+                else:
+                    reply = dict(gateway.handle(req, chats), ok=True)
+            except Exception as e:
+                reply = {"ok": False, "error": f"{type(e).__name__}: {e}"}
+            f.write(json.dumps(reply) + "\n")
+            f.flush()
+            if stop.is_set():
+                break
+    except OSError:
+        pass  # Script went away mid-request
+    finally:
+        gateway.drop_chats(chats)
+        sock.close()
+
+
+def serve():
+    path = socket_path()
+    if connect() is not None:
+        print("Gateway is already running.")
+        return 1
+    if path is not None:
+        if os.path.exists(path):
+            os.unlink(path)  # Left over from a daemon that didn't shut down cleanly
+        server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        old_mask = os.umask(0o177)  # Socket file readable/writable by this user only
+        try:
+            server.bind(path)
+        finally:
+            os.umask(old_mask)
+        where = path
+    else:
+        server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        server.bind(("127.0.0.1", GATEWAY_PORT))
+        where = f"127.0.0.1:{GATEWAY_PORT}"
+    server.listen(16)
+    server.settimeout(0.5)  # Wake up regularly to notice "stop"
+
+    gateway = Gateway()
+    gateway.preload()
+    gemini_key = os.getenv("GEMINI_API_KEY")
+    if gemini_key:
+        try:
+            gateway.warm("gemini", gemini_key)
+        except Exception as e:
+            print(f"(gemini warm-up skipped: {e})")
+    print(f"Evo gateway listening on {where} (Ctrl+C to stop)")
+
+    stop = threading.Event()
+    try:
+        while not stop.is_set():
+            try:
+                sock, _ = server.accept()
+            except socket.timeout:
+                continue
+            sock.settimeout(None)
+            threading.Thread(target=_serve_connection, args=(gateway, sock, stop), daemon=True).start()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.close()
+        if path is not None and os.path.exists(path):
+            os.unlink(path)
+    print("Evo gateway stopped.")
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Local gateway that keeps LLM clients warm for the CLI scripts.")
+    parser.add_argument("command", choices=["serve", "status", "stop"])
+    args = parser.parse_args(argv)
+
+    if args.command == "serve":
+        try:
+            from dotenv import load_dotenv
+            load_dotenv()
+        except ImportError:
+            pass
+        return serve()
+
+    conn = connect()
+    if conn is None:
+        print("Gateway is not running.")
+        return 1
+    if args.command == "stop":
+        conn.call("shutdown")
+        print("Gateway stopped.")
+        return 0
+    stats = conn.call("stats")
+    stats.pop("ok", None)
+    for name, value in stats.items():
+        print(f"{name:<14}{value}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,156 @@
+# =========================
+# Evo History (SQLite)
+# =========================
+# Every chat message gets saved to a local SQLite file, as it happens.
+#
+# - WAL mode: readers (loading older pages) never block the writer.
+# - Writes go through a queue to one background thread, which inserts them
+#   in small batches (one transaction per batch). The UI thread never waits on disk.
+# - Reading is done in pages: newest page on startup, older pages on demand.
+#
+# If the app crashes, at most the last ~0.1 s of messages is still in the queue.
+
+import time
+import queue
+import sqlite3
+import threading
+from typing import Iterator, List, Optional, Tuple
+
+
+# =========================
+# Configuration
+# =========================
+
+HISTORY_FILE = "evo_history.db"   # Next to evo_settings.json
+PAGE_SIZE = 200                   # Messages per page (startup + each "load older")
+BATCH_MAX = 500                   # Max rows per insert transaction
+BATCH_WAIT = 0.1                  # Seconds to wait for more rows before committing a batch
+
+# Row as returned by the read helpers: (id, session, sender, text, ts, created)
+Row = Tuple[int, int, str, str, str, float]
+
+
+class HistoryStore:
+    def __init__(self, path: str = HISTORY_FILE):
+        self.path = path
+        self.session = int(time.time() * 1000)  # New chat session id (start time in ms)
+
+        # Read connection (used from the UI thread and loader threads)
+        self._lock = threading.Lock()
+        self.db = sqlite3.connect(path, check_same_thread=False)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")  # Safe against app crashes in WAL mode
+        self.db.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS messages (
+                id      INTEGER PRIMARY KEY AUTOINCREMENT,
+                session INTEGER NOT NULL,
+                sender  TEXT NOT NULL,
+                text    TEXT NOT NULL,
+                ts      TEXT NOT NULL,
+                created REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS messages_session ON messages(session);
+            """
+        )
+        self.db.commit()
+
+        # Writer thread + its queue
+        self._queue: "queue.Queue[Optional[tuple]]" = queue.Queue()
+        self._writer = threading.Thread(target=self._write_loop, daemon=True)
+        self._writer.start()
+
+    # -------------------------
+    # Writing
+    # -------------------------
+
+    def new_session(self) -> int:
+        # Marks the start of a new chat (New Chat button). Returns the new session id.
+        self.session = max(self.session + 1, int(time.time() * 1000))
+        return self.session
+
+    def append(self, sender: str, text: str, ts: str):
+        # Queues one message for saving (returns immediately)
+        self._queue.put((self.session, sender, text, ts, time.time()))
+
+    def flush(self):
+        # Blocks until everything queued so far is on disk
+        self._queue.join()
+
+    def close(self):
+        # Saves what's left and stops the writer
+        self._queue.put(None)
+        self._writer.join(timeout=5)
+        with self._lock:
+            self.db.close()
+
+    def _write_loop(self):
+        db = sqlite3.connect(self.path)
+        db.execute("PRAGMA synchronous=NORMAL")
+        running = True
+        while running:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + BATCH_WAIT
+            while len(batch) < BATCH_MAX and batch[-1] is not None:
+                try:
+                    batch.append(self._queue.get(timeout=max(0.0, deadline - time.monotonic())))
+                except queue.Empty:
+                    break
+
+            rows = [r for r in batch if r is not None]
+            running = batch[-1] is not None
+            try:
+                if rows:
+                    with db:
+                        db.executemany(
+                            "INSERT INTO messages (session, sender, text, ts, created) VALUES (?, ?, ?, ?, ?)",
+                            rows,
+                        )
+            except sqlite3.Error as e:
+                print(f"History write failed: {e}")
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+        db.close()
+
+    # -------------------------
+    # Reading
+    # -------------------------
+
+    def latest(self, limit: int = PAGE_SIZE) -> List[Row]:
+        # Newest page of messages, oldest first
+        with self._lock:
+            rows = self.db.execute(
+                "SELECT id, session, sender, text, ts, created FROM messages ORDER BY id DESC LIMIT ?",
+                (limit,),
+            ).fetchall()
+        rows.reverse()
+        return rows
+
+    def before(self, msg_id: int, limit: int = PAGE_SIZE) -> List[Row]:
+        # The page just before msg_id, oldest first (empty = no more history)
+        with self._lock:
+            rows = self.db.execute(
+                "SELECT id, session, sender, text, ts, created FROM messages WHERE id < ? ORDER BY id DESC LIMIT ?",
+                (msg_id, limit),
+            ).fetchall()
+        rows.reverse()
+        return rows
+
+    def count(self) -> int:
+        with self._lock:
+            return self.db.execute("SELECT COUNT(*) FROM messages").fetchone()[0]
+
+    def iter_all(self, batch: int = 1000) -> Iterator[Row]:
+        # Streams every saved message, oldest first, one page at a time (for export)
+        last = 0
+        while True:
+            with self._lock:
+                rows = self.db.execute(
+                    "SELECT id, session, sender, text, ts, created FROM messages WHERE id > ? ORDER BY id LIMIT ?",
+                    (last, batch),
+                ).fetchall()
+            if not rows:
+                return
+            yield from rows
+            last = rows[-1][0]
@@ -0,0 +1,167 @@
+# =========================
+# Evo voice latency tracing
+# =========================
+# Where does the time go in one voice turn? Each turn gets a VoiceTrace with
+# one timing span per stage:
+#
+#   mic          Mic pressed -> speech engines / microphone ready
+#   calibration  Waiting for the one-time noise calibration (0 after the first turn)
+#   listen       Listening (includes the time before the user starts talking)
+#   transcribe   End of speech -> text (command spotting + STT)
+#   model        Message sent -> first piece of the reply
+#   reply        Message sent -> whole reply received
+#   speech       First piece of the reply -> Evo starts talking
+#   total        End of the user's speech -> Evo starts talking (what the user waits for)
+#
+# Finished turns go to a rolling p50/p95 table (shown in the sidebar) and are
+# appended to a JSONL trace file, one line per turn:
+#   {"ts": "...", "turn": 3, "source": "mic", "outcome": "spoken",
+#    "spans": {"listen": {"at": 412.0, "ms": 2310.5}, ...}}
+# "at" = ms after the turn started, "ms" = how long the stage took.
+
+import json
+import math
+import time
+import queue
+import threading
+from collections import deque
+from datetime import datetime
+from typing import Callable, Deque, Dict, List, Optional
+
+
+TRACE_FILE = "voice_trace.jsonl"   # Next to evo_settings.json (not in logs/, search indexes that)
+WINDOW = 50                        # Turns the p50/p95 table is computed over
+STAGES = ["mic", "calibration", "listen", "transcribe", "model", "reply", "speech", "total"]
+
+
+def percentile(values: List[float], p: float) -> float:
+    # Nearest-rank percentile (p in 0..100); values don't need to be sorted
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    k = max(0, min(len(ordered) - 1, math.ceil(p / 100 * len(ordered)) - 1))
+    return ordered[k]
+
+
+class VoiceTrace:
+    # Timing spans of one voice turn. start()/stop() may be called from any thread.
+    def __init__(self, turn: int, source: str, tracker: "LatencyTracker"):
+        self.turn = turn
+        self.source = source           # "mic" | "wake" | "barge"
+        self.tracker = tracker
+        self.t0 = time.perf_counter()
+        self.ts = datetime.now().isoformat(timespec="seconds")
+        self.spans: Dict[str, dict] = {}
+        self._open: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        self.done = False
+
+    def start(self, stage: str):
+        with self._lock:
+            self._open[stage] = time.perf_counter()
+
+    def stop(self, stage: str):
+        # Ignored if the stage was never started or already stopped
+        now = time.perf_counter()
+        with self._lock:
+            began = self._open.pop(stage, None)
+            if began is not None:
+                self.spans[stage] = {"at": round((began - self.t0) * 1000, 1), "ms": round((now - began) * 1000, 1)}
+
+    def span(self, stage: str):
+        # with trace.span("listen"): ...
+        return _Span(self, stage)
+
+    def finish(self, outcome: str):
+        # Records the turn once; later calls do nothing. Open spans are dropped.
+        with self._lock:
+            if self.done:
+                return
+            self.done = True
+            self._open.clear()
+        self.tracker.record(self, outcome)
+
+
+class _Span:
+    def __init__(self, trace: VoiceTrace, stage: str):
+        self.trace = trace
+        self.stage = stage
+
+    def __enter__(self):
+        self.trace.start(self.stage)
+        return self
+
+    def __exit__(self, *exc):
+        self.trace.stop(self.stage)
+        return False
+
+
+class LatencyTracker:
+    def __init__(self, path: Optional[str] = TRACE_FILE, window: int = WINDOW,
+                 on_update: Optional[Callable[[str], None]] = None):
+        # path: JSONL trace file (None = don't write)
+        # on_update(table_text): called after each finished turn (from the finishing thread)
+        self.path = path
+        self.on_update = on_update
+        self.samples: Dict[str, Deque[float]] = {s: deque(maxlen=window) for s in STAGES}
+        self._turns = 0
+        self._lock = threading.Lock()
+        self._writes: "queue.Queue[Optional[str]]" = queue.Queue()
+        self._writer: Optional[threading.Thread] = None
+
+    def new_turn(self, source: str = "mic") -> VoiceTrace:
+        with self._lock:
+            self._turns += 1
+            return VoiceTrace(self._turns, source, self)
+
+    def record(self, trace: VoiceTrace, outcome: str):
+        with self._lock:
+            for stage, span in trace.spans.items():
+                if stage in self.samples:
+                    self.samples[stage].append(span["ms"])
+            table = self._table()
+        if self.path:
+            line = json.dumps({
+                "ts": trace.ts, "turn": trace.turn, "source": trace.source,
+                "outcome": outcome, "spans": trace.spans,
+            })
+            self._write(line)
+        if self.on_update:
+            self.on_update(table)
+
+    def table(self) -> str:
+        with self._lock:
+            return self._table()
+
+    def _table(self) -> str:
+        # Fixed-width text: stage, p50, p95, samples (stages without data are left out)
+        rows = [f"{'stage':<12}{'p50':>7}{'p95':>7}{'n':>4}"]
+        for stage in STAGES:
+            values = list(self.samples[stage])
+            if values:
+                rows.append(f"{stage:<12}{percentile(values, 50):>7.0f}{percentile(values, 95):>7.0f}{len(values):>4}")
+        return "\n".join(rows) if len(rows) > 1 else "No voice turns yet"
+
+    def _write(self, line: str):
+        # File IO happens on a writer thread, so the TTS/mic threads never wait on disk
+        with self._lock:
+            if self._writer is None:
+                self._writer = threading.Thread(target=self._write_loop, daemon=True)
+                self._writer.start()
+        self._writes.put(line)
+
+    def _write_loop(self):
+        while True:
+            line = self._writes.get()
+            if line is None:
+                return
+            try:
+                with open(self.path, "a", encoding="utf-8") as f:
+                    f.write(line + "\n")
+            except OSError:
+                pass  # Tracing must never break the voice loop
+
+    def close(self):
+        if self._writer is not None:
+            self._writes.put(None)
+            self._writer.join(timeout=2)
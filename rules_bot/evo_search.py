@@ -0,0 +1,566 @@
+# =========================
+# Evo Search
+# =========================
+# Full-text search over old chats on disk (logs/ and sessions/),
+# plus a small in-memory index for the chat that is open right now.
+#
+# How it works (short version):
+# - Every log file is split into words ("terms").
+# - For each term we remember which files it appears in and where
+#   (word position + byte offset). That table is called "postings".
+# - Postings live in a small SQLite file, so we don't rebuild them every run.
+# - On refresh we only re-read files whose mtime/size changed.
+# - Snippets are read straight from the file through mmap (no full file load).
+#
+# CLI:
+#   python rules_bot/evo_search.py rate limit          -> both words
+#   python rules_bot/evo_search.py "\"rate limit\""    -> exact phrase
+#   python rules_bot/evo_search.py gemin*              -> prefix
+#   python rules_bot/evo_search.py --reindex           -> rebuild everything
+
+import os                 # File paths + walking folders
+import re                 # Tokenizer + query parser
+import sys                # CLI args
+import time               # Timing for the CLI
+import mmap               # Read snippets without loading the whole file
+import sqlite3            # Persistent postings store
+import threading          # One lock around the shared connection
+from array import array   # Compact (position, offset) lists stored as BLOBs
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Set, Tuple
+
+
+# =========================
+# Configuration
+# =========================
+
+INDEX_FILE = "evo_search.db"                  # Where postings are stored (next to evo_settings.json)
+SEARCH_DIRS = ["logs", "sessions"]            # Folders that hold old chats
+SEARCH_EXTS = {".txt", ".md", ".jsonl", ".log"}  # File types worth indexing
+MAX_PREFIX_TERMS = 200                        # Cap how many words "gem*" can expand into
+SNIPPET_BEFORE = 60                           # Bytes of context before a hit
+SNIPPET_AFTER = 140                           # Bytes of context after a hit
+
+# Words are ASCII letters/digits or any UTF-8 multibyte sequence (so "café" stays one word)
+TOKEN_RE = re.compile(rb"(?:[A-Za-z0-9]|[\x80-\xff])+")
+
+# Query parts: "quoted phrase" or a single word (optionally ending with *)
+QUERY_RE = re.compile(r'"([^"]+)"|(\S+)')
+
+
+# =========================
+# Helpers
+# =========================
+
+def tokenize(data: bytes):
+    # Yields (position, byte_offset, term) for each word in a file
+    for pos, m in enumerate(TOKEN_RE.finditer(data)):
+        term = m.group().decode("utf-8", "ignore").lower()
+        if term:
+            yield pos, m.start(), term
+
+
+def query_terms(text: str) -> List[str]:
+    # Splits free text into the same lowercase terms the index uses
+    return [t for _, _, t in tokenize(text.encode("utf-8"))]
+
+
+def parse_query(q: str) -> List[Tuple[str, List[str]]]:
+    # Turns a query string into clauses. Every clause must match (AND).
+    # - ("phrase", ["rate", "limit"])
+    # - ("prefix", ["gemin"])
+    # - ("term",   ["hello"])
+    clauses = []
+    for m in QUERY_RE.finditer(q or ""):
+        phrase, word = m.group(1), m.group(2)
+        if phrase:
+            terms = query_terms(phrase)
+            if len(terms) == 1:
+                clauses.append(("term", terms))
+            elif terms:
+                clauses.append(("phrase", terms))
+            continue
+
+        is_prefix = word.endswith("*")
+        terms = query_terms(word.rstrip("*"))
+        if not terms:
+            continue
+        if is_prefix:
+            # "foo-bar*" -> "foo bar*" (last part is the prefix)
+            if len(terms) > 1:
+                clauses.append(("phrase", terms[:-1]))
+            clauses.append(("prefix", terms[-1:]))
+        elif len(terms) == 1:
+            clauses.append(("term", terms))
+        else:
+            clauses.append(("phrase", terms))
+    return clauses
+
+
+def read_snippet(path: str, offset: int) -> str:
+    # Reads a small window around a byte offset using mmap
+    try:
+        with open(path, "rb") as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return ""
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                start = max(0, offset - SNIPPET_BEFORE)
+                end = min(len(mm), offset + SNIPPET_AFTER)
+                # Don't cut across the previous line when the hit is near its start
+                nl = mm.rfind(b"\n", start, offset)
+                if nl != -1:
+                    start = nl + 1
+                raw = mm[start:end]
+    except OSError:
+        return ""
+    text = raw.decode("utf-8", "ignore")
+    return re.sub(r"\s+", " ", text).strip()
+
+
+# =========================
+# Search result
+# =========================
+
+@dataclass
+class SearchHit:
+    path: str     # File that matched
+    score: int    # Number of matching positions (more = better)
+    offset: int   # Byte offset of the first hit (used for the snippet)
+    snippet: str  # Text around the first hit
+
+
+# =========================
+# Log index
+# =========================
+
+class LogIndex:
+    def __init__(self, index_file: str = INDEX_FILE, dirs: Optional[List[str]] = None):
+        self.index_file = index_file
+        self.dirs = list(dirs or SEARCH_DIRS)
+        self._lock = threading.Lock()  # The app searches from worker threads
+        self.db = sqlite3.connect(index_file, check_same_thread=False)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS docs (
+                id    INTEGER PRIMARY KEY,
+                path  TEXT UNIQUE NOT NULL,
+                mtime REAL NOT NULL,
+                size  INTEGER NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS postings (
+                term TEXT NOT NULL,
+                doc  INTEGER NOT NULL,
+                hits BLOB NOT NULL,
+                PRIMARY KEY (term, doc)
+            ) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS postings_doc ON postings(doc);
+            """
+        )
+
+    def close(self):
+        with self._lock:
+            self.db.close()
+
+    # -------------------------
+    # Indexing
+    # -------------------------
+
+    def _scan_files(self) -> Dict[str, Tuple[float, int]]:
+        # Finds every indexable file and returns {path: (mtime, size)}
+        found = {}
+        for root_dir in self.dirs:
+            if not os.path.isdir(root_dir):
+                continue
+            for dirpath, dirnames, filenames in os.walk(root_dir):
+                dirnames[:] = [d for d in dirnames if not d.startswith(".")]
+                for name in filenames:
+                    if name.startswith(".") or os.path.splitext(name)[1].lower() not in SEARCH_EXTS:
+                        continue
+                    path = os.path.join(dirpath, name)
+                    try:
+                        st = os.stat(path)
+                    except OSError:
+                        continue
+                    found[path] = (st.st_mtime, st.st_size)
+        return found
+
+    def _index_file(self, doc_id: int, path: str):
+        # Replaces all postings for one file
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+        except OSError:
+            return
+
+        per_term: Dict[str, array] = {}
+        for pos, off, term in tokenize(data):
+            hits = per_term.get(term)
+            if hits is None:
+                hits = per_term[term] = array("I")
+            hits.append(pos)
+            hits.append(off)
+
+        self.db.execute("DELETE FROM postings WHERE doc = ?", (doc_id,))
+        self.db.executemany(
+            "INSERT INTO postings (term, doc, hits) VALUES (?, ?, ?)",
+            ((term, doc_id, hits.tobytes()) for term, hits in per_term.items()),
+        )
+
+    def refresh(self, full: bool = False) -> Tuple[int, int]:
+        # Brings the index up to date. Only changed files are re-read.
+        # Returns (files re-indexed, files removed).
+        found = self._scan_files()
+        indexed = removed = 0
+        with self._lock, self.db:
+            known = {
+                path: (doc_id, mtime, size)
+                for doc_id, path, mtime, size in self.db.execute("SELECT id, path, mtime, size FROM docs")
+            }
+
+            for path, (doc_id, _, _) in known.items():
+                if path not in found:
+                    self.db.execute("DELETE FROM postings WHERE doc = ?", (doc_id,))
+                    self.db.execute("DELETE FROM docs WHERE id = ?", (doc_id,))
+                    removed += 1
+
+            for path, (mtime, size) in found.items():
+                old = known.get(path)
+                if old and not full and old[1] == mtime and old[2] == size:
+                    continue
+                if old:
+                    doc_id = old[0]
+                    self.db.execute("UPDATE docs SET mtime = ?, size = ? WHERE id = ?", (mtime, size, doc_id))
+                else:
+                    cur = self.db.execute(
+                        "INSERT INTO docs (path, mtime, size) VALUES (?, ?, ?)", (path, mtime, size)
+                    )
+                    doc_id = cur.lastrowid
+                self._index_file(doc_id, path)
+                indexed += 1
+        return indexed, removed
+
+    # -------------------------
+    # Querying
+    # -------------------------
+
+    def _postings(self, term: str) -> Dict[int, array]:
+        # {doc_id: [pos0, off0, pos1, off1, ...]} for one exact term
+        out = {}
+        for doc, blob in self.db.execute("SELECT doc, hits FROM postings WHERE term = ?", (term,)):
+            hits = array("I")
+            hits.frombytes(blob)
+            out[doc] = hits
+        return out
+
+    def _prefix_postings(self, prefix: str) -> Dict[int, array]:
+        # Same as _postings, merged across every term that starts with prefix
+        rows = self.db.execute(
+            "SELECT DISTINCT term FROM postings WHERE term >= ? AND term < ? ORDER BY term LIMIT ?",
+            (prefix, prefix + "\U0010ffff", MAX_PREFIX_TERMS),
+        ).fetchall()
+        out: Dict[int, array] = {}
+        for (term,) in rows:
+            for doc, hits in self._postings(term).items():
+                if doc in out:
+                    out[doc].extend(hits)
+                else:
+                    out[doc] = hits
+        return out
+
+    def _phrase_postings(self, terms: List[str]) -> Dict[int, array]:
+        # Docs where terms appear next to each other, in order
+        lists = [self._postings(t) for t in terms]
+        docs = set(lists[0])
+        for p in lists[1:]:
+            docs &= set(p)
+
+        out = {}
+        for doc in docs:
+            # Positions of each following term, shifted back so they line up with the first term
+            later = [set(lst[doc][0::2]) for lst in lists[1:]]
+            first = lists[0][doc]
+            hits = array("I")
+            for i in range(0, len(first), 2):
+                pos = first[i]
+                if all((pos + k + 1) in s for k, s in enumerate(later)):
+                    hits.append(pos)
+                    hits.append(first[i + 1])
+            if hits:
+                out[doc] = hits
+        return out
+
+    def search(self, query: str, limit: int = 20) -> List[SearchHit]:
+        # Runs an AND query and returns best-first hits with snippets
+        clauses = parse_query(query)
+        if not clauses:
+            return []
+
+        with self._lock:
+            matched: Optional[Dict[int, List[array]]] = None
+            for kind, terms in clauses:
+                if kind == "phrase":
+                    found = self._phrase_postings(terms)
+                elif kind == "prefix":
+                    found = self._prefix_postings(terms[0])
+                else:
+                    found = self._postings(terms[0])
+
+                if matched is None:
+                    matched = {doc: [hits] for doc, hits in found.items()}
+                else:
+                    matched = {doc: lists + [found[doc]] for doc, lists in matched.items() if doc in found}
+                if not matched:
+                    return []
+
+            ranked = []
+            for doc, lists in matched.items():
+                score = sum(len(h) // 2 for h in lists)
+                first_off = min(min(h[1::2]) for h in lists)
+                ranked.append((score, doc, first_off))
+            ranked.sort(key=lambda r: (-r[0], r[1]))
+            ranked = ranked[:limit]
+
+            paths = {}
+            for _, doc, _ in ranked:
+                row = self.db.execute("SELECT path FROM docs WHERE id = ?", (doc,)).fetchone()
+                if row:
+                    paths[doc] = row[0]
+
+        return [
+            SearchHit(path=paths[doc], score=score, offset=off, snippet=read_snippet(paths[doc], off))
+            for score, doc, off in ranked
+            if doc in paths
+        ]
+
+
+# =========================
+# In-session chat index
+# =========================
+# Used by EvoProApp.search_chat. Updated once per message as it arrives,
+# so a search never re-reads the whole chat.
+# - token index:   word -> message ids   (whole words)
+# - trigram index: "abc" -> message ids  (substring + fuzzy matches)
+
+REGEX_META = set(".^$*+?{}[]()|\\")
+
+
+def trigrams(text: str) -> Set[str]:
+    # All 3-letter windows of a lowercase string (padded so short words still count)
+    t = f" {text} "
+    return {t[i:i + 3] for i in range(len(t) - 2)}
+
+
+def edit_distance(a: str, b: str, limit: int) -> int:
+    # Edit distance where swapping two neighbours counts as one edit.
+    # Stops early (returns limit + 1) once the distance can't stay within limit.
+    prev2: List[int] = []
+    prev = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        cur = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            cur[j] = min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                cur[j] = min(cur[j], prev2[j - 2] + 1)
+        if min(cur) > limit:
+            return limit + 1
+        prev2, prev = prev, cur
+    return prev[-1]
+
+
+def required_literal(pattern: str) -> str:
+    # Finds the longest plain-text run every regex match must contain.
+    # Used to narrow candidates with the trigram index before running the regex.
+    # Returns "" when that can't be known (alternation, groups, classes everywhere, etc.)
+    # Groups can be optional or repeated ("(abc)?xyz") and start with "?:" / "?P<name>",
+    # so any pattern with one skips the prefilter instead of guessing.
+    if "|" in pattern:
+        return ""
+    best, run, i = "", "", 0
+    while i < len(pattern):
+        c = pattern[i]
+        nxt = pattern[i + 1] if i + 1 < len(pattern) else ""
+        if c == "\\" and nxt and not nxt.isalnum():
+            lit, i = nxt, i + 2           # Escaped punctuation is a literal
+        elif c == "(":
+            return ""
+        elif c == "\\" or c in REGEX_META:
+            best = max(best, run, key=len)
+            run = ""
+            if c == "[":
+                i = pattern.find("]", i + 2) + 1 or len(pattern)
+            elif c == "{":
+                i = pattern.find("}", i + 1) + 1 or len(pattern)  # "{2,4}" is a count, not text
+            else:
+                i += 2 if c == "\\" else 1
+            continue
+        else:
+            lit, i = c, i + 1
+
+        # A quantifier right after this char makes it optional, so it can't be required
+        if i < len(pattern) and pattern[i] in "*?{":
+            best = max(best, run, key=len)
+            run = ""
+            continue
+        run += lit
+    return max(best, run, key=len).lower()
+
+
+@dataclass
+class ChatSearch:
+    ids: List[int]          # Matching message ids, in chat order
+    pattern: "re.Pattern"   # Finds the parts of one message to highlight
+    fuzzy: bool = False     # True when no exact match existed and we matched similar words
+
+    def spans(self, text: str) -> List[Tuple[int, int]]:
+        # (start, end) character ranges to highlight inside one message
+        return [m.span() for m in self.pattern.finditer(text) if m.end() > m.start()]
+
+
+class ChatIndex:
+    def __init__(self):
+        self.texts: Dict[int, str] = {}            # Original message text by id
+        self.lower: Dict[int, str] = {}            # Lowercase copy (for case-insensitive matching)
+        self.next_id = 0                           # Id handed out when add() isn't given one
+        self.tokens: Dict[str, Set[int]] = {}      # word -> message ids
+        self.grams: Dict[str, Set[int]] = {}       # trigram -> message ids
+        self.word_grams: Dict[str, Set[str]] = {}  # trigram -> words (for fuzzy word lookup)
+
+    def clear(self):
+        self.texts.clear()
+        self.lower.clear()
+        self.next_id = 0
+        self.tokens.clear()
+        self.grams.clear()
+        self.word_grams.clear()
+
+    def __len__(self):
+        return len(self.texts)
+
+    def add(self, text: str, msg_id: Optional[int] = None) -> int:
+        # Adds one message and returns its id.
+        # Ids only need to sort in chat order: new messages count up (0, 1, 2, ...),
+        # older history pages loaded later can use negative ids.
+        if msg_id is None:
+            msg_id = self.next_id
+        self.next_id = max(self.next_id, msg_id + 1)
+        low = text.lower()
+        self.texts[msg_id] = text
+        self.lower[msg_id] = low
+        for term in query_terms(low):
+            ids = self.tokens.get(term)
+            if ids is None:
+                ids = self.tokens[term] = set()
+                for g in trigrams(term):
+                    self.word_grams.setdefault(g, set()).add(term)
+            ids.add(msg_id)
+        for g in trigrams(low):
+            self.grams.setdefault(g, set()).add(msg_id)
+        return msg_id
+
+    def _candidates(self, needle: str) -> Optional[Set[int]]:
+        # Ids whose text contains every trigram of needle (None = can't narrow, check all)
+        if len(needle) < 3:
+            return None
+        grams = {needle[i:i + 3] for i in range(len(needle) - 2)}
+        sets = sorted((self.grams.get(g, set()) for g in grams), key=len)
+        out = set(sets[0])
+        for s in sets[1:]:
+            out &= s
+            if not out:
+                break
+        return out
+
+    def _similar_words(self, word: str) -> Set[str]:
+        # Known words within a small edit distance ("gemnii" -> "gemini").
+        # The trigram index picks candidates; edit distance makes the final call.
+        max_dist = 1 if len(word) <= 5 else 2
+        seen: Set[str] = set()
+        out = set()
+        for g in trigrams(word):
+            for w in self.word_grams.get(g, ()):
+                if w in seen:
+                    continue
+                seen.add(w)
+                if abs(len(w) - len(word)) <= max_dist and edit_distance(word, w, max_dist) <= max_dist:
+                    out.add(w)
+        return out
+
+    def _fuzzy(self, q: str) -> Optional[ChatSearch]:
+        # Every query word must have a similar word in the message
+        words = query_terms(q)
+        if not words:
+            return None
+        ids: Optional[Set[int]] = None
+        matched: Set[str] = set()
+        for word in words:
+            similar = self._similar_words(word)
+            found: Set[int] = set()
+            for w in similar:
+                found |= self.tokens[w]
+            ids = found if ids is None else ids & found
+            if not ids:
+                return None
+            matched |= similar
+        alts = "|".join(re.escape(w) for w in sorted(matched, key=len, reverse=True))
+        return ChatSearch(sorted(ids), re.compile(rf"(?<!\w)(?:{alts})(?!\w)", re.IGNORECASE), fuzzy=True)
+
+    def search(self, q: str, regex: bool = False) -> ChatSearch:
+        # Finds matching messages, in chat order.
+        # - regex=False: substring match, falling back to fuzzy when nothing matches
+        # - regex=True:  case-insensitive regex (raises re.error on a bad pattern)
+        if regex:
+            rx = re.compile(q, re.IGNORECASE)
+            cand = self._candidates(required_literal(q))
+            ids = sorted(cand if cand is not None else self.texts)
+            return ChatSearch([i for i in ids if any(m.end() > m.start() for m in rx.finditer(self.texts[i]))], rx)
+
+        q = (q or "").lower()
+        rx = re.compile(re.escape(q), re.IGNORECASE)
+        if not q:
+            return ChatSearch([], rx)
+        cand = self._candidates(q)
+        ids = sorted(cand if cand is not None else self.lower)
+        hits = [i for i in ids if q in self.lower[i]]
+        if hits:
+            return ChatSearch(hits, rx)
+        return self._fuzzy(q) or ChatSearch([], rx)
+
+
+# =========================
+# CLI
+# =========================
+
+def main(argv: Optional[List[str]] = None) -> int:
+    argv = list(sys.argv[1:] if argv is None else argv)
+    full = "--reindex" in argv
+    argv = [a for a in argv if a != "--reindex"]
+
+    index = LogIndex()
+    t0 = time.perf_counter()
+    indexed, removed = index.refresh(full=full)
+    t1 = time.perf_counter()
+    if indexed or removed or full:
+        print(f"Indexed {indexed} file(s), removed {removed} in {(t1 - t0) * 1000:.1f} ms")
+
+    query = " ".join(argv).strip()
+    if not query:
+        if not (indexed or removed or full):
+            print('Usage: python rules_bot/evo_search.py [--reindex] <words | "phrase" | prefix*>')
+        index.close()
+        return 0
+
+    hits = index.search(query)
+    t2 = time.perf_counter()
+    for h in hits:
+        print(f"{h.path} ({h.score})")
+        print(f"    {h.snippet}")
+    print(f"{len(hits)} result(s) in {(t2 - t1) * 1000:.1f} ms")
+    index.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,73 @@
+# =========================
+# Evo Sessions (warm-up + spare chats)
+# =========================
+# Keeps the first reply fast.
+#
+# - warm(model): one cheap request (models.get) in the background. That does the
+#   DNS lookup + TLS handshake, and the client keeps the connection open for
+#   the real message that follows.
+# - Idle connections get closed after a few seconds, so the GUIs call warm()
+#   again when the user starts typing (it's skipped if the last one was recent).
+# - take(model): returns a ready chat session for the model and builds the next
+#   spare in the background, so "New Chat" / "Apply Role" never wait.
+#
+# Nothing here raises: a failed warm-up just means the first message does the
+# handshake itself, like before.
+
+import time
+import threading
+from typing import Dict, Optional
+
+
+WARM_TTL = 4.0            # Seconds a warm-up counts as fresh (connections idle out soon after)
+
+
+class SessionPool:
+    def __init__(self, client):
+        self.client = client
+        self._lock = threading.Lock()
+        self._spares: Dict[str, object] = {}   # model -> unused chat session
+        self._warming = set()                  # models with a warm-up in flight
+        self._warmed: Dict[str, float] = {}    # model -> time.monotonic() of last warm-up
+
+    def warm(self, model: str, force: bool = False):
+        # Background: open the connection and make sure a spare session exists
+        now = time.monotonic()
+        with self._lock:
+            if model in self._warming:
+                return
+            if not force and now - self._warmed.get(model, -WARM_TTL) < WARM_TTL:
+                return
+            self._warming.add(model)
+            self._warmed[model] = now
+        threading.Thread(target=self._warm, args=(model,), daemon=True).start()
+
+    def _warm(self, model: str):
+        try:
+            self.client.models.get(model=model)
+        except Exception:
+            pass  # Offline / bad key: the real request will report it
+        finally:
+            self._fill(model)
+            with self._lock:
+                self._warming.discard(model)
+
+    def _fill(self, model: str):
+        with self._lock:
+            if model in self._spares:
+                return
+        try:
+            chat = self.client.chats.create(model=model)
+        except Exception:
+            return
+        with self._lock:
+            self._spares.setdefault(model, chat)
+
+    def take(self, model: str):
+        # A fresh chat session for model (the spare if there is one)
+        with self._lock:
+            chat: Optional[object] = self._spares.pop(model, None)
+        if chat is None:
+            chat = self.client.chats.create(model=model)
+        threading.Thread(target=self._fill, args=(model,), daemon=True).start()
+        return chat
@@ -0,0 +1,257 @@
+# =========================
+# Evo STT backends
+# =========================
+# Speech-to-text behind one small interface, so the apps don't care which engine runs.
+#
+# - "google": Google Web Speech through speech_recognition (needs internet, no partials)
+# - "vosk":   local CPU engine (pip install vosk + a model folder from alphacephei.com/vosk/models).
+#             Works offline and gives partial text while the user is still talking.
+# - "auto":   vosk if it's installed and the model folder exists, otherwise google
+#
+# Streaming use (what the GUIs do):
+#   stream = backend.stream(rate, width)
+#   audio = mic.listen(on_audio=lambda pcm: show(stream.feed(pcm)),   # feed -> partial text or None
+#                      on_segment=stream.segment)                      # VAD segments, see evo_audio
+#   text = stream.finish(audio)
+#
+# Non-streaming backends (google) transcribe each VAD segment on a worker thread
+# the moment it closes, so when the user stops talking only the last segment is
+# still in flight. finish() joins the segment texts in order.
+#
+# Google uploads are shrunk first (evo_audio.prepare_audio: trim silence, 16 kHz
+# mono, optional noise suppression; recognize_google then sends FLAC).
+# GoogleStt.stats keeps the prepared audio size and request time per utterance
+# (the bench shows the actual FLAC upload size).
+#
+# Benchmark (latency + real-time factor of each backend on the same WAV files):
+#   python rules_bot/evo_stt.py --bench clip1.wav clip2.wav [--vosk-model PATH]
+# "google-raw" is google without preprocessing, to compare upload size / latency.
+
+import os
+import sys
+import json
+import time
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional
+
+from evo_audio import prepare_audio
+
+
+VOSK_MODEL_DIR = "vosk-model"     # Default model folder (next to evo_settings.json)
+BACKENDS = ["auto", "google", "vosk"]
+STATS_KEEP = 50                   # Recent uploads remembered by GoogleStt.stats
+SEGMENT_WORKERS = 3               # Segments being transcribed at the same time
+
+
+_segment_pool: Optional[ThreadPoolExecutor] = None
+
+
+def _pool() -> ThreadPoolExecutor:
+    global _segment_pool
+    if _segment_pool is None:
+        _segment_pool = ThreadPoolExecutor(max_workers=SEGMENT_WORKERS, thread_name_prefix="stt")
+    return _segment_pool
+
+
+class SttStream:
+    # One utterance. Default: transcribe VAD segments in the background as they close,
+    # or the whole clip at the end if no segments were given.
+    def __init__(self, backend: "SttBackend"):
+        self.backend = backend
+        self.pending = []   # Futures, in segment order
+
+    def feed(self, pcm: bytes) -> Optional[str]:
+        # Returns the partial transcript so far, or None if there's nothing new
+        return None
+
+    def segment(self, audio):
+        # A finished piece of the utterance (sr.AudioData): start transcribing it now
+        self.pending.append(_pool().submit(self._transcribe_segment, audio))
+
+    def _transcribe_segment(self, audio) -> str:
+        try:
+            return self.backend.transcribe(audio)
+        except Exception as e:
+            if type(e).__name__ == "UnknownValueError":
+                return ""  # Segment was a cough / breath: nothing to add
+            raise
+
+    def finish(self, audio) -> str:
+        # audio: the full sr.AudioData of the utterance
+        if not self.pending:
+            return self.backend.transcribe(audio)
+        texts = [f.result() for f in self.pending]
+        return " ".join(t for t in texts if t).strip()
+
+
+class SttBackend:
+    name = "base"
+    streaming = False       # True = feed() returns partial text
+
+    def transcribe(self, audio) -> str:
+        raise NotImplementedError
+
+    def stream(self, rate: int, width: int) -> SttStream:
+        return SttStream(self)
+
+
+class GoogleStt(SttBackend):
+    name = "google"
+
+    def __init__(self, recognizer, preprocess: bool = True, noise_suppression: bool = False):
+        self.recognizer = recognizer
+        self.preprocess = preprocess
+        self.noise_suppression = noise_suppression
+        self.stats: List[dict] = []   # {"pcm_bytes", "prep_ms", "request_ms"} per upload, newest last
+        if not preprocess:
+            self.name = "google-raw"
+
+    def prepare(self, audio):
+        return prepare_audio(audio, self.noise_suppression) if self.preprocess else audio
+
+    def upload_bytes(self, audio) -> int:
+        # Size of the FLAC body recognize_google would send (encodes once more; for stats/bench)
+        rate = None if audio.sample_rate >= 8000 else 8000
+        return len(audio.get_flac_data(convert_rate=rate, convert_width=2))
+
+    def transcribe(self, audio) -> str:
+        t0 = time.perf_counter()
+        audio = self.prepare(audio)
+        t1 = time.perf_counter()
+        try:
+            return (self.recognizer.recognize_google(audio) or "").strip()
+        finally:
+            # Cheap numbers only: this runs on every utterance and must never raise
+            self.stats.append({
+                "pcm_bytes": len(audio.frame_data),   # After prep; FLAC size is in the bench
+                "prep_ms": round((t1 - t0) * 1000, 1),
+                "request_ms": round((time.perf_counter() - t1) * 1000, 1),
+            })
+            del self.stats[:-STATS_KEEP]
+
+
+class _VoskStream(SttStream):
+    def __init__(self, backend: "VoskStt", rate: int):
+        super().__init__(backend)
+        self.rec = backend.vosk.KaldiRecognizer(backend.model, rate)
+        self.last = ""
+
+    def feed(self, pcm: bytes) -> Optional[str]:
+        if self.rec.AcceptWaveform(pcm):
+            # Vosk closed a segment: keep its text and start the next partial after it
+            done = json.loads(self.rec.Result()).get("text", "")
+            self.last = (self.last + " " + done).strip() if done else self.last
+            return self.last or None
+        partial = json.loads(self.rec.PartialResult()).get("partial", "")
+        text = (self.last + " " + partial).strip()
+        return text or None
+
+    def segment(self, audio):
+        pass  # Already transcribed chunk by chunk in feed()
+
+    def finish(self, audio) -> str:
+        tail = json.loads(self.rec.FinalResult()).get("text", "")
+        return (self.last + " " + tail).strip()
+
+
+class VoskStt(SttBackend):
+    name = "vosk"
+    streaming = True
+
+    def __init__(self, model_path: str = VOSK_MODEL_DIR):
+        import vosk  # Optional dependency; ImportError = backend not available
+        if not os.path.isdir(model_path):
+            raise FileNotFoundError(f"Vosk model folder not found: {model_path}")
+        vosk.SetLogLevel(-1)
+        self.vosk = vosk
+        self.model = vosk.Model(model_path)  # Slow (model load), do it once in the background
+
+    def stream(self, rate: int, width: int) -> SttStream:
+        return _VoskStream(self, rate)
+
+    def transcribe(self, audio) -> str:
+        stream = _VoskStream(self, audio.sample_rate)
+        stream.feed(audio.get_raw_data(convert_width=2))
+        return stream.finish(audio)
+
+
+def make_backend(name: str, recognizer=None, model_path: str = VOSK_MODEL_DIR,
+                 noise_suppression: bool = False) -> SttBackend:
+    # "auto" falls back to google when vosk can't load; an explicit "vosk" raises instead
+    if name in ("vosk", "auto"):
+        try:
+            return VoskStt(model_path)
+        except Exception:
+            if name == "vosk":
+                raise
+    if recognizer is None:
+        import speech_recognition as sr
+        recognizer = sr.Recognizer()
+    return GoogleStt(recognizer, preprocess=(name != "google-raw"), noise_suppression=noise_suppression)
+
+
+# =========================
+# Benchmark
+# =========================
+
+def bench(paths: List[str], backends: List[SttBackend], chunk_ms: int = 100):
+    # Per backend and file:
+    # - compute: total time spent in the engine
+    # - RTF: compute / audio length (below 1.0 = faster than real time)
+    # - tail: time from the end of the audio to the final text (what the user waits for
+    #   when audio is fed live while they talk; for non-streaming backends it's everything)
+    # - upload KB: FLAC bytes sent to the cloud (google backends only)
+    import speech_recognition as sr
+
+    print(f"{'backend':<10} {'file':<28} {'audio s':>8} {'compute s':>10} {'RTF':>6} {'tail s':>7} {'upload KB':>10}  text")
+    for backend in backends:
+        for path in paths:
+            with sr.AudioFile(path) as src:
+                audio = sr.Recognizer().record(src)
+            raw = audio.get_raw_data(convert_width=2)
+            seconds = len(raw) / 2 / audio.sample_rate
+            step = int(audio.sample_rate * chunk_ms / 1000) * 2
+
+            stream = backend.stream(audio.sample_rate, 2)
+            fed = 0.0
+            for i in range(0, len(raw), step):
+                t0 = time.perf_counter()
+                stream.feed(raw[i:i + step])
+                fed += time.perf_counter() - t0
+            t0 = time.perf_counter()
+            try:
+                text = stream.finish(audio)
+            except Exception as e:
+                text = f"<error: {e}>"
+            tail = time.perf_counter() - t0
+            compute = fed + tail
+            upload = "-"
+            if isinstance(backend, GoogleStt):
+                upload = f"{backend.upload_bytes(backend.prepare(audio)) / 1024:.1f}"
+            name = os.path.basename(path)[:28]
+            print(f"{backend.name:<10} {name:<28} {seconds:>8.2f} {compute:>10.2f} {compute / seconds:>6.2f} {tail:>7.2f} {upload:>10}  {text[:60]}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare speech-to-text backends.")
+    parser.add_argument("--bench", nargs="+", metavar="WAV", required=True, help="WAV/AIFF/FLAC clips to transcribe")
+    parser.add_argument("--vosk-model", default=VOSK_MODEL_DIR, help="Vosk model folder")
+    parser.add_argument("--only", choices=["google", "google-raw", "vosk"], help="Run one backend")
+    parser.add_argument("--denoise", action="store_true", help="Noise suppression before google uploads")
+    args = parser.parse_args(argv)
+
+    backends = []
+    for name in ([args.only] if args.only else ["vosk", "google", "google-raw"]):
+        try:
+            backends.append(make_backend(name, model_path=args.vosk_model, noise_suppression=args.denoise))
+        except Exception as e:
+            print(f"Skipping {name}: {e}", file=sys.stderr)
+    if not backends:
+        return 1
+    bench(args.bench, backends)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
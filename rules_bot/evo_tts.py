@@ -0,0 +1,385 @@
+# =========================
+# Evo TTS worker
+# =========================
+# One long-lived thread owns the text-to-speech engine.
+#
+# - The engine is created on the worker thread and only ever used there
+#   (pyttsx3 drivers like SAPI5 are not safe to share between threads).
+# - Text goes in through a queue, one sentence per item, so speech starts
+#   as soon as the first sentence of a streamed reply is complete.
+# - stop() drops everything queued and cuts off the sentence being spoken
+#   (checked on every word via the engine's "started-word" callback).
+#
+# Usage:
+#   tts = TtsWorker(lambda: pyttsx3.init(), rate=175)
+#   tts.say("Whole reply. Two sentences.")
+#   turn = tts.begin()                          # streaming: one reply
+#   for chunk in stream: tts.feed(chunk.text, turn)
+#   tts.end(turn)                               # speak the leftover tail
+#   tts.stop()                                  # interrupt
+#
+# Audio cache (optional, pass cache=TtsCache()):
+# - Phrases are rendered to WAV once (engine.save_to_file) and replayed from disk.
+# - Keyed by text + voice + rate, so changing either makes new files.
+# - What gets cached: phrases passed to prewarm(), plus any sentence spoken twice.
+#   Rendering happens when the worker is idle, never in front of live speech.
+# - Size-limited: least recently played files are deleted first.
+
+import os
+import re
+import sys
+import time
+import wave
+import queue
+import shutil
+import hashlib
+import threading
+import subprocess
+from collections import Counter
+from typing import Callable, Dict, Iterable, List, Optional
+
+
+MIN_SENTENCE = 12         # Shorter pieces ("1.", "Hi!") are joined to the next one
+
+TTS_CACHE_DIR = "tts_cache"           # Next to evo_settings.json
+TTS_CACHE_MAX_BYTES = 50 * 1024 * 1024
+CACHE_MAX_CHARS = 240                 # Longer sentences are never cached
+CACHE_AFTER = 2                       # Cache a sentence once it has been spoken this many times
+IDLE_RENDER = 1.0                     # Seconds of silence before rendering queued cache entries
+
+# End of a sentence: . ! ? (plus closing quotes/brackets) followed by whitespace, or a line break
+SENTENCE_END = re.compile(r"[.!?…]+[\"')\]]*\s+|\n+")
+MARKDOWN = re.compile(r"[*_#`>|]+")
+
+
+def speakable(text: str) -> str:
+    # Strips markdown symbols the engine would otherwise read out loud
+    return " ".join(MARKDOWN.sub(" ", text).split())
+
+
+class SentenceSplitter:
+    # Turns a stream of text chunks into complete sentences
+    def __init__(self):
+        self.buf = ""
+
+    def feed(self, chunk: str) -> List[str]:
+        self.buf += chunk
+        out, start = [], 0
+        for m in SENTENCE_END.finditer(self.buf):
+            piece = self.buf[start:m.end()].strip()
+            if len(piece) >= MIN_SENTENCE:
+                out.append(piece)
+                start = m.end()
+        self.buf = self.buf[start:]
+        return out
+
+    def rest(self) -> List[str]:
+        # Whatever is left at the end of the stream
+        piece, self.buf = self.buf.strip(), ""
+        return [piece] if piece else []
+
+
+def split_sentences(text: str) -> List[str]:
+    s = SentenceSplitter()
+    return s.feed(text + "\n") + s.rest()
+
+
+# =========================
+# Audio cache
+# =========================
+
+class TtsCache:
+    def __init__(self, folder: str = TTS_CACHE_DIR, max_bytes: int = TTS_CACHE_MAX_BYTES):
+        self.folder = folder
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._files: Dict[str, List[float]] = {}  # file name -> [last used, size]
+        os.makedirs(folder, exist_ok=True)
+        for name in os.listdir(folder):
+            path = os.path.join(folder, name)
+            if name.endswith(".part"):
+                os.remove(path)  # Left over from a crash mid-render
+            elif name.endswith(".wav"):
+                st = os.stat(path)
+                self._files[name] = [st.st_mtime, st.st_size]
+
+    @staticmethod
+    def key(text: str, voice: str, rate: int) -> str:
+        return hashlib.sha1(f"{text}|{voice}|{rate}".encode("utf-8")).hexdigest() + ".wav"
+
+    def has(self, key: str) -> bool:
+        with self._lock:
+            return key in self._files
+
+    def get(self, key: str) -> Optional[str]:
+        # Path of the cached WAV, or None. Counts as a use for LRU.
+        with self._lock:
+            entry = self._files.get(key)
+            if entry is None:
+                return None
+            entry[0] = time.time()
+        path = os.path.join(self.folder, key)
+        try:
+            os.utime(path)  # LRU order survives restarts
+        except OSError:
+            with self._lock:
+                self._files.pop(key, None)
+            return None
+        return path
+
+    def part_path(self, key: str) -> str:
+        # Where to render before add() moves it into place
+        return os.path.join(self.folder, key + ".part")
+
+    def add(self, key: str):
+        # Renderer finished part_path(key): publish it and enforce the size limit
+        part, path = self.part_path(key), os.path.join(self.folder, key)
+        if not os.path.exists(part) or os.path.getsize(part) == 0:
+            return  # Engine didn't write anything (some drivers can't save to file)
+        os.replace(part, path)
+        with self._lock:
+            self._files[key] = [time.time(), os.path.getsize(path)]
+            total = sum(size for _, size in self._files.values())
+            for name, (_, size) in sorted(self._files.items(), key=lambda kv: kv[1][0]):
+                if total <= self.max_bytes:
+                    break
+                try:
+                    os.remove(os.path.join(self.folder, name))
+                except OSError:
+                    pass
+                del self._files[name]
+                total -= size
+
+
+def _player() -> Optional[List[str]]:
+    # Command that plays a WAV file on this OS (Windows uses winsound instead)
+    if sys.platform == "darwin":
+        return ["afplay"]
+    for cmd in (["aplay", "-q"], ["paplay"]):
+        if shutil.which(cmd[0]):
+            return cmd
+    return None
+
+
+def play_wav(path: str, cancelled: Callable[[], bool]) -> bool:
+    # Plays path, returns early if cancelled() turns True. False = couldn't play it.
+    if sys.platform == "win32":
+        import winsound
+        try:
+            with wave.open(path, "rb") as w:
+                seconds = w.getnframes() / float(w.getframerate())
+        except (wave.Error, OSError, ZeroDivisionError):
+            return False
+        winsound.PlaySound(path, winsound.SND_FILENAME | winsound.SND_ASYNC | winsound.SND_NODEFAULT)
+        end = time.monotonic() + seconds
+        while time.monotonic() < end:
+            if cancelled():
+                winsound.PlaySound(None, winsound.SND_PURGE)
+                break
+            time.sleep(0.02)
+        return True
+
+    cmd = _player()
+    if cmd is None:
+        return False
+    try:
+        proc = subprocess.Popen(cmd + [path], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    except OSError:
+        return False
+    while proc.poll() is None:
+        if cancelled():
+            proc.terminate()
+            break
+        time.sleep(0.02)
+    return proc.returncode in (0, None, -15)
+
+
+# =========================
+# Worker
+# =========================
+
+class TtsWorker:
+    def __init__(
+        self,
+        make_engine: Callable[[], object],
+        rate: Optional[int] = None,
+        cache: Optional[TtsCache] = None,
+    ):
+        # make_engine: builds the engine (runs on the worker thread), e.g. pyttsx3.init
+        self.make_engine = make_engine
+        self.rate = rate
+        self.cache = cache
+        self.engine = None
+        self.voice = ""                      # Engine voice id (part of the cache key)
+        self.error: Optional[Exception] = None
+        self.ready = threading.Event()       # Set once the engine exists (or failed, see .error)
+        self.speaking = threading.Event()    # Set while a sentence is being spoken
+        self.on_start: Optional[Callable[[int], None]] = None  # on_start(turn) as a sentence starts playing
+        self.on_end: Optional[Callable[[int], None]] = None    # on_end(turn) once it's done (or failed)
+        self._queue: "queue.Queue[Optional[tuple]]" = queue.Queue()
+        self._gen = 0                        # stop() bumps this; older queued items are skipped
+        self._speaking_gen = 0               # Generation of the sentence being spoken
+        self._rate = None                    # Rate currently set on the engine
+        self._lock = threading.Lock()
+        self._splitter = SentenceSplitter()
+        self._seen = Counter()               # Sentence -> times spoken (picks what to cache)
+        self._render: List[str] = []         # Sentences waiting to be rendered into the cache
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    # -------------------------
+    # Feeding text (any thread)
+    # -------------------------
+
+    def say(self, text: str):
+        # Speaks a whole text, sentence by sentence
+        for s in split_sentences(text):
+            self._put(s)
+
+    def begin(self) -> int:
+        # Streaming: starts a reply. Pass the returned turn to feed()/end();
+        # once stop() is called, the rest of that reply is dropped too.
+        with self._lock:
+            self._splitter = SentenceSplitter()
+            return self._gen
+
+    def feed(self, chunk: str, turn: Optional[int] = None):
+        # Streaming: speaks each sentence as soon as it's complete
+        with self._lock:
+            if turn is not None and turn != self._gen:
+                return
+            sentences = self._splitter.feed(chunk)
+        for s in sentences:
+            self._put(s)
+
+    def end(self, turn: Optional[int] = None):
+        # Streaming: the reply is finished, speak what's left
+        with self._lock:
+            if turn is not None and turn != self._gen:
+                return
+            sentences = self._splitter.rest()
+        for s in sentences:
+            self._put(s)
+
+    def prewarm(self, phrases: Iterable[str]):
+        # Renders phrases into the cache in the background (skips ones already there)
+        if self.cache is None:
+            return
+        with self._lock:
+            for phrase in phrases:
+                for s in split_sentences(phrase):
+                    text = speakable(s)
+                    if text and len(text) <= CACHE_MAX_CHARS and text not in self._render:
+                        self._render.append(text)
+        self._queue.put(("", -1))  # Wakes the worker so it starts its idle timer
+
+    def set_rate(self, rate: int):
+        # Applied from the next sentence on
+        self.rate = rate
+
+    def stop(self):
+        # Drops queued speech and interrupts the current sentence
+        with self._lock:
+            self._gen += 1
+            self._splitter = SentenceSplitter()
+        while True:
+            try:
+                self._queue.get_nowait()
+            except queue.Empty:
+                break
+
+    def close(self):
+        self.stop()
+        self._queue.put(None)
+
+    def _put(self, sentence: str):
+        text = speakable(sentence)
+        if text and self.error is None:  # No engine = nothing to queue
+            self._queue.put((text, self._gen))
+
+    # -------------------------
+    # Worker thread
+    # -------------------------
+
+    def _run(self):
+        try:
+            self.engine = self.make_engine()
+            self.engine.connect("started-word", self._on_word)
+            self.voice = str(self.engine.getProperty("voice") or "")
+        except Exception as e:
+            self.error = e
+            self.ready.set()
+            return
+        self.ready.set()
+
+        while True:
+            try:
+                item = self._queue.get(timeout=IDLE_RENDER if self._render else None)
+            except queue.Empty:
+                while self._render and self._queue.empty():
+                    self._render_one()  # Stops as soon as there's something to say
+                continue
+            if item is None:
+                return
+            text, gen = item
+            if gen != self._gen:
+                continue  # Cancelled by stop()
+            try:
+                self._apply_rate()
+                self._speaking_gen = gen
+                self.speaking.set()
+                if self.on_start is not None:
+                    self.on_start(gen)
+                if not self._play_cached(text, gen):
+                    self.engine.say(text)
+                    self.engine.runAndWait()
+            except Exception:
+                pass  # A failed sentence is skipped; the next one still plays
+            finally:
+                self.speaking.clear()
+                if self.on_end is not None:
+                    self.on_end(gen)
+
+    def _apply_rate(self):
+        if self.rate and self.rate != self._rate:
+            self._rate = self.rate
+            self.engine.setProperty("rate", self._rate)
+
+    def _play_cached(self, text: str, gen: int) -> bool:
+        # True if text was played from the cache. Otherwise notes it as a cache candidate.
+        if self.cache is None or len(text) > CACHE_MAX_CHARS:
+            return False
+        path = self.cache.get(TtsCache.key(text, self.voice, self.rate or 0))
+        if path is not None and play_wav(path, lambda: gen != self._gen):
+            return True
+        if len(self._seen) > 5000:
+            self._seen.clear()
+        self._seen[text] += 1
+        if self._seen[text] >= CACHE_AFTER:
+            with self._lock:
+                if text not in self._render:
+                    self._render.append(text)
+        return False
+
+    def _render_one(self):
+        # Idle time: render one pending phrase to WAV via the engine's save-to-file path
+        with self._lock:
+            if not self._render:
+                return
+            text = self._render.pop(0)
+        key = TtsCache.key(text, self.voice, self.rate or 0)
+        if self.cache.has(key):
+            return
+        try:
+            self._apply_rate()
+            self._speaking_gen = self._gen  # Don't let an old stop() cut the render short
+            self.engine.save_to_file(text, self.cache.part_path(key))
+            self.engine.runAndWait()
+            self.cache.add(key)
+        except Exception:
+            pass  # No cache entry; the phrase is just synthesized live
+
+    def _on_word(self, name, location, length):
+        # Engine callback (worker thread): cut off speech that stop() cancelled
+        if self._speaking_gen != self._gen:
+            self.engine.stop()
@@ -0,0 +1,161 @@
+# =========================
+# Evo UI helpers
+# =========================
+# Small pieces shared by the Tk/CustomTkinter apps.
+#
+# UiQueue: the one safe way for worker threads to touch the UI.
+# - Workers call ui.post(fn, *args). That only appends to a list (no Tk calls).
+# - The Tk loop drains the list once per frame (~60 fps), within a time budget.
+# - Posts with the same key replace each other, so 50 status updates in one
+#   frame become 1 (only the newest value matters for things like status text).
+# - After a batch runs, Tk gets one layout pass for the whole frame.
+#
+# TextMeasure: works out how big a wrapped label will be from font metrics,
+# without creating the label or forcing Tk to lay anything out.
+# - Word widths come from tkinter.font (cheap, no layout pass) and are cached.
+# - Whole results are cached by (text, wraplength), so re-showing a message
+#   (history restore, scrolling back, streaming re-renders) is a dict lookup.
+
+import time
+import threading
+import tkinter.font as tkfont
+from collections import OrderedDict, deque
+from typing import Tuple
+
+
+FRAME_MS = 16             # How often the queue is drained (16 ms ~= 60 fps)
+BUDGET_MS = 8             # Max time spent running commands per frame (keeps input responsive)
+
+
+class UiQueue:
+    def __init__(self, root, frame_ms: int = FRAME_MS, budget_ms: int = BUDGET_MS):
+        self.root = root
+        self.frame_ms = frame_ms
+        self.budget_s = budget_ms / 1000.0
+        self._lock = threading.Lock()
+        self._queue = deque()      # Entries: [fn, args, key]; fn=None means "replaced, skip"
+        self._keyed = {}           # key -> its pending entry
+        self._running = False
+
+    def start(self):
+        # Begin draining on the Tk loop (call once, from the UI thread)
+        if not self._running:
+            self._running = True
+            self.root.after(self.frame_ms, self._drain)
+
+    def stop(self):
+        self._running = False
+
+    def post(self, fn, *args, key=None):
+        # Thread-safe: schedule fn(*args) on the UI thread.
+        # key: if another command with the same key is still waiting, it is dropped
+        #      and this one runs instead (at the newer position in the queue).
+        entry = [fn, args, key]
+        with self._lock:
+            if key is not None:
+                old = self._keyed.get(key)
+                if old is not None:
+                    old[0] = None
+                self._keyed[key] = entry
+            self._queue.append(entry)
+
+    def _drain(self):
+        if not self._running:
+            return
+        deadline = time.perf_counter() + self.budget_s
+        ran = 0
+        while True:
+            with self._lock:
+                if not self._queue:
+                    break
+                fn, args, key = entry = self._queue.popleft()
+                if key is not None and self._keyed.get(key) is entry:
+                    del self._keyed[key]
+            if fn is None:
+                continue
+            try:
+                fn(*args)
+            except Exception as e:
+                # One bad command must not kill the loop
+                print(f"UI command failed: {e!r}")
+            ran += 1
+            if time.perf_counter() >= deadline:
+                break  # Rest waits for the next frame
+
+        if ran:
+            self.root.update_idletasks()  # One layout pass for everything this frame changed
+        self.root.after(self.frame_ms, self._drain)
+
+
+# =========================
+# Text measurement cache
+# =========================
+
+MEASURE_CACHE_SIZE = 4096  # (text, wraplength) results kept
+WORD_CACHE_SIZE = 20000    # Individual word widths kept
+
+
+class TextMeasure:
+    def __init__(self, font: tuple):
+        # font: same tuple the label uses, e.g. ("Segoe UI", 12) or ("Segoe UI", 11, "italic")
+        self.font_spec = font
+        self._font = None          # Created on first use (needs a Tk root to exist)
+        self._line_h = 0
+        self._space_w = 0
+        self._words = {}           # word -> pixel width
+        self._cache = OrderedDict()  # (text, wraplength) -> (width, height)
+
+    def _ensure_font(self):
+        if self._font is None:
+            family, size, *style = self.font_spec
+            # Negative size = pixels. CTk scales tuple fonts the same way, so results line up
+            # with wraplength/width values given in CTk's unscaled units.
+            self._font = tkfont.Font(
+                family=family,
+                size=-abs(int(size)),
+                weight=("bold" if "bold" in style else "normal"),
+                slant=("italic" if "italic" in style else "roman"),
+            )
+            self._line_h = self._font.metrics("linespace")
+            self._space_w = self._font.measure(" ")
+
+    def _word_width(self, word: str) -> int:
+        w = self._words.get(word)
+        if w is None:
+            if len(self._words) >= WORD_CACHE_SIZE:
+                self._words.clear()
+            w = self._words[word] = self._font.measure(word)
+        return w
+
+    def size(self, text: str, wraplength: int) -> Tuple[int, int]:
+        # (width, height) in pixels of text wrapped at wraplength, like a Tk label would draw it
+        key = (text, wraplength)
+        hit = self._cache.get(key)
+        if hit is not None:
+            self._cache.move_to_end(key)
+            return hit
+
+        self._ensure_font()
+        widest, lines = 0, 0
+        for para in text.split("\n"):
+            line_w = 0
+            lines += 1
+            for word in para.split(" "):
+                w = self._word_width(word) if word else 0
+                if line_w and line_w + self._space_w + w > wraplength:
+                    widest = max(widest, line_w)
+                    lines += 1
+                    line_w = 0
+                if w > wraplength:
+                    # Tk breaks over-long words mid-word
+                    extra, w = divmod(w, wraplength)
+                    lines += extra
+                    widest = wraplength
+                line_w += (self._space_w if line_w else 0) + w
+            widest = max(widest, line_w)
+
+        result = (min(widest, wraplength), lines * self._line_h)
+        self._cache[key] = result
+        if len(self._cache) > MEASURE_CACHE_SIZE:
+            self._cache.popitem(last=False)
+        return result
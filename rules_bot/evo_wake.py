@@ -0,0 +1,328 @@
+# =========================
+# Evo Wake word ("hey Evo")
+# =========================
+# Hands-free start of voice input, cheap enough to leave on all day.
+#
+# How it works:
+# - Runs on MicStream's chunks. The mic's VAD already marks speech, so this
+#   thread does nothing while the room is quiet.
+# - When a short burst of speech ends (WAKE_MIN..WAKE_MAX seconds long), its
+#   MFCC features are compared to a few recorded samples of "hey Evo" with DTW
+#   (dynamic time warping: lines up two recordings spoken at different speeds).
+# - Close enough to any sample = wake. Say "hey Evo", pause, then your question:
+#   only audio after the wake word goes to speech-to-text.
+#
+# CLI (needs NumPy + speech_recognition + a microphone):
+#   python rules_bot/evo_wake.py --enroll            -> record 3 samples of "hey Evo"
+#   python rules_bot/evo_wake.py --measure 600       -> run 10 minutes: wakes/hour + CPU use
+#   python rules_bot/evo_wake.py --measure-files a.wav b.wav  -> false accepts on recordings
+
+import os
+import sys
+import time
+import queue
+import argparse
+import threading
+from typing import Callable, List, Optional, Tuple
+
+import numpy as np
+
+
+WAKE_DIR = "wake_templates"   # Recorded samples (.npy MFCC arrays), next to evo_settings.json
+WAKE_SAMPLES = 3              # Samples recorded by --enroll
+WAKE_MIN = 0.3                # Bursts shorter/longer than this (seconds) can't be "hey Evo"
+WAKE_MAX = 1.6
+WAKE_END = 0.2                # Silence that ends a burst
+WAKE_MARGIN = 1.25            # Accept up to this x the largest distance between the samples
+WAKE_FLOOR = 6.0              # ...but never be stricter than this (1-2 samples = no spread yet)
+DTW_BAND = 0.35               # Warping window, as a share of the longer sequence
+TRIM_DB = 30.0                # Frames this far below the loudest one are trimmed off both ends
+
+N_MFCC = 13
+N_MELS = 26
+FRAME_S = 0.025
+HOP_S = 0.010
+
+
+# =========================
+# Features
+# =========================
+
+_MEL_CACHE = {}
+
+
+def _mel_filters(rate: int, n_fft: int) -> Tuple[np.ndarray, np.ndarray]:
+    key = (rate, n_fft)
+    if key not in _MEL_CACHE:
+        mel = lambda f: 2595 * np.log10(1 + f / 700.0)
+        hz = lambda m: 700 * (10 ** (m / 2595.0) - 1)
+        points = hz(np.linspace(mel(60), mel(min(rate / 2, 7600)), N_MELS + 2))
+        bins = np.floor((n_fft + 1) * points / rate).astype(int)
+        fb = np.zeros((N_MELS, n_fft // 2 + 1), np.float32)
+        for m in range(1, N_MELS + 1):
+            lo, mid, hi = bins[m - 1], bins[m], bins[m + 1]
+            if mid > lo:
+                fb[m - 1, lo:mid] = (np.arange(lo, mid) - lo) / float(mid - lo)
+            if hi > mid:
+                fb[m - 1, mid:hi] = (hi - np.arange(mid, hi)) / float(hi - mid)
+        n = np.arange(N_MELS)
+        dct = np.cos(np.pi / N_MELS * (n + 0.5)[None, :] * np.arange(N_MFCC)[:, None]).astype(np.float32)
+        _MEL_CACHE[key] = (fb, dct)
+    return _MEL_CACHE[key]
+
+
+def mfcc(pcm: bytes, rate: int) -> np.ndarray:
+    # (frames, N_MFCC) features of 16-bit mono PCM, mean-normalized (mic/room independent)
+    raw = np.frombuffer(pcm[: len(pcm) // 2 * 2], dtype="<i2").astype(np.float32)
+    flen, hop = int(rate * FRAME_S), int(rate * HOP_S)
+    if len(raw) < flen:
+        return np.zeros((0, N_MFCC), np.float32)
+    n = 1 + (len(raw) - flen) // hop
+    idx = np.arange(flen)[None, :] + hop * np.arange(n)[:, None]
+    # Trim quiet lead-in/tail (measured before pre-emphasis) so only the spoken part is compared
+    energy = 10 * np.log10(np.mean(raw[idx] ** 2, axis=1) + 1e-6)
+    loud = np.nonzero(energy > energy.max() - TRIM_DB)[0]
+    idx = idx[loud[0]:loud[-1] + 1]
+    x = np.append(raw[:1], raw[1:] - 0.97 * raw[:-1])     # Pre-emphasis
+    frames = x[idx] * np.hamming(flen).astype(np.float32)
+    n_fft = 1 << (flen - 1).bit_length()
+    power = np.abs(np.fft.rfft(frames, n_fft)) ** 2 / n_fft
+    fb, dct = _mel_filters(rate, n_fft)
+    feats = np.log(power @ fb.T + 1e-6) @ dct.T
+    return feats - feats.mean(axis=0)
+
+
+def dtw(a: np.ndarray, b: np.ndarray) -> float:
+    # Path-length-normalized DTW distance between two feature sequences
+    n, m = len(a), len(b)
+    if not n or not m:
+        return float("inf")
+    cost = np.sqrt(((a[:, None, :] - b[None, :, :]) ** 2).sum(axis=2))  # All frame pairs at once
+    band = max(abs(n - m), int(max(n, m) * DTW_BAND))
+    acc = np.full((n + 1, m + 1), np.inf)
+    acc[0, 0] = 0.0
+    for i in range(1, n + 1):
+        lo, hi = max(1, i - band), min(m, i + band)
+        row = cost[i - 1]
+        prev = acc[i - 1]
+        cur = acc[i]
+        for j in range(lo, hi + 1):
+            cur[j] = row[j - 1] + min(prev[j], prev[j - 1], cur[j - 1])
+    return float(acc[n, m] / (n + m))
+
+
+# =========================
+# Templates
+# =========================
+
+def load_templates(folder: str = WAKE_DIR) -> List[np.ndarray]:
+    if not os.path.isdir(folder):
+        return []
+    return [np.load(os.path.join(folder, f)) for f in sorted(os.listdir(folder)) if f.endswith(".npy")]
+
+
+def threshold_for(templates: List[np.ndarray]) -> float:
+    # How far a burst may be from the closest sample: based on how much the samples differ
+    spread = [dtw(a, b) for i, a in enumerate(templates) for b in templates[i + 1:]]
+    return max([WAKE_FLOOR] + [d * WAKE_MARGIN for d in spread])
+
+
+# =========================
+# Detector
+# =========================
+
+class _Bursts:
+    # Collects speech chunks into bursts; hands back the ones as long as a wake word
+    def __init__(self, mic):
+        self.mic = mic
+        self.prev = b""           # Last quiet chunk (the word's onset is often in it)
+        self.reset()
+
+    def reset(self):
+        self.chunks: List[bytes] = []
+        self.spoken = 0           # Chunks up to and including the last speech chunk
+        self.silent = 0.0
+        self.too_long = False     # Burst outgrew WAKE_MAX: ignore it until the next pause
+
+    def push(self, data: bytes, speech: bool) -> Optional[bytes]:
+        done = None
+        if speech:
+            self.silent = 0.0
+            if not self.too_long:
+                if not self.chunks and self.prev:
+                    self.chunks.append(self.prev)
+                self.chunks.append(data)
+                self.spoken = len(self.chunks)
+                if self.mic.seconds(self.spoken) > WAKE_MAX:
+                    self.chunks, self.too_long = [], True  # Long speech: not a wake word
+        elif not (self.chunks or self.too_long):
+            self.prev = data
+        else:
+            self.chunks.append(data)
+            self.silent += self.mic.seconds(1)
+            if self.silent >= WAKE_END:
+                if not self.too_long and WAKE_MIN <= self.mic.seconds(self.spoken):
+                    done = b"".join(self.chunks[:self.spoken + 1])
+                self.reset()
+        return done
+
+
+class WakeDetector:
+    def __init__(self, mic, on_wake: Callable[[], None], templates: Optional[List[np.ndarray]] = None):
+        # mic: a started evo_audio.MicStream
+        self.mic = mic
+        self.on_wake = on_wake
+        self.templates = templates if templates is not None else load_templates()
+        self.threshold = threshold_for(self.templates) if self.templates else 0.0
+        self.paused = threading.Event()      # Set = ignore speech (e.g. while a question is being recorded)
+        self.checks = 0                      # Bursts compared (for --measure)
+        self.last_distance = float("inf")
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        if not self.templates:
+            raise RuntimeError(f"No wake word samples in {WAKE_DIR}/. Run: python rules_bot/evo_wake.py --enroll")
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def check(self, pcm: bytes) -> bool:
+        # True if pcm sounds like one of the samples
+        self.checks += 1
+        feats = mfcc(pcm, self.mic.rate)
+        self.last_distance = min(dtw(feats, t) for t in self.templates)
+        return self.last_distance <= self.threshold
+
+    def _run(self):
+        q, _ = self.mic.subscribe()
+        bursts = _Bursts(self.mic)
+        try:
+            while not self._stop.is_set():
+                try:
+                    data, _energy, speech = q.get(timeout=0.5)
+                except queue.Empty:
+                    continue
+                if self.paused.is_set():
+                    bursts.reset()
+                    continue
+                burst = bursts.push(data, speech)
+                if burst is not None and self.check(burst):
+                    self.on_wake()
+        finally:
+            self.mic.unsubscribe(q)
+
+
+# =========================
+# CLI: enroll + measure
+# =========================
+
+def _open_mic():
+    import speech_recognition as sr
+    from evo_audio import MicStream
+    mic = MicStream(sr)
+    mic.start()
+    if not mic.calibrated.wait(5):
+        raise SystemExit(f"Microphone not available: {mic.error}")
+    return mic
+
+
+def enroll(count: int = WAKE_SAMPLES):
+    mic = _open_mic()
+    os.makedirs(WAKE_DIR, exist_ok=True)
+    saved = 0
+    while saved < count:
+        print(f"Say \"hey Evo\" ({saved + 1}/{count})...")
+        audio = mic.listen(timeout=10, phrase_time_limit=WAKE_MAX + 0.5)
+        feats = mfcc(audio.get_raw_data(), mic.rate)
+        seconds = len(audio.get_raw_data()) / 2 / mic.rate
+        if not (WAKE_MIN <= seconds <= WAKE_MAX + 0.6):
+            print(f"  {seconds:.1f}s - too short/long, again please.")
+            continue
+        np.save(os.path.join(WAKE_DIR, f"sample_{int(time.time() * 1000)}.npy"), feats)
+        saved += 1
+    templates = load_templates()
+    print(f"Saved. {len(templates)} samples, accept distance {threshold_for(templates):.2f}")
+
+
+def measure_live(seconds: float):
+    # Wall-clock run on the live mic: wakes/hour and CPU (whole process: capture + VAD + detector)
+    mic = _open_mic()
+    wakes = []
+    det = WakeDetector(mic, lambda: wakes.append(time.time()))
+    det.start()
+    print(f"Listening for {seconds:.0f}s. Talk normally without saying the wake word (or say it to test)...")
+    t0, c0 = time.time(), time.process_time()
+    try:
+        time.sleep(seconds)
+    except KeyboardInterrupt:
+        pass
+    wall, cpu = time.time() - t0, time.process_time() - c0
+    det.stop()
+    mic.close()
+    print(f"Ran {wall:.0f}s  bursts checked: {det.checks}  wakes: {len(wakes)}  ({len(wakes) * 3600 / wall:.1f}/hour)")
+    print(f"CPU: {cpu:.2f}s = {100 * cpu / wall:.2f}% of one core")
+
+
+def measure_files(paths: List[str]):
+    # False accepts on recordings that do NOT contain the wake word (speech, TV, music...).
+    # The files are pushed through the same VAD + burst logic as the live mic.
+    import speech_recognition as sr
+    from evo_audio import MicStream, Vad, rms
+
+    templates = load_templates()
+    if not templates:
+        raise SystemExit(f"No samples in {WAKE_DIR}/ - run --enroll first.")
+    total_s = accepts = 0
+    checks = 0
+    cpu0 = time.process_time()
+    for path in paths:
+        with sr.AudioFile(path) as src:
+            audio = sr.Recognizer().record(src)
+        raw = audio.get_raw_data(convert_width=2)
+        total_s += len(raw) / 2 / audio.sample_rate
+
+        mic = MicStream(sr)  # Not started: fed by hand below
+        mic.rate, mic.width, mic.chunk = audio.sample_rate, 2, 1024
+        mic._ring_max = mic.chunks_for(1)
+        mic.vad = Vad(mic.rate)
+        det = WakeDetector(mic, lambda: None, templates)
+        bursts = _Bursts(mic)
+        q, _ = mic.subscribe()
+        step = mic.chunk * 2
+        for i in range(0, len(raw), step):
+            data = raw[i:i + step]
+            mic._feed(data, rms(data))
+            while not q.empty():
+                data, _e, speech = q.get()
+                burst = bursts.push(data, speech)
+                if burst is not None:
+                    accepts += det.check(burst)
+        checks += det.checks
+    cpu = time.process_time() - cpu0
+    hours = max(total_s, 1) / 3600
+    print(f"Audio: {total_s:.0f}s  bursts checked: {checks}  false accepts: {accepts} ({accepts / hours:.1f}/hour)")
+    print(f"Detector CPU: {cpu:.2f}s = {100 * cpu / max(total_s, 1):.2f}% of real time")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='"hey Evo" wake word: record samples and measure the detector.')
+    group = parser.add_mutually_exclusive_group(required=True)
+    group.add_argument("--enroll", action="store_true", help=f"Record {WAKE_SAMPLES} samples of the wake word")
+    group.add_argument("--measure", type=float, metavar="SECONDS", help="Run on the live mic, report wakes/hour + CPU")
+    group.add_argument("--measure-files", nargs="+", metavar="WAV", help="False accepts on recordings without the wake word")
+    args = parser.parse_args(argv)
+    if args.enroll:
+        enroll()
+    elif args.measure:
+        measure_live(args.measure)
+    else:
+        measure_files(args.measure_files)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -2,13 +2,13 @@
 # Explains Python code line-by-line for beginners.
 
 import os
-from google import genai
+from evo_gateway import gemini_client  # Local gateway if running, else google.genai
 
 api_key = os.getenv("GEMINI_API_KEY")
 if not api_key:
     raise RuntimeError("GEMINI_API_KEY is not set.")
 
-client = genai.Client(api_key=api_key)
+client = gemini_client(api_key)
 MODEL = "models/gemini-flash-latest"
 
 # Block: read code
@@ -9,6 +9,10 @@ from google import genai
 import pyttsx3
 import speech_recognition as sr
 
+from evo_tts import TtsWorker  # One TTS thread: sentence queue + stop()
+from evo_audio import MicStream, BargeIn  # Always-open mic: calibrated once, ring buffer, barge-in
+from evo_stt import make_backend, GoogleStt  # Speech-to-text: google (cloud) or vosk (local, streaming)
+
 # -------------------------
 # Block: Config + API key
 # -------------------------
@@ -46,26 +50,36 @@ def log_line(line: str):
 # -------------------------
 # Block: Text-to-Speech (offline)
 # -------------------------
-tts_engine = pyttsx3.init()
-tts_engine.setProperty("rate", 175)
+tts = TtsWorker(pyttsx3.init, rate=175)  # Engine lives on its own thread
 
 tts_enabled = True
 
 def speak(text: str):
+    # Queues text (returns immediately); spoken sentence by sentence
     if not tts_enabled:
         return
-    try:
-        tts_engine.say(text)
-        tts_engine.runAndWait()
-    except Exception:
-        pass
+    tts.say(text)
+
+def stop_speaking():
+    tts.stop()
 
 # -------------------------
 # Block: Speech-to-Text (mic)
 # -------------------------
 recognizer = sr.Recognizer()
+mic = MicStream(sr)  # Opens the mic and measures the room noise once, in the background
+mic.start()
 mic_enabled = True
 
+stt = GoogleStt(recognizer)  # Swapped for the local engine below if it loads
+
+def load_stt():
+    # Loading a local model takes a moment, so it happens off the UI thread
+    global stt
+    stt = make_backend("auto", recognizer)
+
+threading.Thread(target=load_stt, daemon=True).start()
+
 def listen_once():
     """
     Records one user sentence from the microphone and returns it as text.
@@ -75,12 +89,18 @@ def listen_once():
         return None
 
     try:
-        with sr.Microphone() as source:
-            status_var.set("Listening...")
-            recognizer.adjust_for_ambient_noise(source, duration=0.5)
-            audio = recognizer.listen(source, timeout=6, phrase_time_limit=10)
+        status_var.set("Listening...")
+        stream = stt.stream(mic.rate, mic.width)
+
+        def on_audio(pcm):
+            # Local backend: show words in the entry box while the user talks
+            partial = stream.feed(pcm)
+            if partial:
+                root.after(0, show_partial, partial)
+
+        audio = mic.listen(timeout=6, phrase_time_limit=10, on_audio=on_audio, on_segment=stream.segment)
         status_var.set("Transcribing...")
-        return recognizer.recognize_google(audio)
+        return stream.finish(audio) or None
     except sr.WaitTimeoutError:
         status_var.set("Ready")
         return None
@@ -139,8 +159,18 @@ def gemini_reply(user_text: str):
 
         prompt = f"ROLE:\n{ROLE}\n\nUSER:\n{user_text}"
 
-        resp = chat.send_message(prompt)
-        reply = resp.text.strip() if resp.text else "(no response)"
+        # Block: stream the reply; each finished sentence is spoken right away
+        speaking = tts_enabled
+        turn = tts.begin()  # stop_speaking() drops the rest of this reply
+        parts = []
+        for chunk in chat.send_message_stream(prompt):
+            piece = chunk.text or ""
+            parts.append(piece)
+            if speaking:
+                tts.feed(piece, turn)
+        if speaking:
+            tts.end(turn)
+        reply = "".join(parts).strip() or "(no response)"
 
         append_chat("Evo", reply)
         append_divider()
@@ -150,7 +180,6 @@ def gemini_reply(user_text: str):
         log_line("")
 
         status_var.set("Ready")
-        speak(reply)
 
     except Exception as e:
         status_var.set("Ready")
@@ -168,6 +197,7 @@ def send_text():
 
     entry.delete(0, tk.END)
     append_chat("You", user_text)
+    stop_speaking()  # A new question interrupts the old answer
     threading.Thread(target=gemini_reply, args=(user_text,), daemon=True).start()
 
 def clear_chat():
@@ -201,8 +231,14 @@ def save_chat_to_file():
 def toggle_tts():
     global tts_enabled
     tts_enabled = not tts_enabled
+    if not tts_enabled:
+        stop_speaking()
     tts_btn.configure(text=("TTS: ON" if tts_enabled else "TTS: OFF"))
 
+def show_partial(text: str):
+    entry.delete(0, tk.END)
+    entry.insert(0, text)
+
 def start_voice_input():
     """
     Record voice in a background thread and put transcribed text into entry.
@@ -274,6 +310,7 @@ voice_btn = tk.Button(input_row, text="🎤 Voice", width=10, command=start_voic
 voice_btn.pack(side=tk.LEFT, padx=(8, 0))
 
 entry.bind("<Return>", lambda e: send_text())
+root.bind("<Escape>", lambda e: stop_speaking())
 
 # Sidebar controls
 tk.Label(sidebar, text="Controls", font=("Segoe UI", 12, "bold")).pack(pady=(12, 6))
@@ -305,4 +342,11 @@ append_divider()
 # Default theme
 set_theme_dark()
 
+# Barge-in: talking over Evo stops it and starts listening
+def on_barge_in():
+    stop_speaking()
+    root.after(0, start_voice_input)
+
+BargeIn(mic, tts.speaking, on_barge_in).start()
+
 root.mainloop()
@@ -3,13 +3,13 @@
 # then gives step-by-step troubleshooting.
 
 import os
-from google import genai
+from evo_gateway import gemini_client  # Local gateway if running, else google.genai
 
 api_key = os.getenv("GEMINI_API_KEY")
 if not api_key:
     raise RuntimeError("GEMINI_API_KEY is not set.")
 
-client = genai.Client(api_key=api_key)
+client = gemini_client(api_key)
 MODEL = "models/gemini-flash-latest"
 
 print("Gemini Helpdesk Bot (v6). Type 'exit' to quit.\n")
@@ -1,5 +1,12 @@
 import os
+import sys
+import time
+import runpy
+import signal
+import tempfile
+import importlib
 import subprocess
+import traceback
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -17,10 +24,112 @@ projects = {
     "9) Evo Modern GUI": "evo_v9_modern_gui.py",
 }
 
+# =========================
+# Zygote (prefork) launcher
+# =========================
+# Every tool imports the same heavy modules (google.genai takes seconds) and
+# loads .env again. The hub imports them once, then for each selection forks a
+# copy of itself that already has them loaded and runs the tool with runpy.
+# Fork only exists on Linux/macOS; on Windows tools start as normal subprocesses.
+
+PRELOAD = ["google.genai", "dotenv"]   # Shared modules imported once, here
+BENCH_RUNS = 3                         # Launches per mode for "t) Compare launch times"
+CAN_FORK = hasattr(os, "fork")
+
+
+def preload():
+    t0 = time.perf_counter()
+    for name in PRELOAD:
+        try:
+            importlib.import_module(name)
+        except ImportError as e:
+            print(f"(preload skipped {name}: {e})")
+    return (time.perf_counter() - t0) * 1000
+
+
+def run_forked(file_to_run, t0):
+    # Child: becomes the tool (same as "python file_to_run", minus the start-up).
+    # Parent: waits for it, ignoring Ctrl+C (that's meant for the tool).
+    sys.stdout.flush()
+    sys.stderr.flush()
+    pid = os.fork()
+    if pid == 0:
+        code = 0
+        try:
+            print(f"(started in {(time.perf_counter() - t0) * 1000:.0f} ms, fork)")
+            sys.argv = [file_to_run]
+            sys.path[0] = os.path.dirname(os.path.abspath(file_to_run))
+            runpy.run_path(file_to_run, run_name="__main__")
+        except SystemExit as e:
+            code = e.code if isinstance(e.code, int) else (0 if e.code is None else 1)
+        except BaseException:
+            traceback.print_exc()
+            code = 1
+        finally:
+            sys.stdout.flush()
+            sys.stderr.flush()
+            os._exit(code)  # Never return into the hub's menu loop
+    old = signal.signal(signal.SIGINT, signal.SIG_IGN)
+    try:
+        os.waitpid(pid, 0)
+    finally:
+        signal.signal(signal.SIGINT, old)
+
+
+def run_cold(file_to_run):
+    subprocess.run([sys.executable, file_to_run], check=False)
+
+
+def compare_launch_times():
+    # Runs the same small tool both ways and times it until the tool exits:
+    # - cold: "python tool.py" in a new interpreter (what subprocess.run pays)
+    # - fork: a forked child of the hub running it with runpy (what run_forked does)
+    # The tool does what every Evo tool starts with: .env + the shared imports.
+    imports = "".join(f"import {name}\n" for name in PRELOAD if name in sys.modules)
+    fd, tool = tempfile.mkstemp(suffix=".py", prefix="evo_bench_")
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        f.write("from dotenv import load_dotenv\nload_dotenv()\n" + imports)
+    cold, forked = [], []
+    try:
+        for _ in range(BENCH_RUNS):
+            t0 = time.perf_counter()
+            subprocess.run([sys.executable, tool], check=False)
+            cold.append((time.perf_counter() - t0) * 1000)
+            if CAN_FORK:
+                sys.stdout.flush()
+                sys.stderr.flush()
+                t0 = time.perf_counter()
+                pid = os.fork()
+                if pid == 0:
+                    code = 0
+                    try:
+                        runpy.run_path(tool, run_name="__main__")
+                    except BaseException:
+                        code = 1
+                    finally:
+                        os._exit(code)
+                os.waitpid(pid, 0)
+                forked.append((time.perf_counter() - t0) * 1000)
+    finally:
+        os.unlink(tool)
+
+    print(f"\n{'launch':<10}{'best ms':>10}{'avg ms':>10}")
+    print(f"{'cold':<10}{min(cold):>10.0f}{sum(cold) / len(cold):>10.0f}")
+    if forked:
+        print(f"{'fork':<10}{min(forked):>10.0f}{sum(forked) / len(forked):>10.0f}")
+        print(f"Fork launches are {min(cold) / max(min(forked), 0.1):.0f}x faster.")
+    else:
+        print("fork      not available on this OS (tools start cold)")
+
+
+if CAN_FORK:
+    print(f"Preloaded shared modules in {preload():.0f} ms")
+
 while True:
     print("\nEvo Project Hub v10")
     for i, name in enumerate(projects.keys(), start=1):
         print(f"{i}. {name}")
+    print("t. Compare launch times (cold vs fork)")
     print("0. Exit")
 
     choice = input("\nSelect a project: ").strip()
@@ -28,6 +137,10 @@ while True:
     if choice == "0":
         break
 
+    if choice.lower() == "t":
+        compare_launch_times()
+        continue
+
     try:
         idx = int(choice) - 1
         file_to_run = list(projects.values())[idx]
@@ -39,4 +152,8 @@ while True:
         print(f"Missing file: {file_to_run}")
         continue
 
-    subprocess.run(["python", file_to_run], check=False)
+    started = time.perf_counter()
+    if CAN_FORK:
+        run_forked(file_to_run, started)
+    else:
+        run_cold(file_to_run)
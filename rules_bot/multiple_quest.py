@@ -2,7 +2,7 @@
 # Generates a 5-question multiple-choice quiz with answers.
 
 import os
-from google import genai
+from evo_gateway import gemini_client  # Local gateway if running, else google.genai
 from dotenv import load_dotenv
 load_dotenv()
 
@@ -10,7 +10,7 @@ api_key = os.getenv("GEMINI_API_KEY")
 if not api_key:
     raise RuntimeError("GEMINI_API_KEY is not set.")
 
-client = genai.Client(api_key=api_key)
+client = gemini_client(api_key)
 MODEL = "models/gemini-flash-latest"
 
 # Block: read topic
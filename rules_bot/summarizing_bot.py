@@ -2,7 +2,7 @@
 # Summarizes any text into beginner-friendly bullet points.
 
 import os
-from google import genai
+from evo_gateway import gemini_client  # Local gateway if running, else google.genai
 
 # Block: read and verify API key
 api_key = os.getenv("GEMINI_API_KEY")
@@ -10,7 +10,7 @@ if not api_key:
     raise RuntimeError("GEMINI_API_KEY is not set.")
 
 # Block: create client + choose model
-client = genai.Client(api_key=api_key)
+client = gemini_client(api_key)
 MODEL = "models/gemini-flash-latest"
 
 # Block: read input text
@@ -0,0 +1,25 @@
+# Checks for the voice command matcher (run with: python -m pytest rules_bot)
+# The matcher sees every transcript, so everyday phrases must NOT become commands.
+
+from evo_commands import CommandMatcher
+
+COMMANDS = ["clear chat", "new chat", "save chat", "toggle speak", "stop talking", "help commands"]
+
+
+def test_exact_and_sound_alike_commands_match():
+    m = CommandMatcher(COMMANDS)
+    assert m.match("New chat.") == "new chat"
+    assert m.match("knew chat") == "new chat"
+    assert m.match("safe chat") == "save chat"
+
+
+def test_everyday_phrases_are_not_commands():
+    m = CommandMatcher(COMMANDS)
+    for phrase in ["so cute", "nice to", "more chat", "fun chat", "clear that", "save it", "good chat"]:
+        assert m.match(phrase) is None, phrase
+
+
+def test_long_utterances_are_not_commands():
+    m = CommandMatcher(COMMANDS)
+    assert m.match("can you clear the chat history for me") is None
+    assert m.match("") is None
@@ -0,0 +1,23 @@
+# Checks for the chat search index (run with: python -m pytest rules_bot)
+# The trigram prefilter must never drop a message the regex itself would match.
+
+import re
+
+from evo_search import ChatIndex, required_literal
+
+
+def test_quantifier_counts_are_not_required_text():
+    assert required_literal(r"\d{2,4}") == ""
+    assert required_literal("[a-z]{3,5}ing") == "ing"
+    assert required_literal("ab{100}") == "a"
+    assert required_literal("x{3}") == ""
+
+
+def test_regex_search_matches_re_search():
+    messages = ["call me at 5551234", "xxx marks the spot", "no digits here", "(abc) xyz"]
+    ix = ChatIndex()
+    for text in messages:
+        ix.add(text)
+    for pattern in [r"\d{2,4}", "x{3}", "(abc)?xyz", r"\(abc\)"]:
+        expected = [i for i, text in enumerate(messages) if re.search(pattern, text, re.I)]
+        assert ix.search(pattern, regex=True).ids == expected, pattern
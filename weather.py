@@ -1,33 +1,22 @@
 # WeatherApp_Wttr
 # Simple console weather app using wttr.in
-# No API key required
+# No API key required (data layer: weather_data.py)
 
-import requests   # Used to make HTTP requests to wttr.in
 import sys        # Used to read command-line arguments
 
+from weather_data import fetch_weather, WeatherError  # Cached + pooled wttr.in lookups
 
-def get_weather(city):
-    # Build the wttr.in URL
-    # format=j1 returns JSON instead of plain text
-    url = f"https://wttr.in/{city}?format=j1"
 
+def get_weather(city):
+    # Get the data (from the cache when it's recent, see weather_data.py)
     try:
-        # Send GET request with a timeout to avoid hanging forever
-        r = requests.get(url, timeout=10)
-
-        # Raise an error if HTTP status is not 200 (OK)
-        r.raise_for_status()
-    except Exception as e:
-        # Catch network errors, timeouts, bad responses, etc.
-        print(f"Network error: {e}")
+        result = fetch_weather(city)
+    except WeatherError as e:
+        # Network failed and there is no saved copy for this city
+        print(e)
         return
 
-    # Convert JSON response into a Python dictionary
-    data = r.json()
-
-    # Extract current weather conditions safely
-    # If keys are missing, fall back to empty dicts
-    current = data.get("current_condition", [{}])[0]
+    current = result.data.get("current", {})
 
     # If no current weather data exists
     if not current:
@@ -36,35 +25,24 @@ def get_weather(city):
 
     # Display current weather info
     print(f"Location: {city}")
-    print(f"Condition: {current.get('weatherDesc',[{}])[0].get('value','N/A')}")
-    print(f"Temperature: {current.get('temp_C','N/A')}°C")
-    print(f"Feels like: {current.get('FeelsLikeC','N/A')}°C")
-    print(f"Humidity: {current.get('humidity','N/A')}%")
+    if result.note():
+        print(result.note())
+    print(f"Condition: {current['desc']}")
+    print(f"Temperature: {current['temp_C']}°C")
+    print(f"Feels like: {current['FeelsLikeC']}°C")
+    print(f"Humidity: {current['humidity']}%")
     print(
-        f"Wind: {current.get('winddir16Point','N/A')} "
-        f"at {current.get('windspeedKmph','N/A')} km/h"
+        f"Wind: {current['winddir16Point']} "
+        f"at {current['windspeedKmph']} km/h"
     )
     print()
 
-    # Get forecast data (usually contains multiple days)
-    weather = data.get('weather', [])
-
-    # Show up to 3 days of forecast if available
-    if weather:
+    # Up to 3 days of forecast (description from the first hourly entry)
+    days = result.data.get('days', [])
+    if days:
         print('3-day summary:')
-        for day in weather[:3]:
-            date = day.get('date', 'N/A')
-            maxtemp = day.get('maxtempC', 'N/A')
-            mintemp = day.get('mintempC', 'N/A')
-
-            # Take description from the first hourly entry
-            desc = (
-                day.get('hourly', [{}])[0]
-                .get('weatherDesc', [{}])[0]
-                .get('value', 'N/A')
-            )
-
-            print(f"  {date}: {desc}, {mintemp}°C - {maxtemp}°C")
+        for day in days:
+            print(f"  {day['date']}: {day['desc']}, {day['mintempC']}°C - {day['maxtempC']}°C")
 
 
 def main():
@@ -0,0 +1,164 @@
+# Weather data layer for weather.py and weather_update.py
+# Fetches wttr.in JSON once per city and keeps it on disk, so repeat lookups are instant.
+#
+# - One shared requests.Session: the connection (and TLS handshake) is reused
+# - Per-city cache file in weather_cache/ with a fresh time (FRESH_SECONDS)
+# - Older than that: the cached data is returned right away and a background
+#   thread fetches a new copy for next time (stale-while-revalidate)
+# - No network: the cached copy keeps being shown (the background refresh just fails
+#   quietly); only a city that was never fetched gives an error
+# Only the fields the apps show are stored (the full j1 payload is ~50 KB per city).
+
+import os
+import json
+import hashlib
+import time
+import threading
+
+import requests   # Used to make HTTP requests to wttr.in
+
+
+CACHE_DIR = "weather_cache"     # Next to the scripts' working directory
+FRESH_SECONDS = 15 * 60         # wttr.in updates about every 15-30 minutes
+TIMEOUT = 10                    # Seconds before a request gives up
+URL = "https://wttr.in/{city}?format=j1"
+
+_session = None
+_session_lock = threading.Lock()
+_refreshing = set()             # Cities with a background refresh running
+
+
+class WeatherError(Exception):
+    # No fresh data and nothing cached to fall back to
+    pass
+
+
+class WeatherResult:
+    def __init__(self, data, fetched, source):
+        self.data = data            # {"current": {...}, "days": [...]} (see _slim)
+        self.fetched = fetched      # time.time() when it was downloaded
+        self.source = source        # "network" | "cache" | "stale"
+
+    @property
+    def age_minutes(self):
+        return int((time.time() - self.fetched) // 60)
+
+    def note(self):
+        # Short line for the display ("" when the data was just downloaded)
+        if self.source == "network":
+            return ""
+        if self.source == "stale":
+            return f"(cached {self.age_minutes} min ago, updating in the background)"
+        return f"(cached {self.age_minutes} min ago)"
+
+
+def session():
+    # Created on first use, then shared by every request
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = requests.Session()
+        return _session
+
+
+def _normalize(city):
+    # "Cape+Town" and "cape town" are the same city
+    return " ".join(city.lower().replace("+", " ").split())
+
+
+def _cache_path(city):
+    # Hash of the name, so any script works ("東京", "Москва") and no two cities share a file
+    key = hashlib.sha1(_normalize(city).encode("utf-8")).hexdigest()
+    return os.path.join(CACHE_DIR, key + ".json")
+
+
+def _read_cache(city):
+    try:
+        with open(_cache_path(city), "r", encoding="utf-8") as f:
+            entry = json.load(f)
+        if _normalize(entry["city"]) != _normalize(city):
+            return None  # Written for another city
+        return entry["data"], float(entry["fetched"])
+    except (OSError, ValueError, KeyError, TypeError, AttributeError):
+        return None
+
+
+def _write_cache(city, data, fetched):
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    path = _cache_path(city)
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump({"city": city, "fetched": fetched, "data": data}, f)
+    os.replace(tmp, path)  # Readers never see a half-written file
+
+
+def _slim(payload):
+    # Keeps what the apps display: current conditions + 3 days (description from the first hour)
+    current = (payload.get("current_condition") or [{}])[0]
+    days = []
+    for day in payload.get("weather", [])[:3]:
+        hourly = (day.get("hourly") or [{}])[0]
+        days.append({
+            "date": day.get("date", "N/A"),
+            "maxtempC": day.get("maxtempC", "N/A"),
+            "mintempC": day.get("mintempC", "N/A"),
+            "desc": (hourly.get("weatherDesc") or [{}])[0].get("value", "N/A"),
+        })
+    return {
+        "current": {
+            "desc": (current.get("weatherDesc") or [{}])[0].get("value", "N/A") if current else "N/A",
+            "temp_C": current.get("temp_C", "N/A"),
+            "FeelsLikeC": current.get("FeelsLikeC", "N/A"),
+            "humidity": current.get("humidity", "N/A"),
+            "winddir16Point": current.get("winddir16Point", "N/A"),
+            "windspeedKmph": current.get("windspeedKmph", "N/A"),
+        } if current else {},
+        "days": days,
+    }
+
+
+def _download(city):
+    r = session().get(URL.format(city=city), timeout=TIMEOUT)
+    r.raise_for_status()
+    data = _slim(r.json())
+    fetched = time.time()
+    try:
+        _write_cache(city, data, fetched)
+    except OSError:
+        pass  # Read-only folder: still show the data, just don't keep it
+    return data, fetched
+
+
+def _refresh(city):
+    try:
+        _download(city)
+    except Exception:
+        pass  # Still offline; the stale copy stays until the next try
+    finally:
+        with _session_lock:
+            _refreshing.discard(city)
+
+
+def fetch_weather(city, max_age=FRESH_SECONDS):
+    # Returns a WeatherResult for the city ("Cape+Town" style, as used in the URL).
+    # Raises WeatherError only when the network fails AND nothing is cached.
+    cached = _read_cache(city)
+    if cached is not None:
+        data, fetched = cached
+        if time.time() - fetched <= max_age:
+            return WeatherResult(data, fetched, "cache")
+        # Stale: answer now, refresh in the background (not a daemon thread, so a
+        # one-shot script still finishes saving the new copy before it exits)
+        with _session_lock:
+            start = city not in _refreshing
+            _refreshing.add(city)
+        if start:
+            threading.Thread(target=_refresh, args=(city,)).start()
+        return WeatherResult(data, fetched, "stale")
+
+    try:
+        data, fetched = _download(city)
+    except Exception as e:
+        raise WeatherError(f"Network error: {e}")
+    return WeatherResult(data, fetched, "network")
+
@@ -1,31 +1,24 @@
 # WeatherApp_Wttr v2
 # Console weather app using wttr.in with colored output
 
-import requests
 import sys
 from colorama import Fore, Style, init
 
+from weather_data import fetch_weather, WeatherError  # Cached + pooled wttr.in lookups
+
 # Initialize colorama so colors work on Windows
 init(autoreset=True)
 
 
 def get_weather(city):
-    # Build API URL (JSON format)
-    url = f"https://wttr.in/{city}?format=j1"
-
+    # Get the data (from the cache when it's recent, see weather_data.py)
     try:
-        # Send request with timeout
-        r = requests.get(url, timeout=10)
-        r.raise_for_status()
-    except Exception as e:
-        print(Fore.RED + f"Network error: {e}")
+        result = fetch_weather(city)
+    except WeatherError as e:
+        print(Fore.RED + str(e))
         return
 
-    # Parse JSON response
-    data = r.json()
-
-    # Extract current conditions safely
-    current = data.get("current_condition", [{}])[0]
+    current = result.data.get("current", {})
 
     if not current:
         print(Fore.RED + "No weather data found.")
@@ -33,52 +26,33 @@ def get_weather(city):
 
     # Header
     print(Fore.CYAN + Style.BRIGHT + f"\nWeather for {city.replace('+', ' ')}")
+    if result.note():
+        print(Fore.MAGENTA + result.note())
     print(Fore.CYAN + "-" * 30)
 
     # Current weather
-    print(
-        Fore.YELLOW + "Condition: " +
-        Fore.WHITE + current.get('weatherDesc', [{}])[0].get('value', 'N/A')
-    )
-    print(
-        Fore.YELLOW + "Temperature: " +
-        Fore.WHITE + f"{current.get('temp_C', 'N/A')}°C"
-    )
-    print(
-        Fore.YELLOW + "Feels like: " +
-        Fore.WHITE + f"{current.get('FeelsLikeC', 'N/A')}°C"
-    )
-    print(
-        Fore.YELLOW + "Humidity: " +
-        Fore.WHITE + f"{current.get('humidity', 'N/A')}%"
-    )
+    print(Fore.YELLOW + "Condition: " + Fore.WHITE + current["desc"])
+    print(Fore.YELLOW + "Temperature: " + Fore.WHITE + f"{current['temp_C']}°C")
+    print(Fore.YELLOW + "Feels like: " + Fore.WHITE + f"{current['FeelsLikeC']}°C")
+    print(Fore.YELLOW + "Humidity: " + Fore.WHITE + f"{current['humidity']}%")
     print(
         Fore.YELLOW + "Wind: " +
         Fore.WHITE +
-        f"{current.get('winddir16Point','N/A')} "
-        f"at {current.get('windspeedKmph','N/A')} km/h"
+        f"{current['winddir16Point']} "
+        f"at {current['windspeedKmph']} km/h"
     )
 
     # Forecast section
-    weather = data.get("weather", [])
+    days = result.data.get("days", [])
 
-    if weather:
+    if days:
         print(Fore.CYAN + "\n3-Day Forecast")
         print(Fore.CYAN + "-" * 30)
 
-        for day in weather[:3]:
-            date = day.get("date", "N/A")
-            max_temp = day.get("maxtempC", "N/A")
-            min_temp = day.get("mintempC", "N/A")
-            desc = (
-                day.get("hourly", [{}])[0]
-                .get("weatherDesc", [{}])[0]
-                .get("value", "N/A")
-            )
-
+        for day in days:
             print(
-                Fore.GREEN + f"{date}: " +
-                Fore.WHITE + f"{desc}, {min_temp}°C - {max_temp}°C"
+                Fore.GREEN + f"{day['date']}: " +
+                Fore.WHITE + f"{day['desc']}, {day['mintempC']}°C - {day['maxtempC']}°C"
             )
 
 